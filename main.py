@@ -1,7 +1,10 @@
+import os
+
 import uvicorn
 
 
 def main() -> None:
+    os.environ["MOVIE_QUIZ_STATIC_RELOAD"] = "1"
     uvicorn.run("src.app:app", host="0.0.0.0", port=4527, reload=True, reload_dirs=["src"])
 
 
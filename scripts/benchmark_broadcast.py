@@ -0,0 +1,69 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from src.utils.connection_manager import ConnectionManager
+
+
+class BenchmarkWebSocket:
+    def __init__(self, delay: float, deliveries: List[float]) -> None:
+        self.delay = delay
+        self.deliveries = deliveries
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.deliveries.append(time.perf_counter() - json.loads(text)["sent_at"])
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+async def sequential_broadcast(websockets: List[BenchmarkWebSocket], message: dict) -> None:
+    for websocket in websockets:
+        await websocket.send_text(json.dumps(message, ensure_ascii=False))
+
+
+async def measure(players: int, rounds: int, sequential: bool) -> float:
+    deliveries = []
+    # один из игроков с медленным соединением
+    websockets = [BenchmarkWebSocket(delay=0.05 if i == 0 else random.uniform(0.0005, 0.002), deliveries=deliveries) for i in range(players)]
+    manager = ConnectionManager(logger=logging.getLogger(), queue_size=rounds + 1)
+
+    for websocket in websockets:
+        await manager.connect(websocket, session_id="benchmark")
+
+    for _ in range(rounds):
+        message = {"action": "answer", "sent_at": time.perf_counter(), "players": [{"username": f"user{i}"} for i in range(players)]}
+
+        if sequential:
+            await sequential_broadcast(websockets, message)
+        else:
+            await manager.broadcast(session_id="benchmark", message=message)
+            await asyncio.sleep(0.01)
+
+    await asyncio.sleep(0.1 + 0.05 * rounds)
+
+    for websocket in websockets:
+        manager.disconnect(websocket, session_id="benchmark")
+
+    fast_deliveries = sorted(deliveries)[:-rounds]
+    return float(np.percentile(fast_deliveries, 99)) * 1000
+
+
+def main() -> None:
+    for players in [2, 5, 10, 25, 50]:
+        sequential = asyncio.run(measure(players=players, rounds=20, sequential=True))
+        concurrent = asyncio.run(measure(players=players, rounds=20, sequential=False))
+        print(f"{players} players: p99 delivery to fast players {sequential:.2f} ms sequential, {concurrent:.2f} ms with queues")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import time
+
+from jinja2 import Environment, FileSystemLoader
+
+from src.api import precompile_templates, templates
+from src.entities.user import User
+from src.enums import UserRole
+
+
+def measure(environment: Environment, context: dict, iterations: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        environment.get_template("user/question.html").render(**context)
+
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main() -> None:
+    user = User(username="user", password_hash="", full_name="User", role=UserRole.USER, avatar_url="")
+    context = {"user": user, "version": "", "question": {}, "movie": {}, "person_id2person": {}, "movie_id2scale": {}}
+    iterations = 200
+
+    uncached_templates = Environment(loader=FileSystemLoader("web/templates"), cache_size=0)
+    uncached_templates.policies["json.dumps_kwargs"]["ensure_ascii"] = False
+    uncached_templates.globals.update(templates.globals)
+
+    precompile_templates()
+    print(f"question page render without cache: {measure(uncached_templates, context, iterations):.3f} ms")
+    print(f"question page render with cache: {measure(templates, context, iterations):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
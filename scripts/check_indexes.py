@@ -0,0 +1,73 @@
+from typing import List, Optional, Tuple
+
+from pymongo import DESCENDING
+
+from src import database
+from src.utils.indexes import get_collection_scans
+
+
+def get_value(collection_name: str, field: str, default: object) -> object:
+    document = database.client[database.database_name][collection_name].find_one({field: {"$exists": True}}, {field: 1})
+    if document is None:
+        return default
+
+    for key in field.split("."):
+        document = document[key]
+
+    return document
+
+
+def get_query_shapes() -> List[Tuple[str, str, dict, Optional[list]]]:
+    username = get_value("questions", "username", "")
+    movie_id = get_value("movies", "movie_id", 0)
+    person_id = get_value("persons", "person_id", 0)
+    question_id = get_value("quiz_tour_questions", "question_id", 0)
+    quiz_tour_id = get_value("quiz_tours", "quiz_tour_id", 0)
+    track_id = get_value("tracks", "track_id", 0)
+    kinopoisk_id = get_value("movies", "source.kinopoisk_id", 0)
+
+    return [
+        ("QuestionsDatabase.have_question", "questions", {"username": username, "correct": None}, None),
+        ("QuestionsDatabase.get_last_questions", "questions", {"username": username, "correct": {"$ne": None}, "movie_id": {"$in": [movie_id]}}, [("timestamp", DESCENDING)]),
+        ("QuestionsDatabase.get_analytics", "questions", {"username": username, "correct": {"$ne": None}}, None),
+        ("QuestionsDatabase.remove_movie", "questions", {"movie_id": movie_id}, None),
+        ("QuestionsDatabase.get_movies_scales", "movie_scales", {"username": username, "movie_id": {"$in": [movie_id]}}, None),
+        ("QuizToursDatabase.answer_question", "quiz_tours", {"question_ids": question_id}, None),
+        ("QuizToursDatabase.have_question", "quiz_tour_answers", {"question_id": question_id, "username": username}, None),
+        ("QuizToursDatabase.update_score", "quiz_tour_answers", {"username": username, "question_id": {"$in": [question_id]}}, None),
+        ("QuizToursDatabase.rebuild_statistics", "quiz_tour_answers", {"question_id": {"$in": [question_id]}}, None),
+        ("QuizToursDatabase.get_movie_quiz_tour_ids", "quiz_tour_questions", {"question.movie_id": movie_id}, None),
+        ("QuizToursDatabase.get_last_questions", "quiz_tour_questions", {"question.movie_id": {"$in": [movie_id]}}, [("question_id", DESCENDING)]),
+        ("QuizToursDatabase.get_quiz_tour_movies_statuses", "quiz_tour_statistics", {"quiz_tour_id": quiz_tour_id}, None),
+        ("QuizToursDatabase.get_rating", "quiz_tour_scores", {"quiz_tour_id": {"$in": [quiz_tour_id]}}, None),
+        ("MovieDatabase.get_movie", "movies", {"movie_id": movie_id}, None),
+        ("MovieDatabase.add_from_kinopoisk", "movies", {"source.kinopoisk_id": kinopoisk_id}, None),
+        ("MovieDatabase.remove_person", "movies", {"$or": [{"actors.person_id": person_id}, {"directors.person_id": person_id}]}, None),
+        ("MovieDatabase.get_movies_cites", "cites", {"movie_id": {"$in": [movie_id]}}, [("cite_id", 1)]),
+        ("MovieDatabase.get_movies_tracks", "tracks", {"movie_id": {"$in": [movie_id]}}, [("track_id", 1)]),
+        ("MovieDatabase.add_from_kinopoisk", "persons", {"kinopoisk_id": kinopoisk_id}, None),
+        ("movies history", "history", {"movie_id": movie_id}, [("timestamp", DESCENDING)]),
+        ("tracks history", "history", {"track_id": track_id}, [("timestamp", DESCENDING)]),
+        ("history", "history", {"name": {"$in": ["add_movie"]}}, [("timestamp", DESCENDING)])
+    ]
+
+
+def main() -> None:
+    database.connect()
+    mongo_database = database.client[database.database_name]
+    collection_scans = 0
+
+    for name, collection_name, query, sort in get_query_shapes():
+        cursor = mongo_database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+
+        if get_collection_scans(cursor.explain()):
+            collection_scans += 1
+            print(f"COLLSCAN: {name} ({collection_name}): {query}")
+
+    print(f"Checked query shapes, collection scans: {collection_scans}")
+
+
+if __name__ == "__main__":
+    main()
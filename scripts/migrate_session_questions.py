@@ -0,0 +1,22 @@
+from src import database, questions_database
+from src.entities.question import Question
+from src.entities.session_question import SessionQuestion
+
+
+def main() -> None:
+    database.connect()
+    migrated = 0
+
+    for session in database.sessions.find({"questions.question_id": {"$exists": False}, "questions.0": {"$exists": True}}, {"session_id": 1, "questions": 1}):
+        questions = [Question.from_dict(question) for question in session["questions"]]
+        result = database.session_questions.insert_many([{"session_id": session["session_id"], "question": question.to_dict()} for question in questions])
+        session_questions = [SessionQuestion.from_question(question_id=question_id, question=question) for question_id, question in zip(result.inserted_ids, questions)]
+        session_questions = session_questions[-questions_database.last_questions_count:]
+        database.sessions.update_one({"session_id": session["session_id"]}, {"$set": {"questions": [question.to_dict() for question in session_questions]}})
+        migrated += 1
+
+    print(f"Migrated questions of {migrated} sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from src import database, questions_database
+
+
+def main() -> None:
+    database.connect()
+    scales = questions_database.rebuild_movie_scales()
+    print(f"Rebuilt {scales} movie scales")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from src import database
+from src.utils.name import get_normalized_names
+
+
+def main() -> None:
+    database.connect()
+    updated = 0
+
+    for movie in database.movies.find({}, {"movie_id": 1, "name": 1, "alternative_names": 1, "normalized_names": 1}):
+        normalized_names = get_normalized_names(movie["name"], movie["alternative_names"])
+
+        if movie.get("normalized_names") != normalized_names:
+            database.movies.update_one({"movie_id": movie["movie_id"]}, {"$set": {"normalized_names": normalized_names}})
+            updated += 1
+
+    print(f"Updated normalized names of {updated} movies")
+
+
+if __name__ == "__main__":
+    main()
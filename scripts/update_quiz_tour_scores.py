@@ -0,0 +1,11 @@
+from src import database, quiz_tours_database
+
+
+def main() -> None:
+    database.connect()
+    scores = quiz_tours_database.rebuild_scores()
+    print(f"Rebuilt {scores} quiz tour scores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from src import database, quiz_tours_database
+
+
+def main() -> None:
+    database.connect()
+    inconsistent_count = quiz_tours_database.rebuild_statistics()
+    print(f"Rebuilt quiz tour statistics, inconsistent tours: {inconsistent_count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,13 @@ import json
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from src.database import Database
 from src.movie_database import MovieDatabase
 from src.questions_database import QuestionsDatabase
 from src.quiz_tours_database import QuizToursDatabase
+from src.utils.async_proxy import AsyncProxy
 from src.utils.kinopoisk_parser import KinopoiskParser
 from src.utils.yandex_music_parser import YandexMusicParser
 
@@ -28,3 +30,10 @@ database = Database(mongo_url="mongodb://localhost:27017/", database_name="movie
 movie_database = MovieDatabase(database=database, kinopoisk_parser=kinopoisk_parser, yandex_music_parser=yandex_music_parser, logger=logger)
 questions_database = QuestionsDatabase(database=database, movie_database=movie_database, logger=logger)
 quiz_tours_database = QuizToursDatabase(database=database, questions_database=questions_database, logger=logger)
+
+# блокирующие запросы из асинхронных обработчиков выполняются в отдельном пуле потоков
+database_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="database")
+async_database = AsyncProxy(target=database, executor=database_executor)
+async_movie_database = AsyncProxy(target=movie_database, executor=database_executor)
+async_questions_database = AsyncProxy(target=questions_database, executor=database_executor)
+async_quiz_tours_database = AsyncProxy(target=quiz_tours_database, executor=database_executor)
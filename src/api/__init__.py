@@ -1,14 +1,28 @@
+import os
 import urllib.parse
 from typing import Optional
 
-from fastapi.responses import HTMLResponse, RedirectResponse
-from jinja2 import Environment, FileSystemLoader
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from src.entities.user import User
-from src.utils.common import get_static_hash
+from src.utils.common import RELOAD_MODE, get_static_hash, static_manifest
+from src.utils.json_codec import to_json_bytes
 
-templates = Environment(loader=FileSystemLoader("web/templates"), cache_size=0)
+# скомпилированные шаблоны хранятся в памяти без ограничений, байткод - на диске между перезапусками,
+# а изменённые файлы перечитываются по mtime только в режиме разработки
+templates_cache_path = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "templates")
+os.makedirs(templates_cache_path, exist_ok=True)
+templates_cache = FileSystemBytecodeCache(templates_cache_path)
+templates = Environment(loader=FileSystemLoader("web/templates"), cache_size=-1, auto_reload=RELOAD_MODE, bytecode_cache=templates_cache)
 templates.policies["json.dumps_kwargs"]["ensure_ascii"] = False
+templates.globals["static_url"] = static_manifest.get_url
+
+
+# сущности сериализуются сразу в байты, минуя обход jsonable_encoder и повторную сериализацию стандартным json
+class EntityJSONResponse(JSONResponse):
+    def render(self, content: object) -> bytes:
+        return to_json_bytes(content)
 
 
 def send_error(title: str, text: str, user: Optional[User]) -> HTMLResponse:
@@ -19,3 +33,12 @@ def send_error(title: str, text: str, user: Optional[User]) -> HTMLResponse:
 
 def login_redirect(back_url: str) -> RedirectResponse:
     return RedirectResponse(url=f'/login?back_url={urllib.parse.quote(back_url, safe="")}')
+
+
+def precompile_templates() -> int:
+    names = templates.list_templates(extensions=["html"])
+
+    for name in names:
+        templates.get_template(name)
+
+    return len(names)
@@ -74,6 +74,17 @@ def get_history(params: HistoryQuery) -> JSONResponse:
     return JSONResponse({"status": "success", "history": jsonable_encoder(history)})
 
 
+@router.get("/cache-statistics")
+def get_cache_statistics(user: Optional[User] = Depends(get_user)) -> JSONResponse:
+    if not user:
+        return JSONResponse({"status": "error", "message": "Пользователь не авторизован"})
+
+    if user.role == UserRole.USER:
+        return JSONResponse({"status": "error", "message": "Пользователь не является администратором"})
+
+    return JSONResponse({"status": "success", "statistics": database.get_cache_statistics()})
+
+
 @router.post("/get-top-players")
 def get_top_players(params: TopPlayersQuery) -> JSONResponse:
     players = quiz_tours_database.get_top_players(params.to_query())
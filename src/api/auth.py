@@ -24,7 +24,7 @@ def login(user: Optional[User] = Depends(get_user), back_url: str = Query("/"))
 
 @router.post("/sign-in")
 def sign_in(data: SignIn) -> JSONResponse:
-    user = database.get_user(username=data.username)
+    user = database.get_user(username=data.username, cached=False)
 
     if user is None:
         return JSONResponse({"status": "error", "message": f'Пользователя "{data.username}" не существует'})
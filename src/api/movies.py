@@ -5,11 +5,12 @@ from fastapi import APIRouter, Depends
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import HTMLResponse, JSONResponse
 
-from src import database, movie_database, questions_database
-from src.api import send_error, templates
+from src import database, movie_database, questions_database, quiz_tours_database
+from src.api import EntityJSONResponse, send_error, templates
 from src.entities.question_settings import QuestionSettings
 from src.entities.user import User
 from src.enums import Genre, MovieType, Production, UserRole
+from src.query_params.movie_autocomplete import MovieAutocomplete
 from src.query_params.movie_remove import MovieRemove
 from src.query_params.movie_search import MovieSearch
 from src.query_params.movie_search_query import MovieSearchQuery
@@ -45,27 +46,33 @@ def get_movies(user: Optional[User] = Depends(get_user), params: MovieSearchQuer
 
 
 @router.post("/movies")
-def search_movies(params: MovieSearch, user: Optional[User] = Depends(get_user)) -> JSONResponse:
+def search_movies(params: MovieSearch, user: Optional[User] = Depends(get_user)) -> EntityJSONResponse:
     total, movies = movie_database.search_movies(params=params)
     person_id2person = movie_database.get_movies_persons(movies=movies)
     movie_id2scale = questions_database.get_movies_scales(user=user, movies=movies)
 
-    return JSONResponse({
+    return EntityJSONResponse({
         "status": "success",
         "total": total,
-        "movies": jsonable_encoder(movies),
-        "person_id2person": jsonable_encoder(person_id2person),
-        "movie_id2scale": jsonable_encoder(movie_id2scale)
+        "movies": movies,
+        "person_id2person": person_id2person,
+        "movie_id2scale": movie_id2scale
     })
 
 
+@router.post("/movie-autocomplete")
+def autocomplete_movies(params: MovieAutocomplete) -> EntityJSONResponse:
+    movies = movie_database.autocomplete_movies(query=params.query, count=min(max(params.count, 1), 20))
+    return EntityJSONResponse({"status": "success", "movies": movies})
+
+
 def get_movie_response(movie_id: int, user: Optional[User]) -> HTMLResponse:
     movie = movie_database.get_movie(movie_id=movie_id)
 
     if movie is None:
         return send_error(title="Фильм не найден", text="Не удалось найти запрашиваемый фильм. Возможно, он был удалён", user=user)
 
-    sequels = movie_database.get_movies(movie_ids=movie.sequels)
+    sequels = movie_database.get_movie_cards(movie_ids=movie.sequels)
     person_id2person = movie_database.get_movies_persons(movies=[movie, *sequels])
     movie_id2cites = movie_database.get_movies_cites(movies=[movie])
     movie_id2tracks = movie_database.get_movies_tracks(movies=[movie])
@@ -114,7 +121,10 @@ def remove_movie(params: MovieRemove, user: Optional[User] = Depends(get_user))
     if movie is None:
         return JSONResponse({"status": "error", "message": f"Не удалось найти фильм с movie_id = {params.movie_id} в базе"})
 
+    quiz_tour_ids = quiz_tours_database.get_movie_quiz_tour_ids(movie_id=params.movie_id)
     movie_database.remove_movie(movie_id=params.movie_id, username=user.username)
+    quiz_tours_database.rebuild_scores(quiz_tour_ids=quiz_tour_ids)
+    quiz_tours_database.rebuild_statistics(quiz_tour_ids=quiz_tour_ids, check_consistency=False)
     return JSONResponse({"status": "success"})
 
 
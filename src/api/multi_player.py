@@ -1,6 +1,8 @@
-import asyncio
+import hashlib
 import json
+import os
 import re
+import tempfile
 from datetime import datetime
 from typing import Optional
 
@@ -9,21 +11,32 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.websockets import WebSocket, WebSocketDisconnect
 
-from src import database, logger, movie_database, questions_database
+from src import async_database, async_movie_database, async_questions_database, database, logger
 from src.api import login_redirect, templates
+from src.entities.question import Question
 from src.entities.question_answer import QuestionAnswer
 from src.entities.question_settings import QUESTION_YEARS, QuestionSettings
 from src.entities.session import Session
 from src.entities.settings import Settings
 from src.entities.user import User
-from src.enums import MovieType, Production, QuestionType
+from src.enums import MovieType, Production, QuestionType, UserRole
 from src.query_params.session import SessionConnect, SessionCreate
 from src.utils.auth import get_user, token_to_user
+from src.utils.broadcast_bus import SocketBroadcastBus
 from src.utils.common import get_static_hash
 from src.utils.connection_manager import ConnectionManager
+from src.utils.sessions_manager import SessionsManager
+
+SESSION_ID_PATTERN = r"[a-zA-Z\d_\-]+"
+# путь к сокету шины задаётся для каждого развёртывания, по умолчанию он зависит от каталога проекта
+PROJECT_HASH = hashlib.md5(os.path.abspath(__file__).encode("utf-8")).hexdigest()[:8]
+BROADCAST_SOCKET_PATH = os.environ.get("MOVIE_QUIZ_BROADCAST_SOCKET", os.path.join(tempfile.gettempdir(), f"movie-quiz-{PROJECT_HASH}.sock"))
 
 router = APIRouter()
-connection_manager = ConnectionManager(logger=logger)
+sessions_manager = SessionsManager(database=async_database)
+# сообщения проходят через общую шину, поэтому игроки одной сессии могут быть подключены к разным воркерам
+broadcast_bus = SocketBroadcastBus(path=BROADCAST_SOCKET_PATH, logger=logger)
+connection_manager = ConnectionManager(logger=logger, bus=broadcast_bus, on_remote_change=sessions_manager.release_session)
 
 
 @router.post("/create-multiplayer-session")
@@ -31,11 +44,16 @@ async def create_multiplayer_session(params: SessionCreate, user: User = Depends
     if not user:
         return JSONResponse({"status": "error", "message": "Пользователь не авторизован"})
 
-    if database.get_session(session_id=params.session_id):
-        return JSONResponse({"status": "error", "message": f'Сессия с идентификатором "{params.session_id}" уже есть'})
+    if not re.fullmatch(SESSION_ID_PATTERN, params.session_id):
+        return JSONResponse({"status": "error", "message": "Идентификатор сессии может содержать только латинские буквы, цифры, _ и -"})
+
+    async with sessions_manager.lock(params.session_id):
+        if await sessions_manager.get_session(session_id=params.session_id):
+            return JSONResponse({"status": "error", "message": f'Сессия с идентификатором "{params.session_id}" уже есть'})
+
+        session = Session.create(session_id=params.session_id, username=user.username, question_settings=QuestionSettings.default())
+        await sessions_manager.create_session(session)
 
-    session = Session.create(session_id=params.session_id, username=user.username, question_settings=QuestionSettings.default())
-    database.sessions.insert_one(session.to_dict())
     return JSONResponse({"status": "success", "session_id": params.session_id, "username": user.username})
 
 
@@ -44,179 +62,218 @@ async def check_multiplayer_session(params: SessionConnect, user: User = Depends
     if not user:
         return JSONResponse({"status": "error", "message": "Пользователь не авторизован"})
 
-    session = database.get_session(session_id=params.session_id)
-    if not session:
-        return JSONResponse({"status": "error", "message": "Сессия не существует"})
+    async with sessions_manager.lock(params.session_id):
+        session = await sessions_manager.get_session(session_id=params.session_id)
+        if not session:
+            return JSONResponse({"status": "error", "message": "Сессия не существует"})
 
-    if session.created_by == user.username and params.remove_statistics:
-        session.clear_statistics()
-        database.sessions.update_one({"session_id": session.session_id}, {"$set": session.to_dict()})
+        if session.created_by == user.username and params.remove_statistics:
+            await sessions_manager.clear_statistics(session)
 
     return JSONResponse({"status": "success", "username": user.username})
 
 
-def get_session_message(session_id: str, username: str, action: str) -> dict:
-    message = {
-        "session_id": session_id,
-        "username": username,
-        "action": action
-    }
+async def get_question_payload(session: Session) -> dict:
+    if not session.question:
+        return {"question": None, "movie": None, "person_id2person": {}, "movie_id2scale": {}, "round_number": session.round_number}
 
-    session = database.get_session(session_id=session_id)
-    if not session:
-        return message
+    movie = await async_movie_database.get_movie_card(movie_id=session.question.movie_id)
+    person_id2person = await async_movie_database.get_movies_persons(movies=[movie])
+    movie_id2scale = {}
 
-    users = database.get_users(usernames=session.players)
-    username2user = {user.username: {"username": user.username, "avatar_url": user.avatar_url, "full_name": user.full_name} for user in users}
+    for player_user in await async_database.get_users(usernames=session.players):
+        movie_id2scale[player_user.username] = await async_questions_database.get_movies_scales(user=player_user, movies=[movie])
 
-    message["created_by"] = session.created_by
-    message["players"] = [username2user[username] for username in session.players]
-    message["answers"] = {username: {"correct": answer.correct, "answer_time": answer.answer_time} for username, answer in session.answers.items()}
-    message["question"] = None
-    message["statistics"] = {username: [answer.to_dict() for answer in answers] for username, answers in session.statistics.items()}
-    message["question_settings"] = session.question_settings.to_dict()
+    return {
+        "question": jsonable_encoder(session.question),
+        "movie": jsonable_encoder(movie),
+        "person_id2person": jsonable_encoder(person_id2person),
+        "movie_id2scale": jsonable_encoder(movie_id2scale),
+        "round_number": session.round_number
+    }
 
-    if not session.question:
-        return message
 
-    movie = movie_database.get_movie(movie_id=session.question.movie_id)
-    person_id2person = movie_database.get_movies_persons(movies=[movie])
-    movie_id2scale = {}
+async def get_session_snapshot(session: Session) -> dict:
+    users = await async_database.get_users(usernames=session.players)
+    username2user = {user.username: get_player(user) for user in users}
+
+    return {
+        "action": "snapshot",
+        "seq": session.seq,
+        "session": {
+            "created_by": session.created_by,
+            "players": [username2user[username] for username in session.players if username in username2user],
+            "answers": {username: answer.to_dict() for username, answer in session.answers.items()},
+            "statistics": {username: [answer.to_dict() for answer in answers] for username, answers in session.statistics.items()},
+            "question_settings": session.question_settings.to_dict(),
+            **await get_question_payload(session)
+        }
+    }
 
-    for player_user in database.get_users(usernames=session.players):
-        movie_id2scale[player_user.username] = questions_database.get_movies_scales(user=player_user, movies=[movie])
 
-    message["question"] = jsonable_encoder(session.question)
-    message["movie"] = jsonable_encoder(movie)
-    message["person_id2person"] = jsonable_encoder(person_id2person)
-    message["movie_id2scale"] = jsonable_encoder(movie_id2scale)
-    return message
+def get_player(user: User) -> dict:
+    return {"username": user.username, "avatar_url": user.avatar_url, "full_name": user.full_name}
 
 
-async def get_session_question(session_id: str, username: str) -> None:
-    session = database.get_session(session_id=session_id)
-    if not session:
-        return
+# изменения состояния рассылаются событиями с номером изменения из документа сессии,
+# полный снимок с тем же номером отправляется только при подключении и по запросу клиента
+async def broadcast_event(session: Session, username: str, action: str, **data: object) -> None:
+    message = {"seq": session.seq, "action": action, "username": username, **data}
+    await connection_manager.broadcast(session_id=session.session_id, message=message, sequenced=True)
 
+
+# обработчики ниже изменяют сессию и возвращают её свежее состояние или None, если изменение не применилось
+async def get_session_question(session: Session, username: str, answered_question: Optional[Question] = None) -> Optional[Session]:
     settings = Settings.default(username="")
     settings.update_question(session.question_settings)
-    question = questions_database.get_question(settings, external_questions=session.get_questions())
-    session.set_question(question)
-    database.sessions.update_one({"session_id": session.session_id}, {"$set": session.to_dict()})
-    await connection_manager.broadcast(session_id=session.session_id, message=get_session_message(session.session_id, username, "question"))
+    question = await async_questions_database.get_question(settings, external_questions=session.get_questions())
+    max_count = async_questions_database.last_questions_count
 
+    # вопрос мог уже смениться на другом воркере, тогда сгенерированный вопрос отбрасывается
+    if (advanced := await sessions_manager.advance(session, question, answered_question=answered_question, max_count=max_count)) is None:
+        return None
 
-async def check_all_answered(session_id: str, username: str) -> None:
-    session = database.get_session(session_id=session_id)
+    await broadcast_event(advanced, username, "question", **await get_question_payload(advanced))
+    return advanced
 
-    if not session or session.question is None or len(session.players) < 2 or not session.all_answered():
-        return
 
-    question = session.question
-    answers = []
+async def check_all_answered(session: Session, username: str) -> Optional[Session]:
+    if session.question is None or len(session.players) < 2 or not session.all_answered():
+        return None
 
-    for player, answer in session.answers.items():
-        answers.append(answer.correct)
+    # переход меняет локальную копию сессии, поэтому вопрос и ответы раунда запоминаются до него
+    question, username2answer = session.question, session.answers
+    answers = [answer.correct for answer in username2answer.values()]
+    answered_question = Question.from_dict(question.to_dict())
+    answered_question.username = ""
+    answered_question.set_answer(QuestionAnswer(correct=sum(answers) > len(answers) * 0.4, answer_time=None))
 
-        question.username = player
-        question.set_answer(answer)
-        database.questions.insert_one(question.to_dict())
+    if (advanced := await get_session_question(session=session, username=username, answered_question=answered_question)) is None:
+        return None
 
-    question.username = ""
-    question.set_answer(QuestionAnswer(correct=sum(answers) > len(answers) * 0.4, answer_time=None))
-    session.add_question(question)
-    database.sessions.update_one({"session_id": session_id}, {"$set": session.to_dict()})
+    # ответы сохраняет только воркер, выполнивший переход, поэтому они не дублируются
+    await async_questions_database.add_answered_questions(question=question, username2answer=username2answer)
+    return advanced
 
-    await get_session_question(session_id=session_id, username=username)
 
-
-async def handle_player_answer(session_id: str, username: str, answer: QuestionAnswer) -> None:
-    session = database.get_session(session_id=session_id)
-    if not session:
+async def handle_player_answer(session: Session, username: str, answer: QuestionAnswer, round_number: int) -> None:
+    if (session := await sessions_manager.add_answer(session, username=username, answer=answer, round_number=round_number)) is None:
         return
 
-    session.add_answer(username=username, answer=answer)
-    database.sessions.update_one({"session_id": session.session_id}, {"$set": session.to_dict()})
-    await connection_manager.broadcast(session_id=session.session_id, message=get_session_message(session.session_id, username, "answer"))
-    await check_all_answered(session_id=session_id, username=username)
+    await broadcast_event(session, username, "answer", answer=answer.to_dict(), round_number=round_number)
+    await check_all_answered(session=session, username=username)
 
 
-async def update_settings(session_id: str, settings: dict, username: str) -> None:
-    session = database.get_session(session_id=session_id)
+async def update_settings(session: Session, settings: dict, username: str) -> None:
+    if (session := await sessions_manager.update_settings(session, question_settings=QuestionSettings.from_dict(settings))) is not None:
+        await broadcast_event(session, username, "settings", question_settings=session.question_settings.to_dict())
 
+
+async def handle_message(session_id: str, username: str, message: dict, websocket: WebSocket) -> None:
+    session = await sessions_manager.get_session(session_id=session_id)
     if not session:
         return
 
-    question_settings = QuestionSettings.from_dict(settings)
-    if session.update_settings(question_settings=question_settings):
-        database.sessions.update_one({"session_id": session.session_id}, {"$set": session.to_dict()})
-        await connection_manager.broadcast(session_id=session_id, message=get_session_message(session_id, username, "settings"))
+    if message["action"] == "answer":
+        round_number = message.get("round_number", session.round_number)
+        await handle_player_answer(session=session, username=username, answer=QuestionAnswer.from_dict(message), round_number=round_number)
+    elif message["action"] == "settings":
+        await update_settings(session=session, settings=message["settings"], username=username)
+    elif message["action"] == "resync":
+        # снимок строится по состоянию из базы, локальная копия могла отстать от других воркеров
+        sessions_manager.release_session(session_id)
+        if session := await sessions_manager.get_session(session_id=session_id):
+            await connection_manager.send_personal(websocket, session_id=session_id, message=await get_session_snapshot(session))
+    elif message["action"] == "message":
+        await connection_manager.broadcast(session_id=session_id, message={"action": "message", "username": username, "text": message["text"]})
+    elif message["action"] == "reaction":
+        await connection_manager.broadcast(session_id=session_id, message={"action": "reaction", "username": username, "reaction": message["reaction"]})
+    elif message["action"] == "remove" and message["username"] == session.created_by:
+        await connection_manager.broadcast(session_id=session_id, message={"action": "remove", "username": username, "created_by": session.created_by}, sequenced=True)
+        await sessions_manager.remove_session(session_id)
+        await websocket.close()
 
 
 @router.websocket("/ws/{session_id}")
 async def handle_websocket(websocket: WebSocket, session_id: str, quiz_token: str = Cookie(None)) -> None:
+    # идентификатор сессии передаётся в кадрах шины, поэтому разделители в нём недопустимы
+    if not re.fullmatch(SESSION_ID_PATTERN, session_id):
+        await websocket.close(code=1008)
+        raise HTTPException(status_code=400, detail="Invalid session id")
+
     user = await token_to_user(quiz_token)
 
     if not user:
         await websocket.close(code=1008)
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    session = database.get_session(session_id=session_id)
-    if not session:
-        await websocket.close(code=1003)
-        raise HTTPException(status_code=404, detail="Session not found")
+    async with sessions_manager.lock(session_id):
+        session = await sessions_manager.get_session(session_id=session_id)
+        if session is not None:
+            session = await sessions_manager.add_player(session, user.username)
+
+        if not session:
+            await websocket.close(code=1003)
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # событие подключения несёт номер изменения, добавившего игрока, поэтому рассылается раньше следующего вопроса
+        await broadcast_event(session, user.username, "connect", player=get_player(user))
 
-    session.add_player(user.username)
-    database.sessions.update_one({"session_id": session_id}, {"$set": session.to_dict()})
+        if len(session.players) > 1:
+            if session.question is None:
+                await get_session_question(session=session, username=user.username)
+            else:
+                await check_all_answered(session=session, username=user.username)
 
-    if len(session.players) > 1:
-        if session.question is None:
-            await get_session_question(session_id=session_id, username=user.username)
-        else:
-            await check_all_answered(session_id=session_id, username=user.username)
+        logger.info(f'@{user.username} connected to the session "{session_id}"')
+        await connection_manager.connect(websocket, session_id=session_id)
+        if (session := await sessions_manager.get_session(session_id=session_id)) is None:
+            await websocket.close(code=1003)
+            return
 
-    logger.info(f'@{user.username} connected to the session "{session_id}"')
-    await connection_manager.connect(websocket, session_id=session_id)
-    asyncio.create_task(connection_manager.ping(websocket, session_id=session_id))
-    await connection_manager.broadcast(session_id=session_id, message=get_session_message(session_id, user.username, "connect"))
+        await connection_manager.send_personal(websocket, session_id=session_id, message=await get_session_snapshot(session))
 
     try:
         while True:
             message = await websocket.receive_text()
 
             if message == "pong":
+                connection_manager.pong(websocket, session_id=session_id)
                 continue
 
-            message = json.loads(message)
-            session = database.get_session(session_id=session_id)
-
-            if message["action"] == "answer":
-                await handle_player_answer(session_id=session_id, username=user.username, answer=QuestionAnswer.from_dict(message))
-            elif message["action"] == "settings":
-                await update_settings(session_id=session_id, settings=message["settings"], username=user.username)
-            elif message["action"] == "message":
-                await connection_manager.broadcast(session_id=session_id, message={"action": "message", "username": user.username, "text": message["text"]})
-            elif message["action"] == "reaction":
-                await connection_manager.broadcast(session_id=session_id, message={"action": "reaction", "username": user.username, "reaction": message["reaction"]})
-            elif message["action"] == "remove" and message["username"] == session.created_by:
-                await connection_manager.broadcast(session_id=session_id, message=get_session_message(session_id, user.username, "remove"))
-                database.sessions.delete_one({"session_id": session_id})
-                await websocket.close()
+            async with sessions_manager.lock(session_id):
+                await handle_message(session_id=session_id, username=user.username, message=json.loads(message), websocket=websocket)
     except (WebSocketDisconnect, OSError, RuntimeError):
         connection_manager.disconnect(websocket, session_id=session_id)
         logger.info(f'@{user.username} disconnected from the session "{session_id}"')
 
-        if session := database.get_session(session_id=session_id):
-            session.remove_player(user.username)
-            database.sessions.update_one({"session_id": session_id}, {"$set": session.to_dict()})
+        async with sessions_manager.lock(session_id):
+            if session := await sessions_manager.get_session(session_id=session_id):
+                session = await sessions_manager.remove_player(session, user.username)
+
+            if session:
+                await broadcast_event(session, user.username, "disconnect")
+                await check_all_answered(session=session, username="")
+
+        # состояние сессии без подключений восстановится из базы при следующем подключении
+        if session_id not in connection_manager.active_connections:
+            sessions_manager.release_session(session_id)
+
+
+@router.get("/connection-statistics")
+def get_connection_statistics(user: Optional[User] = Depends(get_user)) -> JSONResponse:
+    if not user:
+        return JSONResponse({"status": "error", "message": "Пользователь не авторизован"})
+
+    if user.role == UserRole.USER:
+        return JSONResponse({"status": "error", "message": "Пользователь не является администратором"})
 
-        await connection_manager.broadcast(session_id=session_id, message=get_session_message(session_id, user.username, "disconnect"))
-        await check_all_answered(session_id=session_id, username="")
+    return JSONResponse({"status": "success", "statistics": connection_manager.get_statistics()})
 
 
 @router.get("/multi-player")
 def multi_player(session_id: str = Query(""), user: Optional[User] = Depends(get_user)) -> Response:
-    if not re.fullmatch(r"[a-zA-Z\d_\-]+", session_id):
+    if not re.fullmatch(SESSION_ID_PATTERN, session_id):
         session_id = ""
 
     if not user:
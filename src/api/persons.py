@@ -1,11 +1,10 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse
 
 from src import movie_database, questions_database
-from src.api import send_error, templates
+from src.api import EntityJSONResponse, send_error, templates
 from src.entities.user import User
 from src.query_params.person_movies import PersonMovies
 from src.utils.auth import get_user
@@ -31,15 +30,15 @@ def get_person(person_id: int, user: Optional[User] = Depends(get_user)) -> HTML
 
 
 @router.post("/person-movies")
-def get_person_movies(params: PersonMovies, user: Optional[User] = Depends(get_user)) -> JSONResponse:
+def get_person_movies(params: PersonMovies, user: Optional[User] = Depends(get_user)) -> EntityJSONResponse:
     total, movies = movie_database.get_person_movies(params=params)
     person_id2person = movie_database.get_movies_persons(movies=movies)
     movie_id2scale = questions_database.get_movies_scales(user=user, movies=movies)
 
-    return JSONResponse({
+    return EntityJSONResponse({
         "status": "success",
         "total": total,
-        "movies": jsonable_encoder(movies),
-        "person_id2person": jsonable_encoder(person_id2person),
-        "movie_id2scale": jsonable_encoder(movie_id2scale)
+        "movies": movies,
+        "person_id2person": person_id2person,
+        "movie_id2scale": movie_id2scale
     })
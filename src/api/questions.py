@@ -1,11 +1,11 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import HTMLResponse, JSONResponse, Response
 
 from src import database, movie_database, questions_database
-from src.api import login_redirect, send_error, templates
+from src.api import EntityJSONResponse, login_redirect, send_error, templates
 from src.entities.question_answer import QuestionAnswer
 from src.entities.user import User
 from src.utils.auth import get_user
@@ -15,17 +15,18 @@ router = APIRouter()
 
 
 @router.get("/question")
-def get_question(user: Optional[User] = Depends(get_user)) -> Response:
+def get_question(background_tasks: BackgroundTasks, user: Optional[User] = Depends(get_user)) -> Response:
     if not user:
         return login_redirect(back_url="/question")
 
-    settings = database.get_settings(username=user.username)
+    settings = database.get_settings(username=user.username, cached=False)
     question = questions_database.get_question(settings)
 
     if question is None:
         return send_error(user=user, title="Не удалось сгенерировать вопрос", text='Нет КМС, удовлетворяющих выбранным <a class="link" href="/settings">настройкам</a>.')
 
-    movie = movie_database.get_movie(movie_id=question.movie_id)
+    background_tasks.add_task(questions_database.fill_question_queue, settings)
+    movie = movie_database.get_movie_card(movie_id=question.movie_id)
     person_id2person = movie_database.get_movies_persons(movies=[movie])
     movie_id2scale = questions_database.get_movies_scales(user=user, movies=[movie])
 
@@ -42,7 +43,7 @@ def get_question(user: Optional[User] = Depends(get_user)) -> Response:
 
 
 @router.post("/answer-question")
-def answer_question(answer: QuestionAnswer, user: Optional[User] = Depends(get_user)) -> JSONResponse:
+def answer_question(answer: QuestionAnswer, background_tasks: BackgroundTasks, user: Optional[User] = Depends(get_user)) -> JSONResponse:
     if not user:
         return JSONResponse({"status": "error", "message": "Пользователь не авторизован"})
 
@@ -51,20 +52,22 @@ def answer_question(answer: QuestionAnswer, user: Optional[User] = Depends(get_u
 
     questions_database.answer_question(user.username, answer)
 
-    settings = database.get_settings(username=user.username)
+    settings = database.get_settings(username=user.username, cached=False)
     question = questions_database.get_question(settings)
 
     if question is None:
         return JSONResponse({"status": "success", "question": None, "message": "Нет КМС, удовлетворяющих выбранным настройкам."})
 
-    movie = movie_database.get_movie(movie_id=question.movie_id)
+    # следующие вопросы готовятся после отправки ответа, чтобы не задерживать его
+    background_tasks.add_task(questions_database.fill_question_queue, settings)
+    movie = movie_database.get_movie_card(movie_id=question.movie_id)
     person_id2person = movie_database.get_movies_persons(movies=[movie])
     movie_id2scale = questions_database.get_movies_scales(user=user, movies=[movie])
 
-    return JSONResponse({
+    return EntityJSONResponse({
         "status": "success",
-        "question": jsonable_encoder(question),
-        "movie": jsonable_encoder(movie),
-        "person_id2person": jsonable_encoder(person_id2person),
-        "movie_id2scale": jsonable_encoder(movie_id2scale)
+        "question": question,
+        "movie": movie,
+        "person_id2person": person_id2person,
+        "movie_id2scale": movie_id2scale
     })
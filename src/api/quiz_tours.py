@@ -5,7 +5,7 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 
 from src import database, movie_database, questions_database, quiz_tours_database
-from src.api import login_redirect, send_error, templates
+from src.api import EntityJSONResponse, login_redirect, send_error, templates
 from src.entities.quiz_tour import QuizTour
 from src.entities.quiz_tour_question_answer import QuizTourQuestionAnswer
 from src.entities.user import User
@@ -30,10 +30,9 @@ def get_quiz_tours(params: QuizToursSearchQuery = Depends(), user: Optional[User
 
 
 @router.post("/quiz-tours")
-def search_quiz_tours(params: QuizToursSearch, user: Optional[User] = Depends(get_user)) -> JSONResponse:
-    total, quiz_tours = quiz_tours_database.get_quiz_tours(username=user.username if user else None, params=params)
-    quiz_tour_id2statuses = quiz_tours_database.get_quiz_tours_statuses(username=user.username, quiz_tours=quiz_tours) if user else {}
-    return JSONResponse({"status": "success", "total": total, "quiz_tours": jsonable_encoder(quiz_tours), "statuses": quiz_tour_id2statuses})
+def search_quiz_tours(params: QuizToursSearch, user: Optional[User] = Depends(get_user)) -> EntityJSONResponse:
+    total, quiz_tours, quiz_tour_id2statuses = quiz_tours_database.get_quiz_tours(username=user.username if user else None, params=params)
+    return EntityJSONResponse({"status": "success", "total": total, "quiz_tours": quiz_tours, "statuses": quiz_tour_id2statuses})
 
 
 @router.get("/quiz-tours/{quiz_tour_id}")
@@ -53,7 +52,7 @@ def get_quiz_tour_question(quiz_tour_id: int, user: Optional[User] = Depends(get
 
     question = quiz_tour_question.question
 
-    movie = movie_database.get_movie(movie_id=question.movie_id)
+    movie = movie_database.get_movie_card(movie_id=question.movie_id)
     person_id2person = movie_database.get_movies_persons(movies=[movie])
     movie_id2scale = questions_database.get_movies_scales(user=user, movies=[movie])
 
@@ -89,7 +88,7 @@ def get_quiz_tour(quiz_tour_id: int, user: Optional[User] = Depends(get_user)) -
     statuses = quiz_tours_database.get_quiz_tours_statuses(username=user.username, quiz_tours=[quiz_tour])
     movie_id2status = quiz_tours_database.get_quiz_tour_movies_statuses(quiz_tour=quiz_tour)
     movie_id2correct = quiz_tours_database.get_quiz_tour_movie_results(username=user.username, quiz_tour=quiz_tour)
-    movies = movie_database.get_movies(list(movie_id2correct))
+    movies = movie_database.get_movie_cards(list(movie_id2correct))
     person_id2person = movie_database.get_movies_persons(movies=movies)
     movie_id2scale = questions_database.get_movies_scales(user=user, movies=movies)
 
@@ -131,7 +130,7 @@ def answer_quiz_tour_question(answer: QuizTourQuestionAnswer, user: Optional[Use
 
     question = quiz_tour_question.question
 
-    movie = movie_database.get_movie(movie_id=question.movie_id)
+    movie = movie_database.get_movie_card(movie_id=question.movie_id)
     person_id2person = movie_database.get_movies_persons(movies=[movie])
     movie_id2scale = questions_database.get_movies_scales(user=user, movies=[movie])
 
@@ -21,7 +21,7 @@ def get_settings(user: Optional[User] = Depends(get_user)) -> Response:
     if not user:
         return login_redirect(back_url="/settings")
 
-    settings = database.get_settings(username=user.username)
+    settings = database.get_settings(username=user.username, cached=False)
     template = templates.get_template("user/settings.html")
     content = template.render(
         user=user,
@@ -41,7 +41,7 @@ def update_main_settings(main_settings: MainSettings, user: Optional[User] = Dep
     if not user:
         return JSONResponse({"status": "error", "message": "Пользователь не авторизован"})
 
-    settings = database.get_settings(username=user.username)
+    settings = database.get_settings(username=user.username, cached=False)
     database.update_settings(settings.update_main(main_settings))
     return JSONResponse({"status": "success"})
 
@@ -51,7 +51,8 @@ def update_question_settings(question_settings: QuestionSettings, user: Optional
     if not user:
         return JSONResponse({"status": "error", "message": "Пользователь не авторизован"})
 
-    settings = database.get_settings(username=user.username)
+    settings = database.get_settings(username=user.username, cached=False)
     database.update_settings(settings.update_question(question_settings))
+    questions_database.clear_question_queue(username=user.username)
     movies = len(questions_database.get_question_movies(settings.question_settings))
     return JSONResponse({"status": "success", "movies": movies})
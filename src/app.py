@@ -6,8 +6,10 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from uvicorn.config import LOGGING_CONFIG
 
-from src import database
-from src.api import analytics, api, auth, movies, multi_player, persons, questions, quiz_tours, settings, tracks
+from src import database, logger
+from src.api import analytics, api, auth, movies, multi_player, persons, precompile_templates, questions, quiz_tours, settings, tracks
+from src.utils.common import static_manifest
+from src.utils.static_manifest import ImmutableStaticFiles
 
 
 def init_routers() -> None:
@@ -24,8 +26,8 @@ def init_routers() -> None:
 
 
 def init_static_directories() -> None:
-    app.mount("/styles", StaticFiles(directory="web/styles"))
-    app.mount("/js", StaticFiles(directory="web/js"))
+    app.mount("/styles", ImmutableStaticFiles(directory="web/styles"))
+    app.mount("/js", ImmutableStaticFiles(directory="web/js"))
     app.mount("/fonts", StaticFiles(directory="web/fonts"))
     app.mount("/images", StaticFiles(directory="web/images"))
     app.mount("/profile-images", StaticFiles(directory="../plush-anvil/web/images/profiles"))
@@ -41,7 +43,11 @@ def init_logging_config() -> None:
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncContextManager[None]:
     database.connect()
+    logger.info(f"Precompiled {precompile_templates()} templates")
+    logger.info(f"Built static files manifest {static_manifest.get_version()}")
+    await multi_player.connection_manager.start()
     yield
+    await multi_player.connection_manager.stop()
     database.close()
 
 
@@ -1,5 +1,6 @@
-import re
-from typing import List, Optional
+import copy
+from dataclasses import replace
+from typing import Dict, List, Optional
 
 from pymongo import ASCENDING, MongoClient
 
@@ -7,6 +8,10 @@ from src.entities.session import Session
 from src.entities.settings import Settings
 from src.entities.user import User
 from src.enums import UserRole
+from src.utils.indexes import create_indexes
+from src.utils.ttl_cache import TTLCache
+
+USERNAME_COLLATION = {"locale": "en", "strength": 2}
 
 
 class Database:
@@ -16,6 +21,8 @@ class Database:
     roles = None
     settings = None
     questions = None
+    queued_questions = None
+    movie_scales = None
     movies = None
     tracks = None
     persons = None
@@ -24,11 +31,19 @@ class Database:
     quiz_tours = None
     quiz_tour_questions = None
     quiz_tour_answers = None
+    quiz_tour_scores = None
+    quiz_tour_statistics = None
     sessions = None
+    session_questions = None
 
-    def __init__(self, mongo_url: str, database_name: str) -> None:
+    def __init__(self, mongo_url: str, database_name: str, users_cache_ttl: float = 300, roles_cache_ttl: float = 15, settings_cache_ttl: float = 60) -> None:
         self.mongo_url = mongo_url
         self.database_name = database_name
+        self.users_cache: TTLCache[User] = TTLCache(ttl=users_cache_ttl)
+        # кеши свои у каждого процесса, и update_role сбрасывает только кеш своего процесса,
+        # поэтому роль хранится отдельно от профиля и остальные воркеры увидят её изменение не позже чем через roles_cache_ttl
+        self.roles_cache: TTLCache[UserRole] = TTLCache(ttl=roles_cache_ttl)
+        self.settings_cache: TTLCache[Settings] = TTLCache(ttl=settings_cache_ttl)
 
     def connect(self) -> None:
         self.client = MongoClient(self.mongo_url)
@@ -36,84 +51,129 @@ class Database:
 
         self.identifiers = database["identifiers"]
 
-        for name in ["movies", "cites", "tracks", "persons", "quiz_tours", "quiz_tour_questions"]:
+        for name in ["movies", "movies_version", "cites", "tracks", "persons", "quiz_tours", "quiz_tour_questions", "quiz_tour_scores"]:
             if self.identifiers.find_one({"_id": name}) is None:
                 self.identifiers.insert_one({"_id": name, "value": 0})
 
         self.users = self.client["quiz"]["users"]
+        # коллекция пользователей общая с quiz, поэтому индекс без учёта регистра создаётся отдельно от реестра
+        self.users.create_index([("username", ASCENDING)], name="username_case_insensitive", collation=USERNAME_COLLATION)
         self.roles = database["roles"]
-        self.roles.create_index([("username", ASCENDING)], unique=True)
-
         self.settings = database["settings"]
-        self.settings.create_index([("username", ASCENDING)], unique=True)
-
         self.questions = database["questions"]
-        self.questions.create_index([("username", ASCENDING)])
-        self.questions.create_index([("datetime", ASCENDING)])
-
+        self.queued_questions = database["queued_questions"]
+        self.movie_scales = database["movie_scales"]
         self.movies = database["movies"]
-        self.movies.create_index([("movie_id", ASCENDING)], unique=True)
-        self.movies.create_index([("name", ASCENDING)])
-
         self.persons = database["persons"]
-        self.persons.create_index([("person_id", ASCENDING)], unique=True)
-
         self.tracks = database["tracks"]
-        self.tracks.create_index([("track_id", ASCENDING)], unique=True)
-        self.tracks.create_index([("movie_id", ASCENDING)])
-
         self.cites = database["cites"]
-        self.cites.create_index([("cite_id", ASCENDING)], unique=True)
-        self.cites.create_index([("movie_id", ASCENDING)])
-
         self.history = database["history"]
-        self.history.create_index([("username", ASCENDING)])
-        self.history.create_index([("timestamp", ASCENDING)])
-
         self.quiz_tours = database["quiz_tours"]
-        self.quiz_tours.create_index(([("quiz_tour_id", ASCENDING)]), unique=True)
-
         self.quiz_tour_questions = database["quiz_tour_questions"]
-        self.quiz_tour_questions.create_index(([("question_id", ASCENDING)]), unique=True)
-
         self.quiz_tour_answers = database["quiz_tour_answers"]
-        self.quiz_tour_answers.create_index(([("username", ASCENDING)]))
-        self.quiz_tour_answers.create_index(([("correct", ASCENDING)]))
-
+        self.quiz_tour_scores = database["quiz_tour_scores"]
+        self.quiz_tour_statistics = database["quiz_tour_statistics"]
         self.sessions = database["sessions"]
-        self.sessions.create_index([("session_id", ASCENDING)], unique=True)
+        self.session_questions = database["session_questions"]
 
-    def get_user(self, username: str) -> Optional[User]:
+        create_indexes(database)
+
+    def get_user(self, username: str, cached: bool = True) -> Optional[User]:
         if not username:
             return None
 
-        user: dict = self.users.find_one({"username": {"$regex": f"^{re.escape(username)}$", "$options": "i"}})
+        # наружу отдаются копии, чтобы изменения в обработчиках не попадали в общий кеш
+        if cached and (user := self.users_cache.get(username.lower())) is not None:
+            return replace(user, role=self.__get_roles([user.username])[user.username])
+
+        user: dict = self.users.find_one({"username": username}, collation=USERNAME_COLLATION)
         if not user:
             return None
 
-        role = self.roles.find_one({"username": user["username"]})
-        return User.from_quiz_dict(user, UserRole(role["role"]) if role else UserRole.USER)
+        self.roles_cache.remove(user["username"])
+        user = User.from_quiz_dict(user, self.__get_roles([user["username"]])[user["username"]])
+        self.users_cache.put(user.username.lower(), user)
+        return replace(user)
 
     def get_users(self, usernames: List[str]) -> List[User]:
-        users = self.users.find({"username": {"$in": usernames}})
-        username2role = {role["username"]: UserRole(role["role"]) for role in self.roles.find({"username": {"$in": usernames}})}
-        return [User.from_quiz_dict(user, username2role.get(user["username"], UserRole.USER)) for user in users]
+        usernames = list(dict.fromkeys(usernames))
+        username2user = {}
+
+        for username in usernames:
+            if (user := self.users_cache.get(username.lower())) is not None and user.username == username:
+                username2user[username] = user
+
+        missed_usernames = [username for username in usernames if username not in username2user]
+        username2role = self.__get_roles(usernames)
+
+        if missed_usernames:
+            for user in self.users.find({"username": {"$in": missed_usernames}}):
+                user = User.from_quiz_dict(user, username2role[user["username"]])
+                username2user[user.username] = user
+                self.users_cache.put(user.username.lower(), user)
+
+        return [replace(username2user[username], role=username2role[username]) for username in usernames if username in username2user]
+
+    def update_role(self, username: str, role: UserRole) -> None:
+        self.roles.update_one({"username": username}, {"$set": {"role": role.value}}, upsert=True)
+        self.invalidate_user(username=username)
+
+    def invalidate_user(self, username: str) -> None:
+        self.users_cache.remove(username.lower())
+        self.roles_cache.remove(username)
+
+    def __get_roles(self, usernames: List[str]) -> Dict[str, UserRole]:
+        username2role = {}
+
+        for username in usernames:
+            if (role := self.roles_cache.get(username)) is not None:
+                username2role[username] = role
+
+        if missed_usernames := [username for username in usernames if username not in username2role]:
+            found_roles = {role["username"]: UserRole(role["role"]) for role in self.roles.find({"username": {"$in": missed_usernames}})}
+
+            for username in missed_usernames:
+                username2role[username] = found_roles.get(username, UserRole.USER)
+                self.roles_cache.put(username, username2role[username])
+
+        return username2role
 
     def get_identifier(self, collection_name: str) -> int:
         identifier = self.identifiers.find_one_and_update({"_id": collection_name}, {"$inc": {"value": 1}}, return_document=True)
         return identifier["value"]
 
-    def get_settings(self, username: str) -> Settings:
-        settings = self.settings.find_one_and_update({"username": username}, {"$setOnInsert": Settings.default(username).to_dict()}, upsert=True, return_document=True)
-        return Settings.from_dict(settings)
+    # кеш настроек свой у каждого процесса и может отставать от записей других воркеров на settings_cache_ttl,
+    # поэтому обработчики, которые сохраняют настройки или выдают по ним вопросы, читают их с cached=False
+    def get_settings(self, username: str, cached: bool = True) -> Settings:
+        if not cached or (settings := self.settings_cache.get(username)) is None:
+            settings = self.__load_settings(username=username)
+            self.settings_cache.put(username, settings)
+
+        # настройки изменяются обработчиками, поэтому наружу отдаётся копия
+        return copy.deepcopy(settings)
 
     def update_settings(self, settings: Settings) -> None:
         self.settings.update_one({"username": settings.username}, {"$set": settings.to_dict()})
+        self.settings_cache.put(settings.username, copy.deepcopy(settings))
+
+    def get_cache_statistics(self) -> dict:
+        return {
+            "users": {"hits": self.users_cache.hits, "misses": self.users_cache.misses},
+            "settings": {"hits": self.settings_cache.hits, "misses": self.settings_cache.misses}
+        }
 
     def get_session(self, session_id: str) -> Optional[Session]:
         session: dict = self.sessions.find_one({"session_id": session_id})
         return Session.from_dict(session) if session else None
 
+    def __load_settings(self, username: str) -> Settings:
+        if (settings := self.settings.find_one({"username": username})) is not None:
+            return Settings.from_dict(settings)
+
+        settings = Settings.default(username)
+        self.settings.update_one({"username": username}, {"$setOnInsert": settings.to_dict()}, upsert=True)
+        return settings
+
     def drop(self) -> None:
         self.client.drop_database(self.database_name)
 
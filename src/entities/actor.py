@@ -1,7 +1,9 @@
 from dataclasses import dataclass
 
+from src.utils.json_codec import decode_dataclass
 
-@dataclass
+
+@dataclass(slots=True)
 class Actor:
     person_id: int
     description: str
@@ -12,9 +14,4 @@ class Actor:
             "description": self.description
         }
 
-    @classmethod
-    def from_dict(cls: "Actor", data: dict) -> "Actor":
-        return cls(
-            person_id=data["person_id"],
-            description=data["description"]
-        )
+    from_dict = classmethod(decode_dataclass)
@@ -2,9 +2,10 @@ from dataclasses import dataclass
 
 from src.entities.metadata import Metadata
 from src.entities.spoiler_text import SpoilerText
+from src.utils.json_codec import decode_dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Cite:
     cite_id: int
     movie_id: int
@@ -19,11 +20,4 @@ class Cite:
             "metadata": self.metadata.to_dict()
         }
 
-    @classmethod
-    def from_dict(cls: "Cite", data: dict) -> "Cite":
-        return cls(
-            cite_id=data["cite_id"],
-            movie_id=data["movie_id"],
-            text=SpoilerText.from_dict(data["text"]),
-            metadata=Metadata.from_dict(data["metadata"])
-        )
+    from_dict = classmethod(decode_dataclass)
@@ -2,9 +2,10 @@ from dataclasses import dataclass
 from typing import List
 
 from src.entities.lyrics_line import LyricsLine
+from src.utils.json_codec import decode_dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Lyrics:
     lines: List[LyricsLine]
     lrc: bool
@@ -30,12 +31,7 @@ class Lyrics:
             "lrc": self.lrc
         }
 
-    @classmethod
-    def from_dict(cls: "Lyrics", data: dict) -> "Lyrics":
-        return cls(
-            lines=[LyricsLine.from_dict(line) for line in data["lines"]],
-            lrc=data["lrc"]
-        )
+    from_dict = classmethod(decode_dataclass)
 
     def get_text(self) -> str:
         return "\n".join(line.text for line in self.lines)
@@ -3,8 +3,10 @@ from dataclasses import dataclass
 
 from Levenshtein import ratio
 
+from src.utils.json_codec import decode_dataclass
 
-@dataclass
+
+@dataclass(slots=True)
 class LyricsLine:
     time: float
     text: str
@@ -12,9 +14,7 @@ class LyricsLine:
     def to_dict(self) -> dict:
         return {"time": self.time, "text": self.text}
 
-    @classmethod
-    def from_dict(cls: "LyricsLine", data: dict) -> "LyricsLine":
-        return cls(time=data["time"], text=data["text"])
+    from_dict = classmethod(decode_dataclass)
 
     @classmethod
     def from_lrc(cls: "LyricsLine", lrc_line: str) -> "LyricsLine":
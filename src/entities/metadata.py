@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from datetime import datetime
 
+from src.utils.json_codec import decode_dataclass
 
-@dataclass
+
+@dataclass(slots=True)
 class Metadata:
     created_by: str
     created_at: datetime
@@ -17,9 +19,7 @@ class Metadata:
             "updated_at": self.updated_at
         }
 
-    @classmethod
-    def from_dict(cls: "Metadata", data: dict) -> "Metadata":
-        return cls(created_by=data["created_by"], created_at=data["created_at"], updated_by=data["updated_by"], updated_at=data["updated_at"])
+    from_dict = classmethod(decode_dataclass)
 
     @classmethod
     def initial(cls: "Metadata", username: str) -> "Metadata":
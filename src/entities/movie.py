@@ -8,9 +8,10 @@ from src.entities.rating import Rating
 from src.entities.source import Source
 from src.entities.spoiler_text import SpoilerText
 from src.enums import Genre, MovieType, Production, QuestionType
+from src.utils.json_codec import decode_dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Movie:
     movie_id: int
     name: str
@@ -65,34 +66,7 @@ class Movie:
             "metadata": self.metadata.to_dict()
         }
 
-    @classmethod
-    def from_dict(cls: "Movie", data: dict) -> "Movie":
-        return cls(
-            movie_id=data["movie_id"],
-            name=data["name"],
-            source=Source.from_dict(data["source"]),
-            movie_type=MovieType(data["movie_type"]),
-            year=data["year"],
-            slogan=data["slogan"],
-            description=SpoilerText.from_dict(data["description"]),
-            short_description=SpoilerText.from_dict(data["short_description"]),
-            production=[Production(production) for production in data["production"]],
-            countries=data["countries"],
-            genres=[Genre(genre) for genre in data["genres"]],
-            actors=[Actor.from_dict(actor) for actor in data["actors"]],
-            directors=[Actor.from_dict(director) for director in data["directors"]],
-            duration=data["duration"],
-            rating=Rating.from_dict(data["rating"]),
-            image_urls=data["image_urls"],
-            poster_url=data["poster_url"],
-            banner_url=data["banner_url"],
-            facts=[SpoilerText.from_dict(fact) for fact in data["facts"]],
-            cites=data["cites"],
-            tracks=data["tracks"],
-            alternative_names=data["alternative_names"],
-            sequels=data["sequels"],
-            metadata=Metadata.from_dict(data["metadata"])
-        )
+    from_dict = classmethod(decode_dataclass)
 
     def get_diff(self, data: dict) -> dict:
         movie_data = self.to_dict()
@@ -0,0 +1,41 @@
+from dataclasses import dataclass, fields
+from typing import List
+
+from src.entities.actor import Actor
+from src.entities.metadata import Metadata
+from src.entities.rating import Rating
+from src.entities.source import Source
+from src.entities.spoiler_text import SpoilerText
+from src.enums import Genre, MovieType, Production
+from src.utils.json_codec import decode_dataclass
+
+
+# поля фильма, которые нужны для карточки и информационной панели (без фактов, цитат, треков и сиквелов)
+@dataclass(slots=True)
+class MovieCard:
+    movie_id: int
+    name: str
+    source: Source
+    movie_type: MovieType
+    year: int
+    slogan: str
+    description: SpoilerText
+    short_description: SpoilerText
+    production: List[Production]
+    countries: List[str]
+    genres: List[Genre]
+    actors: List[Actor]
+    directors: List[Actor]
+    duration: float
+    rating: Rating
+    image_urls: List[str]
+    poster_url: str
+    banner_url: str
+    alternative_names: List[str]
+    metadata: Metadata
+
+    @classmethod
+    def get_projection(cls: "MovieCard") -> dict:
+        return {"_id": 0, **{field.name: 1 for field in fields(cls)}}
+
+    from_dict = classmethod(decode_dataclass)
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 
 from src.entities.metadata import Metadata
+from src.utils.json_codec import decode_dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Person:
     person_id: int
     kinopoisk_id: int
@@ -20,15 +21,7 @@ class Person:
             "metadata": self.metadata.to_dict()
         }
 
-    @classmethod
-    def from_dict(cls: "Person", data: dict) -> "Person":
-        return cls(
-            person_id=data["person_id"],
-            kinopoisk_id=data["kinopoisk_id"],
-            name=data["name"],
-            photo_url=data["photo_url"],
-            metadata=Metadata.from_dict(data["metadata"])
-        )
+    from_dict = classmethod(decode_dataclass)
 
     def get_diff(self, data: dict) -> dict:
         person_data = self.to_dict()
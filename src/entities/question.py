@@ -1,7 +1,7 @@
 import random
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Type
 
 from typing_extensions import Self
 
@@ -47,24 +47,11 @@ class Question:
     def from_dict(cls: Self, data: dict) -> Self:
         question_type = QuestionType(data["question_type"])
 
-        if question_type == QuestionType.MOVIE_BY_SLOGAN:
-            question = MovieBySloganQuestion(title=data["title"], answer=data["answer"], slogan=data["slogan"])
-        elif question_type in [QuestionType.MOVIE_BY_SHORT_DESCRIPTION, QuestionType.MOVIE_BY_DESCRIPTION]:
-            question = MovieByDescriptionQuestion(title=data["title"], answer=data["answer"], description=SpoilerText.from_dict(data["description"]))
-        elif question_type == QuestionType.MOVIE_BY_IMAGE:
-            question = MovieByImageQuestion(title=data["title"], answer=data["answer"], image_url=data["image_url"])
-        elif question_type == QuestionType.MOVIE_BY_ACTORS:
-            actors = [Person.from_dict(actor) for actor in data["actors"]]
-            question = MovieByActorsQuestion(title=data["title"], answer=data["answer"], actors=actors, hide_actor_photos=data["hide_actor_photos"])
-        elif question_type == QuestionType.MOVIE_BY_CHARACTERS:
-            question = MovieByCharactersQuestion(title=data["title"], answer=data["answer"], characters=data["characters"])
-        elif question_type == QuestionType.MOVIE_BY_CITE:
-            question = MovieByCiteQuestion(title=data["title"], answer=data["answer"], cite=SpoilerText.from_dict(data["cite"]))
-        elif question_type == QuestionType.MOVIE_BY_TRACK:
-            question = MovieByTrackQuestion(title=data["title"], answer=data["answer"], track=Track.from_dict(data["track"]), question_seek=data["question_seek"])
-        else:
+        if question_type not in QUESTION_TYPE2CLASS:
             raise ValueError(f'Invalid question_type "{question_type}"')
 
+        question = QUESTION_TYPE2CLASS[question_type].from_fields(data)
+
         question.question_type = question_type
         question.username = data["username"]
         question.movie_id = data["movie_id"]
@@ -95,6 +82,10 @@ class Question:
 class MovieBySloganQuestion(Question):
     slogan: str
 
+    @classmethod
+    def from_fields(cls: Self, data: dict) -> Self:
+        return cls(title=data["title"], answer=data["answer"], slogan=data["slogan"])
+
     @classmethod
     def generate(cls: Self, movie: Movie, username: str) -> Self:
         question = cls(title=movie.get_question_title(" по слогану"), answer=movie.get_question_answer(), slogan=movie.slogan)
@@ -116,6 +107,10 @@ class MovieBySloganQuestion(Question):
 class MovieByDescriptionQuestion(Question):
     description: SpoilerText
 
+    @classmethod
+    def from_fields(cls: Self, data: dict) -> Self:
+        return cls(title=data["title"], answer=data["answer"], description=SpoilerText.from_dict(data["description"]))
+
     @staticmethod
     def get_title(movie: Movie, question_type: QuestionType) -> Tuple[str, SpoilerText]:
         if question_type == QuestionType.MOVIE_BY_SHORT_DESCRIPTION:
@@ -147,6 +142,10 @@ class MovieByDescriptionQuestion(Question):
 class MovieByImageQuestion(Question):
     image_url: str
 
+    @classmethod
+    def from_fields(cls: Self, data: dict) -> Self:
+        return cls(title=data["title"], answer=data["answer"], image_url=data["image_url"])
+
     @classmethod
     def generate(cls: Self, movie: Movie, username: str) -> Self:
         question = cls(title=movie.get_question_title(" по кадру"), answer=movie.get_question_answer(), image_url=movie.get_random_image_url())
@@ -172,6 +171,10 @@ class MovieByActorsQuestion(Question):
     actors: List[Person]
     hide_actor_photos: bool
 
+    @classmethod
+    def from_fields(cls: Self, data: dict) -> Self:
+        return cls(title=data["title"], answer=data["answer"], actors=[Person.from_dict(actor) for actor in data["actors"]], hide_actor_photos=data["hide_actor_photos"])
+
     @classmethod
     def generate(cls: Self, movie: Movie, username: str, person_id2person: Dict[int, Person], hide_actor_photos: bool) -> Self:
         actors = [person_id2person[actor.person_id] for actor in movie.actors[:10][::-1]]
@@ -195,6 +198,10 @@ class MovieByActorsQuestion(Question):
 class MovieByCharactersQuestion(Question):
     characters: List[str]
 
+    @classmethod
+    def from_fields(cls: Self, data: dict) -> Self:
+        return cls(title=data["title"], answer=data["answer"], characters=data["characters"])
+
     @classmethod
     def generate(cls: Self, movie: Movie, username: str) -> Self:
         characters = []
@@ -221,6 +228,10 @@ class MovieByCharactersQuestion(Question):
 class MovieByCiteQuestion(Question):
     cite: SpoilerText
 
+    @classmethod
+    def from_fields(cls: Self, data: dict) -> Self:
+        return cls(title=data["title"], answer=data["answer"], cite=SpoilerText.from_dict(data["cite"]))
+
     @classmethod
     def generate(cls: Self, movie: Movie, username: str, cite: SpoilerText) -> Self:
         question = cls(title=movie.get_question_title(" по цитате"), answer=movie.get_question_answer(), cite=cite)
@@ -242,6 +253,10 @@ class MovieByTrackQuestion(Question):
     track: Track
     question_seek: float
 
+    @classmethod
+    def from_fields(cls: Self, data: dict) -> Self:
+        return cls(title=data["title"], answer=data["answer"], track=Track.from_dict(data["track"]), question_seek=data["question_seek"])
+
     @classmethod
     def generate(cls: Self, movie: Movie, username: str, track: Track) -> Self:
         question = cls(title=movie.get_question_title(" по треку"), answer=movie.get_question_answer(), track=track, question_seek=cls.get_random_seek(track))
@@ -267,3 +282,16 @@ class MovieByTrackQuestion(Question):
             return round(random.random() * track.duration * 0.75, 2)
 
         return 0
+
+
+# классы вопросов по типу для декодирования без цепочки сравнений
+QUESTION_TYPE2CLASS: Dict[QuestionType, Type[Question]] = {
+    QuestionType.MOVIE_BY_SLOGAN: MovieBySloganQuestion,
+    QuestionType.MOVIE_BY_SHORT_DESCRIPTION: MovieByDescriptionQuestion,
+    QuestionType.MOVIE_BY_DESCRIPTION: MovieByDescriptionQuestion,
+    QuestionType.MOVIE_BY_IMAGE: MovieByImageQuestion,
+    QuestionType.MOVIE_BY_ACTORS: MovieByActorsQuestion,
+    QuestionType.MOVIE_BY_CHARACTERS: MovieByCharactersQuestion,
+    QuestionType.MOVIE_BY_CITE: MovieByCiteQuestion,
+    QuestionType.MOVIE_BY_TRACK: MovieByTrackQuestion
+}
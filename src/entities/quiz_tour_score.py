@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class QuizTourScore:
+    username: str
+    quiz_tour_id: int
+    score: float
+    finished_at: datetime
+
+    def to_dict(self) -> dict:
+        return {
+            "username": self.username,
+            "quiz_tour_id": self.quiz_tour_id,
+            "score": self.score,
+            "finished_at": self.finished_at
+        }
+
+    @classmethod
+    def from_dict(cls: "QuizTourScore", data: dict) -> "QuizTourScore":
+        return cls(
+            username=data["username"],
+            quiz_tour_id=data["quiz_tour_id"],
+            score=data["score"],
+            finished_at=data["finished_at"]
+        )
@@ -0,0 +1,37 @@
+import math
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class QuizTourStatistics:
+    quiz_tour_id: int
+    finished_count: int
+    score_sum: float
+    questions: Dict[int, Dict[str, int]]
+
+    def to_dict(self) -> dict:
+        return {
+            "quiz_tour_id": self.quiz_tour_id,
+            "finished_count": self.finished_count,
+            "score_sum": self.score_sum,
+            "questions": {str(question_id): answers for question_id, answers in self.questions.items()}
+        }
+
+    @classmethod
+    def from_dict(cls: "QuizTourStatistics", data: dict) -> "QuizTourStatistics":
+        return cls(
+            quiz_tour_id=data["quiz_tour_id"],
+            finished_count=data["finished_count"],
+            score_sum=data["score_sum"],
+            questions={int(question_id): answers for question_id, answers in data["questions"].items()}
+        )
+
+    def get_mean_score(self) -> float:
+        return self.score_sum / max(self.finished_count, 1)
+
+    def is_consistent(self, statistics: "QuizTourStatistics") -> bool:
+        if self.finished_count != statistics.finished_count or self.questions != statistics.questions:
+            return False
+
+        return math.isclose(self.score_sum, statistics.score_sum, abs_tol=1e-6)
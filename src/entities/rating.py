@@ -1,7 +1,9 @@
 from dataclasses import dataclass
 
+from src.utils.json_codec import decode_dataclass
 
-@dataclass
+
+@dataclass(slots=True)
 class Rating:
     rating_kp: float
     rating_imdb: float
@@ -14,10 +16,4 @@ class Rating:
             "votes_kp": self.votes_kp
         }
 
-    @classmethod
-    def from_dict(cls: "Rating", data: dict) -> "Rating":
-        return cls(
-            rating_kp=data["rating_kp"],
-            rating_imdb=data["rating_imdb"],
-            votes_kp=data["votes_kp"]
-        )
+    from_dict = classmethod(decode_dataclass)
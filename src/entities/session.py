@@ -5,6 +5,7 @@ from typing import Dict, List, Optional
 from src.entities.question import Question
 from src.entities.question_answer import QuestionAnswer
 from src.entities.question_settings import QuestionSettings
+from src.entities.session_question import SessionQuestion
 
 
 @dataclass
@@ -17,7 +18,9 @@ class Session:
     question: Optional[Question]
     statistics: Dict[str, List[QuestionAnswer]]
     question_settings: QuestionSettings
-    questions: List[Question]
+    questions: List[SessionQuestion]
+    round_number: int
+    seq: int
 
     @classmethod
     def from_dict(cls: "Session", data: dict) -> "Session":
@@ -30,7 +33,9 @@ class Session:
             question=Question.from_dict(data["question"]) if data["question"] else None,
             statistics={username: [QuestionAnswer.from_dict(answer) for answer in answers] for username, answers in data["statistics"].items()},
             question_settings=QuestionSettings.from_dict(data["question_settings"]),
-            questions=[Question.from_dict(question) for question in data["questions"]]
+            questions=[SessionQuestion.from_dict(question) for question in data["questions"]],
+            round_number=data.get("round_number", 0),
+            seq=data.get("seq", 0)
         )
 
     @classmethod
@@ -44,7 +49,9 @@ class Session:
             question=None,
             statistics={},
             question_settings=question_settings,
-            questions=[]
+            questions=[],
+            round_number=0,
+            seq=0
         )
 
     def to_dict(self) -> dict:
@@ -57,7 +64,9 @@ class Session:
             "question": self.question.to_dict() if self.question else None,
             "statistics": {username: [answer.to_dict() for answer in answers] for username, answers in self.statistics.items()},
             "question_settings": self.question_settings.to_dict(),
-            "questions": [question.to_dict() for question in self.questions]
+            "questions": [question.to_dict() for question in self.questions],
+            "round_number": self.round_number,
+            "seq": self.seq
         }
 
     def add_player(self, player: str) -> None:
@@ -76,8 +85,9 @@ class Session:
         self.question = question
         self.answers = {}
 
-    def add_question(self, question: Question) -> None:
+    def add_question(self, question: SessionQuestion, max_count: int) -> None:
         self.questions.append(question)
+        self.questions = self.questions[-max_count:]
 
     def all_answered(self) -> bool:
         for username in self.players:
@@ -106,5 +116,5 @@ class Session:
         self.question_settings = question_settings
         return True
 
-    def get_questions(self) -> List[Question]:
+    def get_questions(self) -> List[SessionQuestion]:
         return [question for question in self.questions[::-1]]
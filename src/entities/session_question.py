@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+
+from bson import ObjectId
+
+from src.entities.question import Question
+from src.enums import QuestionType
+
+
+@dataclass
+class SessionQuestion:
+    question_id: ObjectId
+    movie_id: int
+    question_type: QuestionType
+    correct: bool
+
+    def to_dict(self) -> dict:
+        return {
+            "question_id": self.question_id,
+            "movie_id": self.movie_id,
+            "question_type": self.question_type.value,
+            "correct": self.correct
+        }
+
+    @classmethod
+    def from_dict(cls: "SessionQuestion", data: dict) -> "SessionQuestion":
+        return cls(
+            question_id=data["question_id"],
+            movie_id=data["movie_id"],
+            question_type=QuestionType(data["question_type"]),
+            correct=data["correct"]
+        )
+
+    @classmethod
+    def from_question(cls: "SessionQuestion", question_id: ObjectId, question: Question) -> "SessionQuestion":
+        return cls(question_id=question_id, movie_id=question.movie_id, question_type=question.question_type, correct=question.correct)
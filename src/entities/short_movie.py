@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+from src.entities.rating import Rating
+from src.utils.json_codec import decode_dataclass
+
+
+# поля фильма для коротких списков на странице фильмов
+@dataclass(slots=True)
+class ShortMovie:
+    movie_id: int
+    name: str
+    poster_url: str
+    rating: Rating
+
+    @classmethod
+    def get_projection(cls: "ShortMovie") -> dict:
+        return {"_id": 0, "movie_id": 1, "name": 1, "poster_url": 1, "rating": 1}
+
+    from_dict = classmethod(decode_dataclass)
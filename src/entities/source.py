@@ -5,6 +5,10 @@ from dataclasses import dataclass, field
 class Source:
     name: str = field(init=False)
 
+    # имя источника хранится в классе, копия в экземпляре нужна для сериализации датакласса без to_dict
+    def __post_init__(self) -> None:
+        self.name = type(self).name
+
     def to_dict(self) -> dict:
         return {"name": self.name}
 
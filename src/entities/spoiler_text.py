@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class SpoilerText:
     text: str
     spoilers: List[Tuple[int, int]]
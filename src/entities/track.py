@@ -6,7 +6,7 @@ from src.entities.metadata import Metadata
 from src.entities.source import Source
 
 
-@dataclass
+@dataclass(slots=True)
 class Track:
     track_id: int
     movie_id: int
@@ -1,7 +1,8 @@
 import logging
 import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from urllib.error import HTTPError, URLError
 
 import wget
@@ -13,15 +14,20 @@ from src.entities.history_action import AddCiteAction, AddMovieAction, AddPerson
     RemoveCiteAction, RemoveMovieAction, RemovePersonAction, RemoveTrackAction
 from src.entities.metadata import Metadata
 from src.entities.movie import Movie
+from src.entities.movie_card import MovieCard
 from src.entities.person import Person
+from src.entities.question_settings import QuestionSettings
 from src.entities.quiz_tour import QuizTour
-from src.entities.session import Session
+from src.entities.short_movie import ShortMovie
 from src.entities.source import KinopoiskSource, YandexSource
 from src.entities.track import Track
 from src.query_params.movie_search import MovieSearch
 from src.query_params.person_movies import PersonMovies
 from src.utils.images import resize_image
 from src.utils.kinopoisk_parser import KinopoiskParser
+from src.utils.movie_names_index import MovieNamesIndex
+from src.utils.name import get_normalized_names
+from src.utils.question_movies_index import QuestionMoviesIndex
 from src.utils.yandex_music_parser import YandexMusicParser
 
 
@@ -31,6 +37,10 @@ class MovieDatabase:
         self.kinopoisk_parser = kinopoisk_parser
         self.yandex_music_parser = yandex_music_parser
         self.logger = logger
+        self.question_movies_index = QuestionMoviesIndex()
+        self.movie_names_index = MovieNamesIndex()
+        self.movies_version_check_interval = 1
+        self.movies_version_checked_at = 0
 
     def get_movies_count(self) -> int:
         return self.database.movies.count_documents({})
@@ -43,7 +53,25 @@ class MovieDatabase:
         movie_id2movie = {movie["movie_id"]: movie for movie in self.database.movies.find({"movie_id": {"$in": movie_ids}})}
         return [Movie.from_dict(movie_id2movie[movie_id]) for movie_id in movie_ids]
 
-    def get_movies_persons(self, movies: List[Movie]) -> Dict[int, Person]:
+    def get_movie_card(self, movie_id: int) -> Optional[MovieCard]:
+        movie = self.database.movies.find_one({"movie_id": movie_id}, MovieCard.get_projection())
+        return MovieCard.from_dict(movie) if movie else None
+
+    def get_movie_cards(self, movie_ids: List[int]) -> List[MovieCard]:
+        movie_id2movie = {movie["movie_id"]: movie for movie in self.database.movies.find({"movie_id": {"$in": movie_ids}}, MovieCard.get_projection())}
+        return [MovieCard.from_dict(movie_id2movie[movie_id]) for movie_id in movie_ids]
+
+    def get_question_movies(self, settings: QuestionSettings) -> List[dict]:
+        self.__check_movies_version()
+
+        if not self.question_movies_index.loaded:
+            version = self.__get_movies_version()
+            self.question_movies_index.load((Movie.from_dict(movie) for movie in self.database.movies.find({})), version=version)
+            self.logger.info(f"Loaded {len(self.question_movies_index)} movies to the question movies index")
+
+        return self.question_movies_index.get_movies(self.question_movies_index.search(settings))
+
+    def get_movies_persons(self, movies: List[Union[Movie, MovieCard]]) -> Dict[int, Person]:
         person_ids = [actor.person_id for movie in movies for actor in movie.actors + movie.directors]
         persons = self.database.persons.find({"person_id": {"$in": person_ids}})
         return {person["person_id"]: Person.from_dict(person) for person in persons}
@@ -66,22 +94,26 @@ class MovieDatabase:
 
         return movie_id2tracks
 
-    def get_last_movies(self, order_field: str, order_type: int, count: int) -> List[Movie]:
-        _, movies = self.search_movies(MovieSearch(order_type=order_type, order=order_field, page_size=count, page=0))
-        return movies
+    def get_last_movies(self, order_field: str, order_type: int, count: int) -> List[ShortMovie]:
+        movies = self.database.movies.find({}, ShortMovie.get_projection()).sort({order_field: order_type, "_id": 1}).limit(count)
+        return [ShortMovie.from_dict(movie) for movie in movies]
+
+    def search_movies(self, params: MovieSearch) -> Tuple[int, List[MovieCard]]:
+        name_movie_ids = None
+
+        if (name_search := params.get_name_search()) is not None:
+            self.__load_movie_names_index()
+            name_movie_ids = self.movie_names_index.search(name_search)
+
+            if not name_movie_ids:
+                return 0, []
 
-    def search_movies(self, params: MovieSearch) -> Tuple[int, List[Movie]]:
         results = self.database.movies.aggregate([
-            {
-                "$addFields": {
-                    "name_lowercase": {"$replaceAll": {"input": {"$toLower": "$name"}, "find": "Ё", "replacement": "Е"}}
-                }
-            },
-            {"$match": params.to_query()},
+            {"$match": params.to_query(name_movie_ids=name_movie_ids)},
             {"$sort": {params.order: params.order_type, "_id": 1}},
             {
                 "$facet": {
-                    "movies": [{"$skip": params.page_size * params.page}, {"$limit": params.page_size}],
+                    "movies": [{"$skip": params.page_size * params.page}, {"$limit": params.page_size}, {"$project": MovieCard.get_projection()}],
                     "total": [{"$count": "count"}]
                 }
             }
@@ -89,7 +121,11 @@ class MovieDatabase:
 
         results = list(results)[0]
         total = 0 if not results["total"] else results["total"][0]["count"]
-        return total, [Movie.from_dict(movie) for movie in results["movies"]]
+        return total, [MovieCard.from_dict(movie) for movie in results["movies"]]
+
+    def autocomplete_movies(self, query: str, count: int) -> List[dict]:
+        self.__load_movie_names_index()
+        return self.movie_names_index.autocomplete(query=query, count=count)
 
     def download_movie_images(self, output_path: str, username: str) -> None:
         query = {
@@ -171,15 +207,19 @@ class MovieDatabase:
 
     def add_movie(self, movie: Movie, username: str) -> None:
         action = AddMovieAction(username=username, timestamp=datetime.now(), movie_id=movie.movie_id)
-        self.database.movies.insert_one(movie.to_dict())
+        movie_data = {**movie.to_dict(), "normalized_names": get_normalized_names(movie.name, movie.alternative_names)}
+        self.database.movies.insert_one(movie_data)
         self.database.history.insert_one(action.to_dict())
+        self.question_movies_index.add_movie(movie)
+        self.movie_names_index.add_movie(movie_data)
+        self.__update_movies_version()
         self.logger.info(f'Added movie "{movie.name}" ({movie.movie_id}) by @{username}')
 
     def update_movie(self, movie_id: int, diff: dict, username: str) -> None:
         if not diff:
             return
 
-        movie = self.database.movies.find_one({"movie_id": movie_id}, {"name": 1})
+        movie = self.database.movies.find_one({"movie_id": movie_id}, {"name": 1, "alternative_names": 1})
         assert movie is not None
 
         action = EditMovieAction(username=username, timestamp=datetime.now(), movie_id=movie_id, diff=diff)
@@ -188,8 +228,21 @@ class MovieDatabase:
         new_values["metadata.updated_at"] = action.timestamp
         new_values["metadata.updated_by"] = action.username
 
+        # нормализованные названия поддерживаются при записи, чтобы поиск не пересчитывал их по всей коллекции
+        if "name" in diff or "alternative_names" in diff:
+            new_values["normalized_names"] = get_normalized_names(new_values.get("name", movie["name"]), new_values.get("alternative_names", movie["alternative_names"]))
+
         self.database.movies.update_one({"movie_id": movie_id}, {"$set": new_values})
         self.database.history.insert_one(action.to_dict())
+        self.database.queued_questions.delete_many({"movie_id": movie_id})
+
+        if self.question_movies_index.loaded:
+            self.question_movies_index.add_movie(self.get_movie(movie_id=movie_id))
+
+        if self.movie_names_index.loaded:
+            self.movie_names_index.add_movie(self.database.movies.find_one({"movie_id": movie_id}, MovieNamesIndex.get_projection()))
+
+        self.__update_movies_version()
         self.logger.info(f'Updated movie "{movie["name"]}" ({movie_id}) by @{username} (keys: {[key for key in diff]})')
 
     def remove_movie(self, movie_id: int, username: str) -> None:
@@ -198,14 +251,14 @@ class MovieDatabase:
 
         action = RemoveMovieAction(username=username, timestamp=datetime.now(), movie_id=movie_id)
         self.database.movies.delete_one({"movie_id": movie_id})
+        self.question_movies_index.remove_movie(movie_id)
+        self.movie_names_index.remove_movie(movie_id)
+        self.__update_movies_version()
 
         # удаляем вопрос из сессий
-        for session in self.database.sessions.find({"questions.movie_id": movie_id}):
-            session = Session.from_dict(session)
-            session.questions = [question for question in session.questions if question.movie_id != movie_id]
-            if session.question is not None and session.question.movie_id == movie_id:
-                session.question = None
-            self.database.sessions.update_one({"session_id": session.session_id}, {"$set": session.to_dict()})
+        self.database.sessions.update_many({"questions.movie_id": movie_id}, {"$pull": {"questions": {"movie_id": movie_id}}})
+        self.database.sessions.update_many({"question.movie_id": movie_id}, {"$set": {"question": None, "answers": {}}})
+        self.database.session_questions.delete_many({"question.movie_id": movie_id})
 
         # удаляем все вопросы и ответы из туров, связанные с этим фильмом
         tour_question_ids = [question["question_id"] for question in self.database.quiz_tour_questions.find({"question.movie_id": movie_id}, {"question_id": 1})]
@@ -225,6 +278,8 @@ class MovieDatabase:
                 self.remove_person(person_id=person["person_id"], username=username)
 
         self.database.questions.delete_many({"movie_id": movie_id})
+        self.database.queued_questions.delete_many({"movie_id": movie_id})
+        self.database.movie_scales.delete_many({"movie_id": movie_id})
         self.database.history.insert_one(action.to_dict())
         self.logger.info(f'Removed movie "{movie["name"]}" ({movie_id}) by @{username}')
 
@@ -235,11 +290,12 @@ class MovieDatabase:
         person = self.database.persons.find_one({"person_id": person_id})
         return Person.from_dict(person) if person else None
 
-    def get_person_movies(self, params: PersonMovies) -> Tuple[int, List[Movie]]:
+    def get_person_movies(self, params: PersonMovies) -> Tuple[int, List[MovieCard]]:
         query = {"$or": [{"actors.person_id": params.person_id}, {"directors.person_id": params.person_id}]}
         total = self.database.movies.count_documents(query)
-        movies = self.database.movies.find(query).sort({"rating.votes_kp": -1, "_id": 1}).skip(params.page * params.page_size).limit(params.page_size)
-        return total, [Movie.from_dict(movie) for movie in movies]
+        movies = self.database.movies.find(query, MovieCard.get_projection()).sort({"rating.votes_kp": -1, "_id": 1})
+        movies = movies.skip(params.page * params.page_size).limit(params.page_size)
+        return total, [MovieCard.from_dict(movie) for movie in movies]
 
     def add_person(self, person: Person, username: str) -> None:
         action = AddPersonAction(username=username, timestamp=datetime.now(), person_id=person.person_id)
@@ -434,6 +490,40 @@ class MovieDatabase:
 
         self.add_movie(movie=movie, username=username)
 
+    def __load_movie_names_index(self) -> None:
+        self.__check_movies_version()
+
+        if self.movie_names_index.loaded:
+            return
+
+        version = self.__get_movies_version()
+        self.movie_names_index.load(self.database.movies.find({}, MovieNamesIndex.get_projection()), version=version)
+        self.logger.info(f"Loaded {len(self.movie_names_index)} movies to the movie names index")
+
+    def __get_movies_version(self) -> int:
+        return self.database.identifiers.find_one({"_id": "movies_version"})["value"]
+
+    # индексы фильмов свои у каждого процесса, поэтому изменения, сделанные другими воркерами и скриптами,
+    # обнаруживаются по общему счётчику версий, который проверяется не чаще раза в movies_version_check_interval
+    def __check_movies_version(self) -> None:
+        if time.monotonic() - self.movies_version_checked_at < self.movies_version_check_interval:
+            return
+
+        self.movies_version_checked_at = time.monotonic()
+        version = self.__get_movies_version()
+
+        for index in [self.question_movies_index, self.movie_names_index]:
+            if index.loaded and index.version != version:
+                index.loaded = False
+
+    # свои изменения уже применены к индексам, а если до них была чужая версия, индекс перезагрузится при следующей проверке
+    def __update_movies_version(self) -> None:
+        version = self.database.get_identifier("movies_version")
+
+        for index in [self.question_movies_index, self.movie_names_index]:
+            if index.loaded and index.version == version - 1:
+                index.version = version
+
     def __download_kinopoisk_image(self, url: str, image_path: str, max_width: int) -> None:
         os.makedirs(os.path.dirname(image_path), exist_ok=True)
 
@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class MovieAutocomplete:
+    query: str
+    count: int = 10
@@ -1,8 +1,10 @@
 import re
 from dataclasses import dataclass, field
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 from src.enums import Genre, MovieType, Production
+from src.utils.movie_names_index import NameSearch
+from src.utils.name import normalize_name
 from src.utils.queries import enum_query, interval_query
 
 
@@ -22,9 +24,9 @@ class MovieSearch:
     page: int = 0
     page_size: int = 20
 
-    def to_query(self) -> dict:
+    def to_query(self, name_movie_ids: Optional[List[int]] = None) -> dict:
         query = {
-            **self.__to_name_query(),
+            **self.__to_name_query(name_movie_ids),
             **self.__to_tracks_query(),
             **enum_query("movie_type", self.movie_type),
             **enum_query("production", self.production),
@@ -37,20 +39,37 @@ class MovieSearch:
 
         return query
 
-    def __to_name_query(self) -> dict:
+    def get_name_search(self) -> Optional[NameSearch]:
+        if not self.query or re.fullmatch(r"/[^/]+/", self.query):
+            return None
+
+        if re.fullmatch(r"\^[^^]+", self.query):
+            return NameSearch(text=normalize_name(self.query[1:]), prefix=True)
+
+        if re.fullmatch(r"[^$]+\$", self.query):
+            return NameSearch(text=normalize_name(self.query[:-1]), suffix=True)
+
+        return NameSearch(text=normalize_name(self.query))
+
+    def __to_name_query(self, name_movie_ids: Optional[List[int]]) -> dict:
         if not self.query:
             return {}
 
         if re.fullmatch(r"/[^/]+/", self.query):
             return {"name": {"$regex": self.query[1:-1], "$options": "i"}}
 
-        if re.fullmatch(r"\^[^^]+", self.query):
-            return {"name": {"$regex": fr"^{re.escape(self.query[1:])}", "$options": "i"}}
+        if name_movie_ids is not None:
+            return {"movie_id": {"$in": name_movie_ids}}
 
-        if re.fullmatch(r"[^$]+\$", self.query):
-            return {"name": {"$regex": fr"{re.escape(self.query[:-1])}$", "$options": "i"}}
+        name_search = self.get_name_search()
+
+        if name_search.prefix:
+            return {"normalized_names": {"$regex": fr"^{re.escape(name_search.text)}"}}
+
+        if name_search.suffix:
+            return {"normalized_names": {"$regex": fr"{re.escape(name_search.text)}$"}}
 
-        return {"name": {"$regex": re.escape(self.query), "$options": "i"}}
+        return {"normalized_names": {"$regex": re.escape(name_search.text)}}
 
     def __to_tracks_query(self) -> dict:
         if self.tracks == "without":
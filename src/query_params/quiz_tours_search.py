@@ -29,17 +29,17 @@ class QuizToursSearch:
     def to_name_query(self) -> dict:
         return {"name": {"$regex": re.escape(self.query), "$options": "i"}} if self.query else {}
 
-    def check_complete(self, answers: int, total: int) -> bool:
+    def to_complete_query(self) -> dict:
         if self.completed_type == "completed":
-            return answers == total
+            return {"$expr": {"$eq": ["$answers_count", "$questions_count"]}}
 
         if self.completed_type == "started":
-            return 0 < answers < total
+            return {"$expr": {"$and": [{"$gt": ["$answers_count", 0]}, {"$lt": ["$answers_count", "$questions_count"]}]}}
 
         if self.completed_type == "unstarted":
-            return answers == 0
+            return {"answers_count": 0}
 
-        return True
+        return {}
 
 
 @dataclass
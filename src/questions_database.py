@@ -1,22 +1,29 @@
+import hashlib
+import json
 import logging
 import random
-from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from src.database import Database
 from src.entities.analytics import Analytics
 from src.entities.movie import Movie
+from src.entities.movie_card import MovieCard
 from src.entities.question import MovieByActorsQuestion, MovieByCharactersQuestion, MovieByCiteQuestion, MovieByDescriptionQuestion, MovieByImageQuestion, \
     MovieBySloganQuestion, MovieByTrackQuestion, Question
 from src.entities.question_answer import QuestionAnswer
 from src.entities.question_settings import QuestionSettings
+from src.entities.session_question import SessionQuestion
 from src.entities.settings import Settings
 from src.entities.user import User
-from src.enums import QuestionType
+from src.enums import MovieType, Production, QuestionType
 from src.movie_database import MovieDatabase
+from src.utils.movies_sampler import MoviesSampler
+from src.utils.question_movies_index import MOVIE_TYPE2CODE, PRODUCTION2CODE
 
 
 class QuestionsDatabase:
@@ -28,6 +35,7 @@ class QuestionsDatabase:
         self.alpha = 0.999
         self.last_questions_count = 500
         self.min_incorrect_count = 20
+        self.queue_size = 3
 
     def have_question(self, username: str) -> bool:
         return self.__get_user_question(username=username) is not None
@@ -36,8 +44,50 @@ class QuestionsDatabase:
         question = self.__get_user_question(username=username)
         question.set_answer(answer)
         self.database.questions.update_one({"username": username, "correct": None}, {"$set": question.to_dict()})
+        self.update_movie_scale(username=username, movie_id=question.movie_id, correct=question.correct)
+
+    def update_movie_scale(self, username: str, movie_id: int, correct: bool) -> None:
+        self.database.movie_scales.update_one({"username": username, "movie_id": movie_id}, {"$inc": {"correct": int(correct), "incorrect": int(not correct)}}, upsert=True)
+
+    def add_answered_questions(self, question: Question, username2answer: Dict[str, QuestionAnswer]) -> None:
+        if not username2answer:
+            return
+
+        questions = []
+        scales = []
+
+        for username, answer in username2answer.items():
+            question.username = username
+            question.set_answer(answer)
+            questions.append(question.to_dict())
+            scale_inc = {"correct": int(answer.correct), "incorrect": int(not answer.correct)}
+            scales.append(UpdateOne({"username": username, "movie_id": question.movie_id}, {"$inc": scale_inc}, upsert=True))
+
+        self.database.questions.insert_many(questions)
+        self.database.movie_scales.bulk_write(scales, ordered=False)
+
+    def rebuild_movie_scales(self) -> int:
+        self.database.movie_scales.delete_many({})
+        self.database.questions.aggregate([
+            {"$match": {"correct": {"$ne": None}}},
+            {
+                "$group": {
+                    "_id": {"username": "$username", "movie_id": "$movie_id"},
+                    "correct": {"$sum": {"$cond": ["$correct", 1, 0]}},
+                    "incorrect": {"$sum": {"$cond": ["$correct", 0, 1]}}
+                }
+            },
+            {"$project": {"_id": 0, "username": "$_id.username", "movie_id": "$_id.movie_id", "correct": 1, "incorrect": 1}},
+            {"$merge": {"into": "movie_scales", "on": ["username", "movie_id"], "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+        return self.database.movie_scales.count_documents({})
+
+    def get_question(self, settings: Settings, external_questions: Optional[List[SessionQuestion]] = None) -> Optional[Question]:
+        # заранее подготовленный вопрос берётся без запросов к каталогу
+        if external_questions is None and not self.have_question(username=settings.username) and (question := self.__pop_queued_question(settings)):
+            self.database.questions.insert_one(question.to_dict())
+            return question
 
-    def get_question(self, settings: Settings, external_questions: Optional[List[Question]] = None) -> Optional[Question]:
         movies = self.get_question_movies(settings.question_settings)
 
         if not movies:
@@ -56,63 +106,132 @@ class QuestionsDatabase:
         else:
             last_questions = self.__get_last_questions(username=settings.username, movie_ids=list(movie_ids))
 
+        question = self.create_question(settings=settings, movies=movies, last_questions=last_questions, pending_questions=[])
+
+        if question is not None and external_questions is None:
+            self.database.questions.insert_one(question.to_dict())
+
+        return question
+
+    def create_question(self, settings: Settings, movies: List[dict], last_questions: List[Union[Question, SessionQuestion]],
+                        pending_questions: List[Question]) -> Optional[Question]:
+        pending_movie_ids = {question.movie_id for question in pending_questions}
         last_incorrect_questions = [question for question in last_questions if not question.correct and question.question_type in settings.question_settings.question_types]
+        last_incorrect_questions = [question for question in last_incorrect_questions if question.movie_id not in pending_movie_ids]
 
+        question = None
         if len(last_incorrect_questions) >= self.min_incorrect_count and random.random() < settings.question_settings.repeat_incorrect_probability:
             question = self.repeat_incorrect_question(last_incorrect_questions, settings.question_settings)
-        else:
-            movie = self.sample_question_movies(movies=movies, last_questions=last_questions, settings=settings.question_settings, count=1)[0]
-            question = self.generate_question(movie=movie, username=settings.username, settings=settings.question_settings)
 
-        if external_questions is None:
-            self.database.questions.insert_one(question.to_dict())
+        if question is None:
+            # ещё не заданные вопросы считаются самыми свежими, чтобы их фильмы не повторялись
+            sampled_movies = self.sample_question_movies(movies=movies, last_questions=pending_questions + last_questions, settings=settings.question_settings, count=1)
+
+            # фильмы могли удалить после выборки кандидатов, тогда выбирать не из чего
+            if not sampled_movies:
+                return None
+
+            question = self.generate_question(movie=sampled_movies[0], username=settings.username, settings=settings.question_settings)
 
         return question
 
+    def fill_question_queue(self, settings: Settings) -> int:
+        settings_key = self.__get_settings_key(settings.question_settings)
+        self.database.queued_questions.delete_many({"username": settings.username, "settings_key": {"$ne": settings_key}})
+
+        query = {"username": settings.username, "settings_key": settings_key}
+        queued_questions = list(self.database.queued_questions.find(query).sort("_id", 1))
+
+        free_slots = sorted(set(range(self.queue_size)).difference(queued["slot"] for queued in queued_questions))
+
+        if not free_slots:
+            return 0
+
+        movies = self.get_question_movies(settings.question_settings)
+
+        if not movies:
+            return 0
+
+        last_questions = self.__get_last_questions(username=settings.username, movie_ids=[movie["movie_id"] for movie in movies])
+        pending_questions = [Question.from_dict(queued["question"]) for queued in queued_questions[::-1]]
+
+        if question := self.__get_user_question(username=settings.username):
+            pending_questions.append(question)
+
+        questions = []
+        for _ in free_slots:
+            if (question := self.create_question(settings=settings, movies=movies, last_questions=last_questions, pending_questions=pending_questions)) is None:
+                break
+
+            questions.append(question)
+            pending_questions.insert(0, question)
+
+        # ячейки очереди уникальны, поэтому при параллельном заполнении вставка проигравшего обрывается на первой же занятой ячейке
+        documents = [{**query, "slot": slot, "movie_id": question.movie_id, "question": question.to_dict()} for slot, question in zip(free_slots, questions)]
+
+        if not documents:
+            return 0
+
+        try:
+            self.database.queued_questions.insert_many(documents, ordered=True)
+        except BulkWriteError as error:
+            return error.details["nInserted"]
+
+        return len(documents)
+
+    def clear_question_queue(self, username: str) -> None:
+        self.database.queued_questions.delete_many({"username": username})
+
     def generate_question(self, movie: Movie, username: str, settings: QuestionSettings) -> Question:
         question_types = list(set(settings.question_types).intersection(movie.get_question_types()))
         question_weights = [settings.question_types[question_type] for question_type in question_types]
         question_type = random.choices(question_types, weights=question_weights, k=1)[0]
         return self.__generate_question_by_type(question_type=question_type, movie=movie, username=username, settings=settings)
 
-    def repeat_incorrect_question(self, last_incorrect_questions: List[Question], settings: QuestionSettings) -> Question:
+    def repeat_incorrect_question(self, last_incorrect_questions: List[Union[Question, SessionQuestion]], settings: QuestionSettings) -> Optional[Question]:
         question_weights = [1 - self.alpha ** (i + 1) for i in range(len(last_incorrect_questions))]
         question = random.choices(last_incorrect_questions, weights=question_weights, k=1)[0]
+
+        # вопросы мультиплеера хранятся в отдельной коллекции
+        if isinstance(question, SessionQuestion):
+            if (session_question := self.database.session_questions.find_one({"_id": question.question_id})) is None:
+                return None
+
+            question = Question.from_dict(session_question["question"])
+
         question.remove_answer()
         return self.update_question(question, settings)
 
     def sample_question_movies(self, movies: List[dict], last_questions: List[Question], settings: QuestionSettings, count: int) -> List[Movie]:
-        movie_id2weight = dict()
-
-        for i, question in enumerate(last_questions):
-            if question.movie_id not in movie_id2weight:
-                movie_id2weight[question.movie_id] = 1 - self.alpha ** (i + 1)
+        movie_ids = self.sample_question_movie_ids(movies=movies, last_questions=last_questions, settings=settings, count=count)
+        return self.movie_database.get_movies(movie_ids=movie_ids)
 
-        feature2balance = {
-            "movie_type": {movie_type.value: value for movie_type, value in settings.movie_types.items()},
-            "production_key": {production.value: value for production, value in settings.production.items()},
-            "year_key": {years: value for years, value in settings.years.items()}
-        }
+    def sample_question_movie_ids(self, movies: List[dict], last_questions: List[Question], settings: QuestionSettings, count: int) -> List[int]:
+        movie_ids, weights = self.get_movie_weights(movies=movies, last_questions=last_questions, settings=settings)
+        cumulative_weights = np.cumsum(weights)
+        sampled_indices = {}
 
-        year2key = settings.get_possible_years()
-        features2count = defaultdict(int)
+        # выбор без возвращения: повторно выпавший фильм отбрасывается, поэтому накопленные веса считаются один раз на запрос
+        while len(sampled_indices) < min(count, np.count_nonzero(weights)):
+            index = min(np.searchsorted(cumulative_weights, np.random.random() * cumulative_weights[-1], side="right"), len(movie_ids) - 1)
+            sampled_indices.setdefault(index, None)
 
-        for movie in movies:
-            movie["year_key"] = year2key[movie["year"]]
-            movie["production_key"] = movie["production"][0]
-            features2count[tuple(movie[feature] for feature in feature2balance)] += 1
+        return [int(movie_ids[index]) for index in sampled_indices]
 
-        movie_weights = [self.__get_movie_weight(movie, feature2balance, features2count, movie_id2weight) for movie in movies]
+    def get_movie_weights(self, movies: List[dict], last_questions: List[Question], settings: QuestionSettings) -> Tuple[np.ndarray, np.ndarray]:
+        movie_ids, strata, balances = self.__get_movie_strata(movies=movies, settings=settings)
+        strata_counts = np.bincount(strata)
+        return movie_ids, balances / strata_counts[strata] * self.__get_last_questions_weights(movie_ids=movie_ids, last_questions=last_questions)
 
-        total_weight = sum(movie_weights)
-        movie_weights = [weight / total_weight for weight in movie_weights]
-        movies = np.random.choice(movies, p=movie_weights, replace=False, size=count)
-        return self.movie_database.get_movies(movie_ids=[movie["movie_id"] for movie in movies])
+    def get_movies_sampler(self, movies: List[dict], last_questions: List[Question], settings: QuestionSettings) -> MoviesSampler:
+        movie_ids, strata, balances = self.__get_movie_strata(movies=movies, settings=settings)
+        weights = self.__get_last_questions_weights(movie_ids=movie_ids, last_questions=last_questions)
+        return MoviesSampler(movie_ids=movie_ids, strata=strata, balances=balances, weights=weights)
 
     def get_question_movies(self, settings: QuestionSettings) -> List[dict]:
-        return list(self.database.movies.find(settings.to_query(), {"movie_id": 1, "name": 1, "movie_type": 1, "production": 1, "year": 1, "sequels": 1}))
+        return self.movie_database.get_question_movies(settings)
 
-    def get_movies_scales(self, user: Optional[User], movies: List[Movie]) -> Dict[int, dict]:
+    def get_movies_scales(self, user: Optional[User], movies: List[Union[Movie, MovieCard]]) -> Dict[int, dict]:
         if not user:
             return {}
 
@@ -121,14 +240,14 @@ class QuestionsDatabase:
             return {}
 
         movie_ids = list({movie.movie_id for movie in movies})
-        questions = list(self.database.questions.find({"username": user.username, "correct": {"$ne": None}, "movie_id": {"$in": movie_ids}}))
-        movie_id2scale = {question["movie_id"]: {"incorrect": 0, "correct": 0, "scale": 0} for question in questions}
+        movie_id2scale = {}
 
-        for question in questions:
-            movie_id2scale[question["movie_id"]]["correct" if question["correct"] else "incorrect"] += 1
-
-        for movie_id, scales in movie_id2scale.items():
-            movie_id2scale[movie_id]["scale"] = scales["correct"] / (scales["correct"] + scales["incorrect"])
+        for scale in self.database.movie_scales.find({"username": user.username, "movie_id": {"$in": movie_ids}}, {"_id": 0, "movie_id": 1, "correct": 1, "incorrect": 1}):
+            movie_id2scale[scale["movie_id"]] = {
+                "incorrect": scale["incorrect"],
+                "correct": scale["correct"],
+                "scale": scale["correct"] / (scale["correct"] + scale["incorrect"])
+            }
 
         return movie_id2scale
 
@@ -145,13 +264,43 @@ class QuestionsDatabase:
         person_id2person = self.movie_database.get_movies_persons(movies=[movie])
         return question.update(movie=movie, person_id2person=person_id2person, settings=settings)
 
-    def __get_movie_weight(self, movie: dict, feature2balance: Dict[str, Dict[str, float]], features2count: Dict[tuple, float], movie_id2weight: Dict[int, float]) -> float:
-        movie_weight = 1 / features2count[tuple(movie[feature] for feature in feature2balance)]
+    def __get_movie_strata(self, movies: List[dict], settings: QuestionSettings) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # фильмы для вопросов берутся из индекса, поэтому их признаки читаются из его столбцов, а не собираются из словарей
+        movie_ids = np.fromiter((movie["movie_id"] for movie in movies), dtype=np.int64, count=len(movies))
+        found, movie_types, productions, years = self.movie_database.question_movies_index.get_features(movie_ids)
+        movie_ids = movie_ids[found]
+
+        movie_type_balance = np.zeros(len(MovieType))
+        for movie_type, value in settings.movie_types.items():
+            movie_type_balance[MOVIE_TYPE2CODE[movie_type]] = value
 
-        for feature, feature2value in feature2balance.items():
-            movie_weight *= feature2value[movie[feature]]
+        production_balance = np.zeros(len(Production))
+        for production, value in settings.production.items():
+            production_balance[PRODUCTION2CODE[production]] = value
 
-        return movie_weight * movie_id2weight.get(movie["movie_id"], 1)
+        year2key = settings.get_possible_years()
+        year_key2code = {year_key: code for code, year_key in enumerate(settings.years)}
+        year_balance = np.array([settings.years[year_key] for year_key in year_key2code])
+        min_year, max_year = min(year2key), max(year2key)
+        year2code = np.zeros(max_year - min_year + 1, dtype=np.int64)
+        for year, year_key in year2key.items():
+            year2code[year - min_year] = year_key2code[year_key]
+        year_codes = year2code[np.clip(years, min_year, max_year) - min_year]
+
+        strata = (movie_types * len(Production) + productions) * len(year_key2code) + year_codes
+        balances = movie_type_balance[movie_types] * production_balance[productions] * year_balance[year_codes]
+        return movie_ids, strata, balances
+
+    def __get_last_questions_weights(self, movie_ids: np.ndarray, last_questions: List[Question]) -> np.ndarray:
+        if not last_questions:
+            return np.ones(len(movie_ids))
+
+        last_movie_ids = np.array([question.movie_id for question in last_questions], dtype=np.int64)
+        unique_ids, first_indices = np.unique(last_movie_ids, return_index=True)
+        unique_weights = 1 - self.alpha ** (first_indices + 1)
+
+        positions = np.minimum(np.searchsorted(unique_ids, movie_ids), len(unique_ids) - 1)
+        return np.where(unique_ids[positions] == movie_ids, unique_weights[positions], 1)
 
     def __generate_question_by_type(self, question_type: QuestionType, movie: Movie, username: str, settings: QuestionSettings) -> Question:
         person_id2person = self.movie_database.get_movies_persons(movies=[movie])
@@ -181,6 +330,22 @@ class QuestionsDatabase:
 
         raise ValueError("Invalid question type")
 
+    def __get_settings_key(self, settings: QuestionSettings) -> str:
+        return hashlib.md5(json.dumps(settings.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+
+    # вопросы, подготовленные для других настроек, не подходят и удаляются при следующем заполнении очереди
+    def __pop_queued_question(self, settings: Settings) -> Optional[Question]:
+        query = {"username": settings.username, "settings_key": self.__get_settings_key(settings.question_settings)}
+        queued = self.database.queued_questions.find_one_and_delete(query, sort=[("_id", 1)])
+
+        if queued is None:
+            return None
+
+        # фильм мог измениться после заполнения очереди
+        question = Question.from_dict(queued["question"])
+        question.remove_answer()
+        return self.update_question(question, settings.question_settings)
+
     def __get_user_question(self, username: str) -> Optional[Question]:
         question = self.database.questions.find_one({"username": username, "correct": None})
         return Question.from_dict(question) if question else None
@@ -1,10 +1,12 @@
+import json
 import logging
 import random
 import re
 from collections import defaultdict
 from datetime import date, datetime
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from rapidfuzz import fuzz
 
 from src import Database, QuestionsDatabase
@@ -15,9 +17,12 @@ from src.entities.quiz_tour import QuizTour
 from src.entities.quiz_tour_answer import QuizTourAnswer
 from src.entities.quiz_tour_question import QuizTourQuestion
 from src.entities.quiz_tour_question_answer import QuizTourQuestionAnswer
+from src.entities.quiz_tour_score import QuizTourScore
+from src.entities.quiz_tour_statistics import QuizTourStatistics
 from src.entities.user import User
 from src.enums import QuizTourType
 from src.query_params.quiz_tours_search import QuizToursSearch
+from src.utils.movies_sampler import MoviesSampler
 from src.utils.name import get_first_letter, get_last_letter, get_name_length
 
 
@@ -30,6 +35,7 @@ class QuizToursDatabase:
         self.last_questions_count = 1000
         self.rating_alpha = 0.99
         self.rating_min_quiz_tours_count = 4
+        self.top_players_cache: Dict[str, Tuple[int, List[Tuple[float, int, str]]]] = {}
 
         # eng to rus
         self.pair_letters = {
@@ -38,63 +44,107 @@ class QuizToursDatabase:
         }
 
     def get_rating(self, username: str, query: dict) -> Optional[Tuple[float, int]]:
-        answers = self.database.quiz_tour_answers.find({"username": username})
-        question_id2correct = {answer["question_id"]: answer["correct"] for answer in answers}
-        corrects = []
+        return self.__get_ratings(query=query, usernames=[username]).get(username)
 
-        quiz_tour_id2date = {quiz_tour["quiz_tour_id"]: quiz_tour["created_at"].date() for quiz_tour in self.database.quiz_tours.find(query).sort("created_at", -1)}
-        max_date = max(quiz_tour_id2date.values(), default=date.today())
-        quiz_tour_id2scale = {quiz_tour_id: self.rating_alpha ** (max_date - quiz_tour_date).days for quiz_tour_id, quiz_tour_date in quiz_tour_id2date.items()}
+    def get_top_players(self, query: dict) -> List[Tuple[User, float, int]]:
+        version = self.database.identifiers.find_one({"_id": "quiz_tour_scores"})["value"]
+        key = json.dumps(query, sort_keys=True)
 
-        for quiz_tour in self.database.quiz_tours.find({"question_ids": {"$in": list(question_id2correct)}}):
-            if quiz_tour["quiz_tour_id"] not in quiz_tour_id2date:
-                continue
+        if key not in self.top_players_cache or self.top_players_cache[key][0] != version:
+            username2rating = self.__get_ratings(query=query, usernames=None)
+            top_players = [(rating, count, username) for username, (rating, count) in username2rating.items() if count >= self.rating_min_quiz_tours_count]
+            top_players = sorted(top_players, reverse=True)
+            self.top_players_cache[key] = (version, top_players)
 
-            question_ids = quiz_tour["question_ids"]
-            scores = [question_id2correct[question_id] for question_id in question_ids if question_id in question_id2correct]
+        top_players = self.top_players_cache[key][1]
+        top_usernames = [username for _, _, username in top_players]
+        available_usernames = {settings["username"] for settings in self.database.settings.find({"username": {"$in": top_usernames}, "show_progress": True}, {"username": 1})}
+        username2user = {user.username: user for user in self.database.get_users(usernames=list(available_usernames))}
+        return [(username2user[username], rating, count) for rating, count, username in top_players if username in username2user]
 
-            if len(scores) == len(question_ids):
-                corrects.append(sum(scores) / len(question_ids) * 100 * quiz_tour_id2scale[quiz_tour["quiz_tour_id"]])
+    def update_score(self, username: str, quiz_tour: QuizTour) -> None:
+        answers = list(self.database.quiz_tour_answers.find({"username": username, "question_id": {"$in": quiz_tour.question_ids}}, {"correct": 1}))
 
-        return (round(sum(corrects) / len(corrects), 1), len(corrects)) if corrects else None
+        if len(answers) != len(quiz_tour.question_ids):
+            return
 
-    def get_top_players(self, query: dict) -> List[Tuple[User, float, int]]:
-        available_usernames = [settings["username"] for settings in self.database.settings.find({"show_progress": True}, {"username": 1})]
-        username2user = {user.username: user for user in self.database.get_users(usernames=available_usernames)}
-        username2rating = defaultdict(int)
+        score = sum(answer["correct"] for answer in answers) / len(answers) * 100
+        score = QuizTourScore(username=username, quiz_tour_id=quiz_tour.quiz_tour_id, score=score, finished_at=datetime.now())
+        self.database.quiz_tour_scores.update_one({"username": username, "quiz_tour_id": quiz_tour.quiz_tour_id}, {"$set": score.to_dict()}, upsert=True)
+        self.database.quiz_tour_statistics.update_one({"quiz_tour_id": quiz_tour.quiz_tour_id}, {"$inc": {"finished_count": 1, "score_sum": score.score}}, upsert=True)
+        self.database.get_identifier("quiz_tour_scores")
+
+    def rebuild_scores(self, quiz_tour_ids: Optional[List[int]] = None) -> int:
+        query = {} if quiz_tour_ids is None else {"quiz_tour_id": {"$in": quiz_tour_ids}}
+        scores = []
+
+        for quiz_tour in self.database.quiz_tours.find(query):
+            quiz_tour = QuizTour.from_dict(quiz_tour)
+            username2answers = defaultdict(list)
+
+            for answer in self.database.quiz_tour_answers.find({"question_id": {"$in": quiz_tour.question_ids}}):
+                username2answers[answer["username"]].append(answer)
 
-        for username in available_usernames:
-            rating = self.get_rating(username=username, query=query)
+            for username, answers in username2answers.items():
+                if len(answers) == len(quiz_tour.question_ids):
+                    score = sum(answer["correct"] for answer in answers) / len(answers) * 100
+                    finished_at = max(answer["timestamp"] for answer in answers)
+                    scores.append(QuizTourScore(username=username, quiz_tour_id=quiz_tour.quiz_tour_id, score=score, finished_at=finished_at))
 
-            if rating is not None and rating[1] >= self.rating_min_quiz_tours_count:
-                username2rating[username] = rating
+        self.database.quiz_tour_scores.delete_many(query)
 
-        top_players = sorted([(rating, count, username) for username, (rating, count) in username2rating.items()], reverse=True)
-        return [(username2user[username], rating, count) for rating, count, username in top_players]
+        if scores:
+            self.database.quiz_tour_scores.insert_many([score.to_dict() for score in scores])
 
-    def get_quiz_tours(self, username: Optional[str], params: QuizToursSearch) -> Tuple[int, List[QuizTour]]:
-        query = params.to_query()
-        quiz_tours = [QuizTour.from_dict(quiz_tour) for quiz_tour in self.database.quiz_tours.find(query)]
-        finished_quiz_tour_ids = set()
+        self.database.get_identifier("quiz_tour_scores")
+        return len(scores)
 
-        if username is not None:
-            filtered_quiz_tours = []
-            for quiz_tour in quiz_tours:
-                answers = self.database.quiz_tour_answers.count_documents({"username": username, "question_id": {"$in": quiz_tour.question_ids}})
+    def rebuild_statistics(self, quiz_tour_ids: Optional[List[int]] = None, check_consistency: bool = True) -> int:
+        query = {} if quiz_tour_ids is None else {"quiz_tour_id": {"$in": quiz_tour_ids}}
+        quiz_tour_id2statistics = {statistics["quiz_tour_id"]: QuizTourStatistics.from_dict(statistics) for statistics in self.database.quiz_tour_statistics.find(query)}
+        inconsistent_count = 0
 
-                if not params.check_complete(answers, len(quiz_tour.question_ids)):
-                    continue
+        for quiz_tour in self.database.quiz_tours.find(query):
+            quiz_tour = QuizTour.from_dict(quiz_tour)
+            statistics = self.__evaluate_statistics(quiz_tour=quiz_tour)
+            stored_statistics = quiz_tour_id2statistics.pop(quiz_tour.quiz_tour_id, None)
 
-                filtered_quiz_tours.append(quiz_tour)
+            # после изменения вопросов тура сохранённые счётчики отличаются от пересчитанных ожидаемо, и сверять их не с чем
+            if check_consistency and stored_statistics is not None and not stored_statistics.is_consistent(statistics):
+                inconsistent_count += 1
+                self.logger.warning(f'Inconsistent statistics for quiz tour "{quiz_tour.name}" ({quiz_tour.quiz_tour_id}): {stored_statistics} != {statistics}')
 
-                if answers == len(quiz_tour.question_ids):
-                    finished_quiz_tour_ids.add(quiz_tour.quiz_tour_id)
+            self.database.quiz_tour_statistics.replace_one({"quiz_tour_id": quiz_tour.quiz_tour_id}, statistics.to_dict(), upsert=True)
 
-            quiz_tours = filtered_quiz_tours
+        # статистика удалённых туров
+        self.database.quiz_tour_statistics.delete_many({"quiz_tour_id": {"$in": list(quiz_tour_id2statistics)}})
+        return inconsistent_count
 
-        quiz_tours = sorted(quiz_tours, key=lambda quiz_tour: (quiz_tour.quiz_tour_id not in finished_quiz_tour_ids, quiz_tour.quiz_tour_id), reverse=True)
-        skip = params.page * params.page_size
-        return len(quiz_tours), quiz_tours[skip:skip + params.page_size]
+    def get_movie_quiz_tour_ids(self, movie_id: int) -> List[int]:
+        question_ids = [question["question_id"] for question in self.database.quiz_tour_questions.find({"question.movie_id": movie_id}, {"question_id": 1})]
+        return [quiz_tour["quiz_tour_id"] for quiz_tour in self.database.quiz_tours.find({"question_ids": {"$in": question_ids}}, {"quiz_tour_id": 1})]
+
+    def get_quiz_tours(self, username: Optional[str], params: QuizToursSearch) -> Tuple[int, List[QuizTour], Dict[int, dict]]:
+        page = [{"$skip": params.page * params.page_size}, {"$limit": params.page_size}]
+
+        if username is None:
+            pipeline = [{"$match": params.to_query()}, {"$sort": {"quiz_tour_id": -1}}]
+        else:
+            pipeline = [
+                {"$match": params.to_query()},
+                self.__get_answers_lookup(username=username),
+                {"$addFields": {"answers_count": {"$sum": "$answers.count"}, "questions_count": {"$size": "$question_ids"}}},
+                {"$match": params.to_complete_query()},
+                {"$addFields": {"finished": {"$eq": ["$answers_count", "$questions_count"]}}},
+                {"$sort": {"finished": 1, "quiz_tour_id": -1}}
+            ]
+            page.append(self.__get_statistics_lookup())
+
+        results = list(self.database.quiz_tours.aggregate([*pipeline, {"$facet": {"quiz_tours": page, "total": [{"$count": "count"}]}}]))[0]
+        total = results["total"][0]["count"] if results["total"] else 0
+        quiz_tours = [QuizTour.from_dict(quiz_tour) for quiz_tour in results["quiz_tours"]]
+        statuses = {quiz_tour["quiz_tour_id"]: self.__get_quiz_tour_status(quiz_tour) for quiz_tour in results["quiz_tours"]} if username is not None else {}
+        return total, quiz_tours, statuses
 
     def get_quiz_tour(self, quiz_tour_id: int) -> Optional[QuizTour]:
         quiz_tour = self.database.quiz_tours.find_one({"quiz_tour_id": quiz_tour_id})
@@ -136,17 +186,38 @@ class QuizToursDatabase:
         answer = QuizTourAnswer(question_id=answer.question_id, username=username, correct=answer.correct, timestamp=datetime.now(), answer_time=answer.answer_time)
         self.database.quiz_tour_answers.insert_one(answer.to_dict())
 
+        quiz_tour = self.database.quiz_tours.find_one({"question_ids": answer.question_id})
+        if quiz_tour is None:
+            return
+
+        statistics_inc = {
+            f"questions.{answer.question_id}.correct": int(answer.correct),
+            f"questions.{answer.question_id}.incorrect": int(not answer.correct),
+            "finished_count": 0,
+            "score_sum": 0
+        }
+
+        self.database.quiz_tour_statistics.update_one({"quiz_tour_id": quiz_tour["quiz_tour_id"]}, {"$inc": statistics_inc}, upsert=True)
+        self.update_score(username=username, quiz_tour=QuizTour.from_dict(quiz_tour))
+
     def get_quiz_tours_statuses(self, username: str, quiz_tours: List[QuizTour]) -> Dict[int, dict]:
-        return {quiz_tour.quiz_tour_id: self.__get_quiz_tour_status(quiz_tour=quiz_tour, username=username) for quiz_tour in quiz_tours}
+        pipeline = [
+            {"$match": {"quiz_tour_id": {"$in": [quiz_tour.quiz_tour_id for quiz_tour in quiz_tours]}}},
+            self.__get_answers_lookup(username=username),
+            self.__get_statistics_lookup()
+        ]
+
+        return {quiz_tour["quiz_tour_id"]: self.__get_quiz_tour_status(quiz_tour) for quiz_tour in self.database.quiz_tours.aggregate(pipeline)}
+
+    def get_quiz_tour_movies_statuses(self, quiz_tour: QuizTour) -> Dict[int, Dict[str, int]]:
+        statistics = self.database.quiz_tour_statistics.find_one({"quiz_tour_id": quiz_tour.quiz_tour_id})
+        if statistics is None:
+            return {}
 
-    def get_quiz_tour_movies_statuses(self, quiz_tour: QuizTour) -> Dict[int, list]:
-        movie_id2answers = defaultdict(list)
+        statistics = QuizTourStatistics.from_dict(statistics)
         questions = self.database.quiz_tour_questions.find({"question_id": {"$in": quiz_tour.question_ids}}, {"question.movie_id": 1, "question_id": 1})
         question_id2movie_id = {question["question_id"]: question["question"]["movie_id"] for question in questions}
-
-        for answer in self.database.quiz_tour_answers.find({"question_id": {"$in": quiz_tour.question_ids}}):
-            movie_id2answers[question_id2movie_id[answer["question_id"]]].append(answer["correct"])
-        return movie_id2answers
+        return {question_id2movie_id[question_id]: answers for question_id, answers in statistics.questions.items() if question_id in question_id2movie_id}
 
     def generate_tour(self, params: dict, quiz_tour_type: QuizTourType, settings: QuestionSettings, questions_count: int) -> Optional[QuizTour]:
         movies = self.questions_database.get_question_movies(settings)
@@ -187,6 +258,7 @@ class QuizToursDatabase:
         )
 
         self.database.quiz_tours.insert_one(quiz_tour.to_dict())
+        self.database.get_identifier("quiz_tour_scores")
         return quiz_tour
 
     def __generate_alphabet_tour_questions(self, movies: List[dict], last_questions: List[Question], settings: QuestionSettings, count: int) -> List[Question]:
@@ -199,20 +271,19 @@ class QuizToursDatabase:
 
         movie_id2letter = {movie["movie_id"]: get_first_letter(movie["name"]) for movie in movies}
         movies = [movie for movie in movies if movie_id2letter[movie["movie_id"]] in letter2position]
+        letter2movie_ids: Dict[str, List[int]] = defaultdict(list)
 
+        for movie in movies:
+            letter2movie_ids[movie_id2letter[movie["movie_id"]]].append(movie["movie_id"])
+
+        sampler = self.questions_database.get_movies_sampler(movies=movies, last_questions=last_questions, settings=settings)
         questions = []
-        sampled_letters = set()
-        sampled_movies = set()
 
         for _ in range(count):
-            movie = self.questions_database.sample_question_movies(movies=movies, last_questions=last_questions, settings=settings, count=1)[0]
+            movie = self.__sample_movie(sampler=sampler)
             question = self.questions_database.generate_question(movie=movie, username="", settings=settings)
             questions.append(question)
-            last_questions.append(question)
-
-            sampled_letters.add(movie_id2letter[movie.movie_id])
-            movies = [movie for movie in movies if movie_id2letter[movie["movie_id"]] not in sampled_letters]
-            movies = self.exclude_similar_movies(sampled_movies=sampled_movies, sampled_movie=movie, movies=movies)
+            sampler.remove([movie.movie_id, *movie.sequels, *letter2movie_ids[movie_id2letter[movie.movie_id]]])
 
         return sorted(questions, key=lambda question: letter2position.get(movie_id2letter[question.movie_id], 100))
 
@@ -228,11 +299,14 @@ class QuizToursDatabase:
         sampled_movies = set()
 
         for i in range(count):
-            movie = self.questions_database.sample_question_movies(movies=len2movies[start_len + i], last_questions=last_questions, settings=settings, count=1)[0]
+            # на каждой ступени выбирается один фильм, поэтому сэмплер строится только по фильмам нужной длины
+            length_movies = [movie for movie in len2movies[start_len + i] if movie["movie_id"] not in sampled_movies]
+            sampler = self.questions_database.get_movies_sampler(movies=length_movies, last_questions=last_questions, settings=settings)
+            movie = self.__sample_movie(sampler=sampler)
             question = self.questions_database.generate_question(movie=movie, username="", settings=settings)
             questions.append(question)
             last_questions.append(question)
-            len2movies[start_len + i + 1] = self.exclude_similar_movies(sampled_movies=sampled_movies, sampled_movie=movie, movies=len2movies[start_len + i + 1])
+            sampled_movies.update([movie.movie_id, *movie.sequels])
 
         return questions
 
@@ -277,35 +351,39 @@ class QuizToursDatabase:
 
         questions = []
         sampled_movies = set()
+        letter2sampler: Dict[str, MoviesSampler] = {}
 
         for _ in range(count):
-            movie = self.questions_database.sample_question_movies(movies=letter2movies[start_letter], last_questions=last_questions, settings=settings, count=1)[0]
+            if start_letter not in letter2sampler:
+                letter_movies = [movie for movie in letter2movies[start_letter] if movie["movie_id"] not in sampled_movies]
+                letter2sampler[start_letter] = self.questions_database.get_movies_sampler(movies=letter_movies, last_questions=last_questions, settings=settings)
+
+            movie = self.__sample_movie(sampler=letter2sampler[start_letter])
             question = self.questions_database.generate_question(movie=movie, username="", settings=settings)
             questions.append(question)
-            last_questions.append(question)
+
+            sampled_movies.update([movie.movie_id, *movie.sequels])
+            for sampler in letter2sampler.values():
+                sampler.remove([movie.movie_id, *movie.sequels])
 
             start_letter = movie_id2end_letter[movie.movie_id]
-            letter2movies[start_letter] = self.exclude_similar_movies(sampled_movies=sampled_movies, sampled_movie=movie, movies=letter2movies[start_letter])
 
         return questions
 
     def __generate_tour_questions_from_movies(self, movies: List[dict], last_questions: List[Question], settings: QuestionSettings, count: int) -> List[Question]:
+        sampler = self.questions_database.get_movies_sampler(movies=movies, last_questions=last_questions, settings=settings)
         questions = []
-        sampled_movies = set()
 
         for _ in range(count):
-            movie = self.questions_database.sample_question_movies(movies=movies, last_questions=last_questions, settings=settings, count=1)[0]
+            movie = self.__sample_movie(sampler=sampler)
             question = self.questions_database.generate_question(movie=movie, username="", settings=settings)
             questions.append(question)
-            last_questions.append(question)
-            movies = self.exclude_similar_movies(sampled_movies=sampled_movies, sampled_movie=movie, movies=movies)
+            sampler.remove([movie.movie_id, *movie.sequels])
 
         return questions
 
-    def exclude_similar_movies(self, sampled_movies: Set[int], sampled_movie: Movie, movies: List[dict]) -> List[dict]:
-        sampled_movies.add(sampled_movie.movie_id)
-        sampled_movies.update(sampled_movie.sequels)
-        return [movie for movie in movies if movie["movie_id"] not in sampled_movies]
+    def __sample_movie(self, sampler: MoviesSampler) -> Movie:
+        return self.questions_database.movie_database.get_movie(movie_id=sampler.sample())
 
     def __preprocess_name(self, name: str) -> str:
         return re.sub(r"\W+", " ", name)
@@ -337,33 +415,85 @@ class QuizToursDatabase:
 
         return quiz_tour_questions
 
-    def __get_quiz_tour_status(self, quiz_tour: QuizTour, username: str) -> dict:
-        status = {True: 0, False: 0}
-        time = {True: 0, False: 0}
+    def __get_answers_lookup(self, username: str) -> dict:
+        return {
+            "$lookup": {
+                "from": "quiz_tour_answers",
+                "let": {"question_ids": "$question_ids"},
+                "pipeline": [
+                    {"$match": {"username": username, "$expr": {"$in": ["$question_id", "$$question_ids"]}}},
+                    {"$group": {"_id": "$correct", "count": {"$sum": 1}, "time": {"$sum": "$answer_time"}}}
+                ],
+                "as": "answers"
+            }
+        }
+
+    def __get_statistics_lookup(self) -> dict:
+        return {"$lookup": {"from": "quiz_tour_statistics", "localField": "quiz_tour_id", "foreignField": "quiz_tour_id", "as": "statistics"}}
 
-        username2count = defaultdict(list)
+    def __evaluate_statistics(self, quiz_tour: QuizTour) -> QuizTourStatistics:
+        statistics = QuizTourStatistics(quiz_tour_id=quiz_tour.quiz_tour_id, finished_count=0, score_sum=0, questions={})
+        username2answers = defaultdict(list)
 
         for answer in self.database.quiz_tour_answers.find({"question_id": {"$in": quiz_tour.question_ids}}):
-            username2count[answer["username"]].append(answer["correct"])
+            username2answers[answer["username"]].append(answer["correct"])
+
+            if answer["question_id"] not in statistics.questions:
+                statistics.questions[answer["question_id"]] = {"correct": 0, "incorrect": 0}
+
+            statistics.questions[answer["question_id"]]["correct" if answer["correct"] else "incorrect"] += 1
 
-            if answer["username"] == username:
-                status[answer["correct"]] += 1
-                time[answer["correct"]] += answer["answer_time"]
+        for answers in username2answers.values():
+            if len(answers) == len(quiz_tour.question_ids):
+                statistics.finished_count += 1
+                statistics.score_sum += sum(answers) / len(answers) * 100
 
-        username2score = {username: sum(answers) / len(answers) for username, answers in username2count.items() if len(answers) == len(quiz_tour.question_ids)}
+        return statistics
+
+    def __get_quiz_tour_status(self, quiz_tour: dict) -> dict:
+        status = {True: 0, False: 0}
+        time = {True: 0, False: 0}
+
+        for answer in quiz_tour["answers"]:
+            status[answer["_id"]] = answer["count"]
+            time[answer["_id"]] = answer["time"]
+
+        total = len(quiz_tour["question_ids"])
+        statistics = QuizTourStatistics.from_dict(quiz_tour["statistics"][0]) if quiz_tour["statistics"] else None
 
         return {
             "correct": status[True],
             "incorrect": status[False],
-            "lost": len(quiz_tour.question_ids) - sum(status.values()),
-            "total": len(quiz_tour.question_ids),
-            "correct_percents": status[True] / len(quiz_tour.question_ids) * 100,
-            "incorrect_percents": status[False] / len(quiz_tour.question_ids) * 100,
+            "lost": total - sum(status.values()),
+            "total": total,
+            "correct_percents": status[True] / total * 100,
+            "incorrect_percents": status[False] / total * 100,
             "time": {
                 "correct": time[True],
                 "incorrect": time[False],
                 "total": time[True] + time[False]
             },
-            "finished_count": len(username2score),
-            "mean_score": sum(username2score.values()) / max(len(username2score), 1) * 100
+            "finished_count": statistics.finished_count if statistics else 0,
+            "mean_score": statistics.get_mean_score() if statistics else 0
         }
+
+    def __get_ratings(self, query: dict, usernames: Optional[List[str]]) -> Dict[str, Tuple[float, int]]:
+        quiz_tours = self.database.quiz_tours.find(query, {"quiz_tour_id": 1, "created_at": 1})
+        quiz_tour_id2date = {quiz_tour["quiz_tour_id"]: quiz_tour["created_at"].date() for quiz_tour in quiz_tours}
+        max_date = max(quiz_tour_id2date.values(), default=date.today())
+
+        scores_query = {"quiz_tour_id": {"$in": list(quiz_tour_id2date)}}
+        if usernames is not None:
+            scores_query["username"] = {"$in": usernames}
+
+        scores = list(self.database.quiz_tour_scores.find(scores_query, {"_id": 0, "username": 1, "quiz_tour_id": 1, "score": 1}))
+        if not scores:
+            return {}
+
+        score_usernames, user_indices = np.unique([score["username"] for score in scores], return_inverse=True)
+        days = np.array([(max_date - quiz_tour_id2date[score["quiz_tour_id"]]).days for score in scores])
+        values = np.array([score["score"] for score in scores]) * self.rating_alpha ** days
+
+        sums = np.bincount(user_indices, weights=values)
+        counts = np.bincount(user_indices)
+        return {str(username): (round(float(total / count), 1), int(count)) for username, total, count in zip(score_usernames, sums, counts)}
@@ -0,0 +1,38 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from pymongo.collection import Collection
+
+
+class AsyncProxy:
+    def __init__(self, target: object, executor: ThreadPoolExecutor) -> None:
+        self.target = target
+        self.executor = executor
+        self.name2method: Dict[str, Callable] = {}
+
+    def __getattr__(self, name: str) -> object:
+        attribute = getattr(self.target, name)
+
+        # коллекции создаются в connect, поэтому оборачиваются при каждом обращении
+        if isinstance(attribute, Collection):
+            return AsyncProxy(target=attribute, executor=self.executor)
+
+        if not callable(attribute):
+            return attribute
+
+        if name not in self.name2method:
+            self.name2method[name] = self.__to_async(name)
+
+        return self.name2method[name]
+
+    def __to_async(self, name: str) -> Callable:
+        method = getattr(self.target, name)
+
+        @functools.wraps(method)
+        async def wrapper(*args: object, **kwargs: object) -> object:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(getattr(self.target, name), *args, **kwargs))
+
+        return wrapper
@@ -6,7 +6,7 @@ from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from passlib.hash import bcrypt
 
-from src import database
+from src import async_database
 from src.entities.user import User
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 365
@@ -37,7 +37,7 @@ async def token_to_user(token: str = Depends(OAuth2PasswordBearer(tokenUrl="/log
     except (jwt.exceptions.DecodeError, jwt.ExpiredSignatureError):
         return None
 
-    return database.get_user(username=payload["sub"])
+    return await async_database.get_user(username=payload["sub"])
 
 
 async def get_user(request: Request) -> Optional[dict]:
@@ -0,0 +1,160 @@
+import asyncio
+import fcntl
+import os
+import uuid
+from dataclasses import dataclass
+from logging import Logger
+from typing import Awaitable, Callable, List, Optional, Set, TextIO
+
+
+@dataclass
+class BusMessage:
+    origin: str
+    channel: str
+    sequenced: bool
+    text: str
+
+    def encode(self) -> bytes:
+        return f"{self.origin}\t{self.channel}\t{int(self.sequenced)}\t{self.text}\n".encode("utf-8")
+
+    @classmethod
+    def decode(cls: "BusMessage", line: bytes) -> "BusMessage":
+        origin, channel, sequenced, text = line.decode("utf-8").rstrip("\n").split("\t", 3)
+        return cls(origin=origin, channel=channel, sequenced=sequenced == "1", text=text)
+
+
+class BroadcastBus:
+    def __init__(self) -> None:
+        self.origin = uuid.uuid4().hex
+        self.handler: Optional[Callable[[BusMessage], Awaitable[None]]] = None
+
+    def subscribe(self, handler: Callable[[BusMessage], Awaitable[None]]) -> None:
+        self.handler = handler
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, message: BusMessage) -> None:
+        await self.handler(message)
+
+
+class SocketBroadcastBus(BroadcastBus):
+    def __init__(self, path: str, logger: Logger, reconnect_delay: float = 0.5, max_line_size: int = 2 ** 24, drain_timeout: float = 5) -> None:
+        super().__init__()
+        self.path = path
+        self.logger = logger
+        self.reconnect_delay = reconnect_delay
+        self.max_line_size = max_line_size
+        self.drain_timeout = drain_timeout
+
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = asyncio.Event()
+        self.listener: Optional[asyncio.Task] = None
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.lock_file: Optional[TextIO] = None
+        self.clients: List[asyncio.StreamWriter] = []
+        self.relays: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self.listener = asyncio.create_task(self.__listen())
+        await self.connected.wait()
+
+    async def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.cancel()
+
+        if self.writer is not None:
+            self.writer.close()
+
+        if self.server is not None:
+            self.server.close()
+
+            for client in self.clients:
+                client.close()
+
+            await asyncio.gather(*self.relays, return_exceptions=True)
+            os.remove(self.path)
+            self.lock_file.close()
+
+    async def publish(self, message: BusMessage) -> None:
+        # пока шина недоступна, сообщения доставляются хотя бы подключениям текущего процесса
+        if self.writer is None:
+            await self.handler(message)
+            return
+
+        self.writer.write(message.encode())
+        await self.writer.drain()
+
+    async def __listen(self) -> None:
+        while True:
+            try:
+                await self.__start_hub()
+                reader, self.writer = await asyncio.open_unix_connection(self.path, limit=self.max_line_size)
+            except OSError:
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            self.connected.set()
+
+            try:
+                while line := await reader.readline():
+                    await self.handler(BusMessage.decode(line))
+            except (OSError, ValueError):
+                pass
+            finally:
+                self.writer.close()
+                self.writer = None
+
+            self.logger.warning(f'Connection to the broadcast bus "{self.path}" was lost, reconnecting')
+
+    # ретранслятор запускает тот процесс, который первым захватит файл блокировки, при его завершении блокировку захватит другой процесс
+    async def __start_hub(self) -> None:
+        if self.server is not None:
+            return
+
+        lock_file = open(f"{self.path}.lock", "w")
+
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        self.server = await asyncio.start_unix_server(self.__relay, path=self.path, limit=self.max_line_size)
+        self.lock_file = lock_file
+        self.logger.info(f'Broadcast bus hub started on "{self.path}"')
+
+    async def __relay(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients.append(writer)
+        self.relays.add(asyncio.current_task())
+
+        try:
+            while line := await reader.readline():
+                clients = list(self.clients)
+
+                for client in clients:
+                    client.write(line)
+
+                # следующая строка читается только после того, как все получатели приняли текущую,
+                # так что медленный получатель притормаживает отправителя, а не копит буфер ретранслятора
+                await asyncio.gather(*[self.__drain(client) for client in clients])
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.clients.remove(writer)
+            self.relays.discard(asyncio.current_task())
+            writer.close()
+
+    async def __drain(self, client: asyncio.StreamWriter) -> None:
+        try:
+            await asyncio.wait_for(client.drain(), timeout=self.drain_timeout)
+        except (OSError, asyncio.TimeoutError):
+            self.logger.warning(f'Slow client of the broadcast bus "{self.path}" was disconnected')
+            client.close()
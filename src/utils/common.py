@@ -1,30 +1,21 @@
-import hashlib
 import os
 from typing import List
 
+from src.utils.static_manifest import StaticManifest
 
-def __get_hash(filename: str) -> str:
-    hash_md5 = hashlib.md5()
+# режим разработки включает main.py: при автоперезагрузке статика и шаблоны меняются на ходу, а в боевом режиме файлы не проверяются
+RELOAD_MODE = bool(os.environ.get("MOVIE_QUIZ_STATIC_RELOAD"))
 
-    with open(filename, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-
-    return hash_md5.hexdigest()
+# в режиме разработки манифест опрашивает файлы раз в секунду
+static_manifest = StaticManifest(
+    root=os.path.join(os.path.dirname(__file__), "..", "..", "web"),
+    directories=["js", "styles"],
+    check_interval=1 if RELOAD_MODE else None
+)
 
 
 def get_static_hash() -> str:
-    hashes = []
-
-    for directory in ["js", "styles"]:
-        for path, _, files in os.walk(os.path.join(os.path.dirname(__file__), "..", "..", "web", directory)):
-            for name in files:
-                hashes.append(__get_hash(os.path.join(path, name)))
-
-    static_hash = "_".join(hashes)
-    hash_md5 = hashlib.md5()
-    hash_md5.update(static_hash.encode("utf-8"))
-    return hash_md5.hexdigest()
+    return static_manifest.get_version()
 
 
 def get_word_form(count: int, word_forms: List[str], only_form: bool = False) -> str:
@@ -1,15 +1,47 @@
 import asyncio
 import json
+import time
 from logging import Logger
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 
 from fastapi.websockets import WebSocket, WebSocketDisconnect
 
+from src.utils.broadcast_bus import BroadcastBus, BusMessage
+
+
+class Connection:
+    def __init__(self, websocket: WebSocket, session_id: str, queue_size: int) -> None:
+        self.websocket = websocket
+        self.session_id = session_id
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=queue_size)
+        self.sender: Optional[asyncio.Task] = None
+        self.last_pong = time.monotonic()
+
 
 class ConnectionManager:
-    def __init__(self, logger: Logger) -> None:
+    def __init__(self, logger: Logger, bus: Optional[BroadcastBus] = None, on_remote_change: Optional[Callable[[str], None]] = None,
+                 queue_size: int = 32, send_timeout: float = 5, ping_interval: float = 30, pong_timeout: float = 90, ping_batch_size: int = 256) -> None:
         self.logger = logger
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        self.bus = bus if bus is not None else BroadcastBus()
+        self.bus.subscribe(self.__deliver)
+        self.on_remote_change = on_remote_change
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.ping_interval = ping_interval
+        self.pong_timeout = pong_timeout
+        self.ping_batch_size = ping_batch_size
+        self.heartbeat: Optional[asyncio.Task] = None
+        self.active_connections: Dict[str, List[Connection]] = {}
+
+    async def start(self) -> None:
+        await self.bus.start()
+        self.heartbeat = asyncio.create_task(self.__heartbeat())
+
+    async def stop(self) -> None:
+        if self.heartbeat is not None:
+            self.heartbeat.cancel()
+
+        await self.bus.stop()
 
     async def connect(self, websocket: WebSocket, session_id: str) -> None:
         await websocket.accept()
@@ -17,36 +49,104 @@ class ConnectionManager:
         if session_id not in self.active_connections:
             self.active_connections[session_id] = []
 
-        self.active_connections[session_id].append(websocket)
+        connection = Connection(websocket=websocket, session_id=session_id, queue_size=self.queue_size)
+        connection.sender = asyncio.create_task(self.__send_messages(connection))
+        self.active_connections[session_id].append(connection)
 
     def disconnect(self, websocket: WebSocket, session_id: str) -> None:
         if session_id not in self.active_connections:
             return
 
-        self.active_connections[session_id] = [connection for connection in self.active_connections[session_id] if connection != websocket]
+        for connection in self.active_connections[session_id]:
+            if connection.websocket == websocket and connection.sender is not None and connection.sender is not asyncio.current_task():
+                connection.sender.cancel()
+
+        self.active_connections[session_id] = [connection for connection in self.active_connections[session_id] if connection.websocket != websocket]
 
         if not self.active_connections[session_id]:
             del self.active_connections[session_id]
 
-    async def broadcast(self, session_id: str, message: dict) -> None:
-        if session_id not in self.active_connections:
+    async def broadcast(self, session_id: str, message: dict, sequenced: bool = False) -> None:
+        # сообщение кодируется один раз, а отправка идёт из очередей соединений
+        text = json.dumps(message, ensure_ascii=False)
+        await self.bus.publish(BusMessage(origin=self.bus.origin, channel=session_id, sequenced=sequenced, text=text))
+
+    async def send_personal(self, websocket: WebSocket, session_id: str, message: dict) -> None:
+        for connection in self.active_connections.get(session_id, []):
+            if connection.websocket == websocket:
+                self.send(connection, json.dumps(message, ensure_ascii=False))
+
+    def send(self, connection: Connection, text: str) -> None:
+        try:
+            connection.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self.logger.warning(f'Slow consumer in the session "{connection.session_id}" was disconnected')
+            self.__drop(connection)
+
+    def pong(self, websocket: WebSocket, session_id: str) -> None:
+        for connection in self.active_connections.get(session_id, []):
+            if connection.websocket == websocket:
+                connection.last_pong = time.monotonic()
+
+    def get_statistics(self) -> dict:
+        connections = [connection for connections in self.active_connections.values() for connection in connections]
+
+        return {
+            "sessions": len(self.active_connections),
+            "sockets": len(connections),
+            "tasks": sum(connection.sender is not None and not connection.sender.done() for connection in connections),
+            "heartbeat": self.heartbeat is not None and not self.heartbeat.done()
+        }
+
+    async def __deliver(self, message: BusMessage) -> None:
+        # сессия изменена другим процессом, поэтому её локальная копия устарела
+        if message.sequenced and message.origin != self.bus.origin and self.on_remote_change is not None:
+            self.on_remote_change(message.channel)
+
+        if message.channel not in self.active_connections:
             return
 
-        for websocket in self.active_connections[session_id]:
-            try:
-                await websocket.send_text(json.dumps(message, ensure_ascii=False))
-            except (RuntimeError, WebSocketDisconnect):
-                self.disconnect(websocket, session_id)
+        for connection in list(self.active_connections[message.channel]):
+            self.send(connection, message.text)
 
-    async def ping(self, websocket: WebSocket, session_id: str) -> None:
+    # все сокеты пингуются одной задачей пачками, а не отвечавшие дольше pong_timeout отключаются
+    async def __heartbeat(self) -> None:
         while True:
-            await asyncio.sleep(30)
+            await asyncio.sleep(self.ping_interval)
+            connections = [connection for connections in self.active_connections.values() for connection in connections]
+            now = time.monotonic()
+
+            for i, connection in enumerate(connections):
+                if now - connection.last_pong > self.pong_timeout:
+                    self.logger.warning(f'Connection in the session "{connection.session_id}" did not respond to pings and was disconnected')
+                    self.__drop(connection)
+                else:
+                    self.send(connection, "ping")
+
+                if (i + 1) % self.ping_batch_size == 0:
+                    await asyncio.sleep(0)
+
+    async def __send_messages(self, connection: Connection) -> None:
+        while True:
+            text = await connection.queue.get()
+
             try:
-                await websocket.send_text("ping")
-            except WebSocketDisconnect:
-                self.disconnect(websocket, session_id)
+                await asyncio.wait_for(connection.websocket.send_text(text), timeout=self.send_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f'Sending to the session "{connection.session_id}" timed out')
+                self.__drop(connection)
                 break
-            except Exception as e:
-                self.logger.error(f'Error during ping in the session "{session_id}": {e}')
-                self.disconnect(websocket, session_id)
+            except (RuntimeError, OSError, WebSocketDisconnect):
+                self.disconnect(connection.websocket, connection.session_id)
                 break
+
+    def __drop(self, connection: Connection) -> None:
+        self.disconnect(connection.websocket, connection.session_id)
+        # закрытие прерывает цикл чтения, и обработчик сокета завершит сессию игрока
+        asyncio.create_task(self.__close(connection.websocket))
+
+    async def __close(self, websocket: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), timeout=self.send_timeout)
+        except (RuntimeError, OSError, WebSocketDisconnect, asyncio.TimeoutError):
+            pass
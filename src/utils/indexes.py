@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.collection import Collection
+from pymongo.database import Database as MongoDatabase
+
+
+@dataclass
+class Index:
+    keys: List[Tuple[str, int]]
+    unique: bool = False
+
+    def get_name(self) -> str:
+        return "_".join(f"{key}_{direction}" for key, direction in self.keys)
+
+
+INDEXES: Dict[str, List[Index]] = {
+    "roles": [Index([("username", ASCENDING)], unique=True)],
+    "settings": [Index([("username", ASCENDING)], unique=True)],
+    "questions": [
+        Index([("username", ASCENDING), ("correct", ASCENDING), ("movie_id", ASCENDING), ("timestamp", DESCENDING)]),
+        Index([("username", ASCENDING), ("timestamp", DESCENDING)]),
+        Index([("movie_id", ASCENDING)])
+    ],
+    "queued_questions": [
+        Index([("username", ASCENDING), ("settings_key", ASCENDING), ("slot", ASCENDING)], unique=True),
+        Index([("movie_id", ASCENDING)])
+    ],
+    "movie_scales": [
+        Index([("username", ASCENDING), ("movie_id", ASCENDING)], unique=True),
+        Index([("movie_id", ASCENDING)])
+    ],
+    "movies": [
+        Index([("movie_id", ASCENDING)], unique=True),
+        Index([("name", ASCENDING)]),
+        Index([("normalized_names", ASCENDING)]),
+        Index([("source.kinopoisk_id", ASCENDING)]),
+        Index([("actors.person_id", ASCENDING)]),
+        Index([("directors.person_id", ASCENDING)])
+    ],
+    "persons": [
+        Index([("person_id", ASCENDING)], unique=True),
+        Index([("kinopoisk_id", ASCENDING)])
+    ],
+    "tracks": [
+        Index([("track_id", ASCENDING)], unique=True),
+        Index([("movie_id", ASCENDING), ("track_id", ASCENDING)]),
+        Index([("source.yandex_id", ASCENDING)])
+    ],
+    "cites": [
+        Index([("cite_id", ASCENDING)], unique=True),
+        Index([("movie_id", ASCENDING), ("cite_id", ASCENDING)])
+    ],
+    "history": [
+        Index([("username", ASCENDING)]),
+        Index([("timestamp", ASCENDING)]),
+        Index([("movie_id", ASCENDING), ("timestamp", DESCENDING)]),
+        Index([("track_id", ASCENDING), ("timestamp", DESCENDING)]),
+        Index([("name", ASCENDING), ("timestamp", DESCENDING)])
+    ],
+    "quiz_tours": [
+        Index([("quiz_tour_id", ASCENDING)], unique=True),
+        Index([("question_ids", ASCENDING)])
+    ],
+    "quiz_tour_questions": [
+        Index([("question_id", ASCENDING)], unique=True),
+        Index([("question.movie_id", ASCENDING), ("question_id", ASCENDING)])
+    ],
+    "quiz_tour_answers": [
+        Index([("username", ASCENDING), ("question_id", ASCENDING)]),
+        Index([("question_id", ASCENDING)])
+    ],
+    "quiz_tour_scores": [
+        Index([("username", ASCENDING), ("quiz_tour_id", ASCENDING)], unique=True),
+        Index([("quiz_tour_id", ASCENDING)])
+    ],
+    "quiz_tour_statistics": [Index([("quiz_tour_id", ASCENDING)], unique=True)],
+    "sessions": [
+        Index([("session_id", ASCENDING)], unique=True),
+        Index([("questions.movie_id", ASCENDING)]),
+        Index([("question.movie_id", ASCENDING)])
+    ],
+    "session_questions": [
+        Index([("session_id", ASCENDING)]),
+        Index([("question.movie_id", ASCENDING)])
+    ]
+}
+
+# индексы, которые больше не используются ни одним запросом
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    "questions": ["username_1", "datetime_1"],
+    "tracks": ["movie_id_1"],
+    "cites": ["movie_id_1"],
+    "quiz_tour_answers": ["username_1", "correct_1"]
+}
+
+
+def create_indexes(database: MongoDatabase) -> None:
+    for collection_name, indexes in INDEXES.items():
+        collection: Collection = database[collection_name]
+
+        for index in indexes:
+            collection.create_index(index.keys, name=index.get_name(), unique=index.unique)
+
+    for collection_name, index_names in OBSOLETE_INDEXES.items():
+        existing_names = set(database[collection_name].index_information())
+
+        for index_name in index_names:
+            if index_name in existing_names:
+                database[collection_name].drop_index(index_name)
+
+
+def get_plan_stages(plan: dict) -> List[str]:
+    stages = [plan["stage"]] if "stage" in plan else []
+
+    if "inputStage" in plan:
+        stages.extend(get_plan_stages(plan["inputStage"]))
+
+    for input_stage in plan.get("inputStages", []):
+        stages.extend(get_plan_stages(input_stage))
+
+    return stages
+
+
+def get_collection_scans(explain: dict) -> List[str]:
+    plan = explain["queryPlanner"]["winningPlan"]
+    # в новых версиях mongo план для SBE обёрнут в queryPlan
+    plan = plan.get("queryPlan", plan)
+    return [stage for stage in get_plan_stages(plan) if stage == "COLLSCAN"]
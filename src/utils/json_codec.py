@@ -0,0 +1,84 @@
+import dataclasses
+import threading
+import types
+from enum import Enum
+from typing import Callable, Dict, Optional, TypeVar, Union, get_args, get_origin, get_type_hints
+
+import orjson
+from bson import ObjectId
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+T = TypeVar("T")
+Decoder = Callable[[object], object]
+
+decoders_lock = threading.RLock()
+class2decoder: Dict[type, Decoder] = {}
+
+
+def encode_default(value: object) -> object:
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+
+    if isinstance(value, ObjectId):
+        return str(value)
+
+    raise TypeError(f"Type {type(value).__name__} is not JSON serializable")
+
+
+# датаклассы, перечисления и даты сериализуются orjson напрямую, без промежуточных словарей
+def to_json_bytes(data: object) -> bytes:
+    return orjson.dumps(data, default=encode_default, option=JSON_OPTIONS)
+
+
+def from_json_bytes(cls: type[T], data: bytes) -> T:
+    return cls.from_dict(orjson.loads(data))
+
+
+# декодер датакласса собирается по аннотациям полей один раз: значения примитивных полей и дат передаются как есть, перечисления строятся по значению,
+# сущности, декодируемые кодеком, - сразу своим декодером, а остальные - своим from_dict, поэтому полиморфные Source и Question декодируются сами
+def decode_dataclass(cls: type[T], data: dict) -> T:
+    decoder = class2decoder.get(cls) or get_dataclass_decoder(cls)
+    return decoder(data)
+
+
+def get_dataclass_decoder(cls: type) -> Decoder:
+    with decoders_lock:
+        if cls not in class2decoder:
+            hints = get_type_hints(cls)
+            # значения передаются позиционно в порядке полей, без промежуточного словаря аргументов
+            fields = [(field.name, get_decoder(hints[field.name])) for field in dataclasses.fields(cls) if field.init]
+
+            def decode(data: dict) -> object:
+                return cls(*[data[name] if decoder is None else decoder(data[name]) for name, decoder in fields])
+
+            class2decoder[cls] = decode
+
+        return class2decoder[cls]
+
+
+def get_decoder(annotation: object) -> Optional[Decoder]:
+    origin, args = get_origin(annotation), get_args(annotation)
+
+    if origin is list:
+        return None if (item_decoder := get_decoder(args[0])) is None else lambda values: [item_decoder(value) for value in values]
+
+    if origin is dict:
+        return None if (value_decoder := get_decoder(args[1])) is None else lambda values: {key: value_decoder(value) for key, value in values.items()}
+
+    if origin in (Union, types.UnionType):
+        not_none_args = [arg for arg in args if arg is not type(None)]
+        if len(not_none_args) != 1:
+            raise TypeError(f"Unable to decode {annotation}")
+
+        return None if (value_decoder := get_decoder(not_none_args[0])) is None else lambda value: None if value is None else value_decoder(value)
+
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return annotation
+
+    if isinstance(annotation, type) and getattr(getattr(annotation, "from_dict", None), "__func__", None) is decode_dataclass:
+        return get_dataclass_decoder(annotation)
+
+    if isinstance(annotation, type) and hasattr(annotation, "from_dict"):
+        return annotation.from_dict
+
+    return None
@@ -0,0 +1,186 @@
+import bisect
+import heapq
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set, Tuple
+
+from rapidfuzz import fuzz, process
+
+from src.utils.name import get_normalized_names, normalize_name
+
+
+@dataclass
+class NameSearch:
+    text: str
+    prefix: bool = False
+    suffix: bool = False
+
+
+class MovieNamesIndex:
+    ngram_size = 3
+    fuzzy_min_length = 3
+    fuzzy_score_cutoff = 75
+    fuzzy_candidates = 200
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.version = 0
+        self.movie_id2names: Dict[int, List[str]] = {}
+        self.movie_id2row: Dict[int, dict] = {}
+        self.movie_id2votes: Dict[int, int] = {}
+        self.ngram2movie_ids: Dict[str, Set[int]] = defaultdict(set)
+
+        self.prefixes: List[Tuple[str, int]] = []
+        self.suffixes: List[Tuple[str, int]] = []
+
+    @staticmethod
+    def get_projection() -> dict:
+        return {"_id": 0, "movie_id": 1, "name": 1, "alternative_names": 1, "year": 1, "poster_url": 1, "rating.votes_kp": 1}
+
+    def load(self, movies: Iterable[dict], version: int = 0) -> None:
+        with self.lock:
+            self.version = version
+            self.movie_id2names = {}
+            self.movie_id2row = {}
+            self.movie_id2votes = {}
+            self.ngram2movie_ids = defaultdict(set)
+
+            for movie in movies:
+                self.__add_movie(movie)
+
+            self.prefixes = sorted((name, movie_id) for movie_id, names in self.movie_id2names.items() for name in names)
+            self.suffixes = sorted((name[::-1], movie_id) for movie_id, names in self.movie_id2names.items() for name in names)
+            self.loaded = True
+
+    def add_movie(self, movie: dict) -> None:
+        with self.lock:
+            if not self.loaded:
+                return
+
+            self.__remove_movie(movie["movie_id"])
+            self.__add_movie(movie)
+
+            # отсортированные массивы обновляются вставкой, без пересортировки всего индекса
+            for name in self.movie_id2names[movie["movie_id"]]:
+                bisect.insort(self.prefixes, (name, movie["movie_id"]))
+                bisect.insort(self.suffixes, (name[::-1], movie["movie_id"]))
+
+    def remove_movie(self, movie_id: int) -> None:
+        with self.lock:
+            if not self.loaded or movie_id not in self.movie_id2names:
+                return
+
+            self.__remove_movie(movie_id)
+
+    def __len__(self) -> int:
+        return len(self.movie_id2names)
+
+    def search(self, name_search: NameSearch) -> List[int]:
+        with self.lock:
+            if name_search.prefix:
+                return self.__search_sorted(self.prefixes, name_search.text)
+
+            if name_search.suffix:
+                return self.__search_sorted(self.suffixes, name_search.text[::-1])
+
+            return self.__search_substring(name_search.text)
+
+    # сначала фильмы, название которых начинается с запроса, затем содержащие его, и только при нехватке - похожие по написанию
+    def autocomplete(self, query: str, count: int) -> List[dict]:
+        text = normalize_name(query).strip()
+        if not text:
+            return []
+
+        with self.lock:
+            movie_ids = self.__get_most_voted(self.__search_sorted(self.prefixes, text), count)
+
+            if len(movie_ids) < count:
+                movie_ids.extend(self.__get_most_voted(set(self.__search_substring(text)).difference(movie_ids), count - len(movie_ids)))
+
+            if len(movie_ids) < count and len(text) >= self.fuzzy_min_length:
+                movie_ids.extend(self.__search_fuzzy(text, count - len(movie_ids), exclude=set(movie_ids)))
+
+            return [dict(self.movie_id2row[movie_id]) for movie_id in movie_ids]
+
+    def __search_sorted(self, names: List[Tuple[str, int]], text: str) -> List[int]:
+        movie_ids = []
+
+        for index in range(bisect.bisect_left(names, (text, -1)), len(names)):
+            name, movie_id = names[index]
+            if not name.startswith(text):
+                break
+
+            movie_ids.append(movie_id)
+
+        return list(dict.fromkeys(movie_ids))
+
+    def __search_substring(self, text: str) -> List[int]:
+        ngrams = self.__get_ngrams(text)
+
+        # короткие запросы не покрываются триграммами, поэтому проверяются все названия
+        if not ngrams:
+            candidates = self.movie_id2names
+        else:
+            postings = sorted((self.ngram2movie_ids.get(ngram, set()) for ngram in ngrams), key=len)
+            candidates = set.intersection(*postings)
+
+        return [movie_id for movie_id in candidates if any(text in name for name in self.movie_id2names[movie_id])]
+
+    # кандидаты для нечёткого поиска - фильмы с наибольшим числом общих с запросом триграмм
+    def __search_fuzzy(self, text: str, count: int, exclude: Set[int]) -> List[int]:
+        movie_id2hits = Counter()
+
+        for ngram in self.__get_ngrams(text):
+            movie_id2hits.update(self.ngram2movie_ids.get(ngram, set()).difference(exclude))
+
+        names = [(name, movie_id) for movie_id, _ in movie_id2hits.most_common(self.fuzzy_candidates) for name in self.movie_id2names[movie_id]]
+        movie_id2score = {}
+
+        for _, score, index in process.extract_iter(text, [name for name, _ in names], scorer=fuzz.WRatio, score_cutoff=self.fuzzy_score_cutoff):
+            movie_id = names[index][1]
+            movie_id2score[movie_id] = max(score, movie_id2score.get(movie_id, 0))
+
+        return heapq.nlargest(count, movie_id2score, key=lambda movie_id: (movie_id2score[movie_id], self.movie_id2votes[movie_id]))
+
+    def __get_most_voted(self, movie_ids: Iterable[int], count: int) -> List[int]:
+        return heapq.nlargest(count, movie_ids, key=lambda movie_id: self.movie_id2votes[movie_id])
+
+    def __add_movie(self, movie: dict) -> None:
+        names = get_normalized_names(movie["name"], movie.get("alternative_names", []))
+        self.movie_id2names[movie["movie_id"]] = names
+        self.movie_id2row[movie["movie_id"]] = {
+            "movie_id": movie["movie_id"],
+            "name": movie["name"],
+            "year": movie.get("year"),
+            "poster_url": movie.get("poster_url", "")
+        }
+        self.movie_id2votes[movie["movie_id"]] = movie.get("rating", {}).get("votes_kp", 0)
+
+        for name in names:
+            for ngram in self.__get_ngrams(name):
+                self.ngram2movie_ids[ngram].add(movie["movie_id"])
+
+    def __remove_movie(self, movie_id: int) -> None:
+        self.movie_id2row.pop(movie_id, None)
+        self.movie_id2votes.pop(movie_id, None)
+
+        for name in self.movie_id2names.pop(movie_id, []):
+            self.__remove_sorted(self.prefixes, (name, movie_id))
+            self.__remove_sorted(self.suffixes, (name[::-1], movie_id))
+
+            for ngram in self.__get_ngrams(name):
+                self.ngram2movie_ids[ngram].discard(movie_id)
+
+                if not self.ngram2movie_ids[ngram]:
+                    del self.ngram2movie_ids[ngram]
+
+    def __remove_sorted(self, names: List[Tuple[str, int]], item: Tuple[str, int]) -> None:
+        index = bisect.bisect_left(names, item)
+
+        if index < len(names) and names[index] == item:
+            del names[index]
+
+    def __get_ngrams(self, text: str) -> Set[str]:
+        return {text[i:i + self.ngram_size] for i in range(len(text) - self.ngram_size + 1)}
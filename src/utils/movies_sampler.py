@@ -0,0 +1,98 @@
+import random
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+class FenwickTree:
+    def __init__(self, values: np.ndarray) -> None:
+        self.size = len(values)
+        self.tree = np.zeros(self.size + 1)
+        self.tree[1:] = values
+
+        for index in range(1, self.size + 1):
+            parent = index + (index & -index)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[index]
+
+        self.power = 1 << (self.size.bit_length() - 1) if self.size else 0
+
+    def add(self, index: int, delta: float) -> None:
+        index += 1
+
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def total(self) -> float:
+        total = 0
+        index = self.size
+
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+
+        return total
+
+    def find(self, value: float) -> int:
+        # индекс первого элемента, префиксная сумма которого превышает value
+        index = 0
+        step = self.power
+
+        while step:
+            if index + step <= self.size and self.tree[index + step] <= value:
+                index += step
+                value -= self.tree[index]
+            step >>= 1
+
+        return min(index, self.size - 1)
+
+
+class MoviesSampler:
+    def __init__(self, movie_ids: np.ndarray, strata: np.ndarray, balances: np.ndarray, weights: np.ndarray) -> None:
+        self.strata: List[Tuple[List[int], np.ndarray, FenwickTree]] = []
+        self.stratum_balances: List[float] = []
+        self.stratum_counts: List[int] = []
+        self.movie_id2position: Dict[int, Tuple[int, int]] = {}
+
+        for stratum in np.unique(strata):
+            indices = np.flatnonzero(strata == stratum)
+            stratum_movie_ids = [int(movie_id) for movie_id in movie_ids[indices]]
+            stratum_weights = weights[indices].astype(np.float64)
+
+            for position, movie_id in enumerate(stratum_movie_ids):
+                self.movie_id2position[movie_id] = (len(self.strata), position)
+
+            self.strata.append((stratum_movie_ids, stratum_weights, FenwickTree(stratum_weights)))
+            self.stratum_balances.append(float(balances[indices[0]]))
+            self.stratum_counts.append(len(indices))
+
+    def __len__(self) -> int:
+        return len(self.movie_id2position)
+
+    def sample(self) -> int:
+        if not self.movie_id2position:
+            raise ValueError("Unable to sample from empty sampler")
+
+        stratum_weights = [balance * tree.total() / count if count else 0 for balance, (_, _, tree), count in zip(self.stratum_balances, self.strata, self.stratum_counts)]
+        stratum = random.choices(range(len(self.strata)), weights=stratum_weights, k=1)[0]
+        movie_ids, weights, tree = self.strata[stratum]
+
+        position = tree.find(random.random() * tree.total())
+
+        # из-за погрешностей дерево может указать на удалённый фильм
+        while weights[position] == 0:
+            position = (position + 1) % len(movie_ids)
+
+        return movie_ids[position]
+
+    def remove(self, movie_ids: Iterable[int]) -> None:
+        for movie_id in movie_ids:
+            if movie_id not in self.movie_id2position:
+                continue
+
+            stratum, position = self.movie_id2position.pop(movie_id)
+            _, weights, tree = self.strata[stratum]
+            tree.add(position, -weights[position])
+            weights[position] = 0
+            self.stratum_counts[stratum] -= 1
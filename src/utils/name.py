@@ -1,4 +1,5 @@
 import re
+from typing import List
 
 
 def get_first_letter(name: str) -> str:
@@ -11,3 +12,11 @@ def get_last_letter(name: str) -> str:
 
 def get_name_length(name: str) -> int:
     return len(re.findall(r"[a-zа-яё\d]", name.lower()))
+
+
+def normalize_name(name: str) -> str:
+    return name.lower().replace("ё", "е")
+
+
+def get_normalized_names(name: str, alternative_names: List[str]) -> List[str]:
+    return list(dict.fromkeys(normalize_name(movie_name) for movie_name in [name, *alternative_names] if movie_name))
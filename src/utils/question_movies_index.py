@@ -0,0 +1,145 @@
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from src.entities.movie import Movie
+from src.entities.question_settings import QuestionSettings
+from src.enums import MovieType, Production, QuestionType
+
+MOVIE_TYPE2CODE = {movie_type: code for code, movie_type in enumerate(MovieType)}
+PRODUCTION2CODE = {production: code for code, production in enumerate(Production)}
+QUESTION_TYPE2BIT = {question_type: 1 << code for code, question_type in enumerate(QuestionType)}
+
+
+class QuestionMoviesIndex:
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.version = 0
+        self.movie_id2row: Dict[int, dict] = {}
+        self.movie_id2features: Dict[int, Tuple[int, int, int, int, int]] = {}
+
+        self.rows: List[dict] = []
+        self.movie_ids = np.zeros(0, dtype=np.int64)
+        self.movie_types = np.zeros(0, dtype=np.int8)
+        self.productions = np.zeros(0, dtype=np.int8)
+        self.years = np.zeros(0, dtype=np.int32)
+        self.votes = np.zeros(0, dtype=np.int64)
+        self.question_types = np.zeros(0, dtype=np.int32)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.sorted_movie_ids = np.zeros(0, dtype=np.int64)
+        self.dirty = False
+
+    def load(self, movies: Iterable[Movie], version: int = 0) -> None:
+        with self.lock:
+            self.version = version
+            self.movie_id2row = {}
+            self.movie_id2features = {}
+
+            for movie in movies:
+                self.__add_movie(movie)
+
+            self.loaded = True
+            self.dirty = True
+
+    def add_movie(self, movie: Movie) -> None:
+        with self.lock:
+            if not self.loaded:
+                return
+
+            self.__add_movie(movie)
+            self.dirty = True
+
+    def remove_movie(self, movie_id: int) -> None:
+        with self.lock:
+            if not self.loaded or movie_id not in self.movie_id2row:
+                return
+
+            del self.movie_id2row[movie_id]
+            del self.movie_id2features[movie_id]
+            self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self.movie_id2row)
+
+    def search(self, settings: QuestionSettings) -> np.ndarray:
+        with self.lock:
+            self.__build_columns()
+
+            mask = np.isin(self.movie_types, [MOVIE_TYPE2CODE[movie_type] for movie_type in settings.movie_types])
+            mask &= np.isin(self.productions, [PRODUCTION2CODE[production] for production in settings.production])
+            mask &= np.isin(self.years, list(settings.get_possible_years()))
+            mask &= (self.question_types & self.get_question_types_mask(list(settings.question_types))) != 0
+
+            votes_from, votes_to = settings.votes
+            if isinstance(votes_from, (int, float)):
+                mask &= self.votes >= votes_from
+
+            if isinstance(votes_to, (int, float)):
+                mask &= self.votes <= votes_to
+
+            return np.flatnonzero(mask)
+
+    def get_movies(self, indices: np.ndarray) -> List[dict]:
+        with self.lock:
+            return [dict(self.rows[index]) for index in indices]
+
+    def get_movie_ids(self, indices: np.ndarray) -> np.ndarray:
+        with self.lock:
+            return self.movie_ids[indices]
+
+    # признаки берутся из столбцов индекса, фильмы, которых в индексе уже нет, отмечаются в маске found
+    def get_features(self, movie_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        with self.lock:
+            self.__build_columns()
+
+            if len(self.sorted_movie_ids) == 0:
+                empty = np.zeros(0, dtype=np.int64)
+                return np.zeros(len(movie_ids), dtype=bool), empty, empty, empty
+
+            positions = np.minimum(np.searchsorted(self.sorted_movie_ids, movie_ids), len(self.sorted_movie_ids) - 1)
+            found = self.sorted_movie_ids[positions] == movie_ids
+            indices = self.order[positions[found]]
+            return found, self.movie_types[indices].astype(np.int64), self.productions[indices].astype(np.int64), self.years[indices].astype(np.int64)
+
+    @staticmethod
+    def get_question_types_mask(question_types: List[QuestionType]) -> int:
+        mask = 0
+
+        for question_type in question_types:
+            mask |= QUESTION_TYPE2BIT[question_type]
+
+        return mask
+
+    def __build_columns(self) -> None:
+        if not self.dirty:
+            return
+
+        self.rows = list(self.movie_id2row.values())
+        features = np.array([self.movie_id2features[row["movie_id"]] for row in self.rows], dtype=np.int64).reshape(-1, 5)
+
+        self.movie_ids = np.array([row["movie_id"] for row in self.rows], dtype=np.int64)
+        self.movie_types = features[:, 0].astype(np.int8)
+        self.productions = features[:, 1].astype(np.int8)
+        self.years = features[:, 2].astype(np.int32)
+        self.votes = features[:, 3]
+        self.question_types = features[:, 4].astype(np.int32)
+        self.order = np.argsort(self.movie_ids)
+        self.sorted_movie_ids = self.movie_ids[self.order]
+        self.dirty = False
+
+    def __add_movie(self, movie: Movie) -> None:
+        production_code = PRODUCTION2CODE[movie.production[0]] if movie.production else -1
+        question_types = self.get_question_types_mask(movie.get_question_types())
+
+        self.movie_id2row[movie.movie_id] = {
+            "movie_id": movie.movie_id,
+            "name": movie.name,
+            "movie_type": movie.movie_type.value,
+            "production": [production.value for production in movie.production],
+            "year": movie.year,
+            "sequels": movie.sequels
+        }
+
+        self.movie_id2features[movie.movie_id] = (MOVIE_TYPE2CODE[movie.movie_type], production_code, movie.year, movie.rating.votes_kp, question_types)
@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from src.entities.question import Question
+from src.entities.question_answer import QuestionAnswer
+from src.entities.question_settings import QuestionSettings
+from src.entities.session import Session
+from src.entities.session_question import SessionQuestion
+from src.utils.async_proxy import AsyncProxy
+
+
+# документ сессии в базе - единственный источник истины: игроки одной сессии могут быть подключены к разным воркерам,
+# поэтому каждое изменение выполняется одним условным find_one_and_update, а к локальной копии применяется то же изменение
+class SessionsManager:
+    def __init__(self, database: AsyncProxy) -> None:
+        self.database = database
+        self.sessions: Dict[str, Session] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.lock_users: Dict[str, int] = {}
+
+    # блокировка удаляется, только когда её не держит и не ждёт ни один обработчик,
+    # иначе новый обработчик получил бы другую блокировку и работал бы с сессией одновременно с разбуженным
+    @asynccontextmanager
+    async def lock(self, session_id: str) -> AsyncIterator[None]:
+        if session_id not in self.locks:
+            self.locks[session_id] = asyncio.Lock()
+
+        lock = self.locks[session_id]
+        self.lock_users[session_id] = self.lock_users.get(session_id, 0) + 1
+
+        try:
+            async with lock:
+                yield
+        finally:
+            self.lock_users[session_id] -= 1
+
+            if self.lock_users[session_id] == 0:
+                del self.lock_users[session_id]
+                del self.locks[session_id]
+
+    async def get_session(self, session_id: str) -> Optional[Session]:
+        if session_id in self.sessions:
+            return self.sessions[session_id]
+
+        session = await self.database.get_session(session_id=session_id)
+        if session is None:
+            return None
+
+        # пока шёл запрос, сессию мог загрузить другой обработчик
+        return self.sessions.setdefault(session_id, session)
+
+    async def create_session(self, session: Session) -> None:
+        await self.database.sessions.insert_one(session.to_dict())
+        self.sessions[session.session_id] = session
+
+    async def remove_session(self, session_id: str) -> None:
+        await self.database.sessions.delete_one({"session_id": session_id})
+        await self.database.session_questions.delete_many({"session_id": session_id})
+        self.release_session(session_id)
+
+    def release_session(self, session_id: str) -> None:
+        self.sessions.pop(session_id, None)
+
+    async def add_player(self, session: Session, username: str) -> Optional[Session]:
+        return await self.__update(session, {"$addToSet": {"players": username}}, apply=lambda local: local.add_player(username))
+
+    async def remove_player(self, session: Session, username: str) -> Optional[Session]:
+        def apply(local: Session) -> None:
+            local.players = [player for player in local.players if player != username]
+
+        if (session := await self.__update(session, {"$pull": {"players": username}}, apply=apply)) is None or session.players:
+            return session
+
+        def clear(local: Session) -> None:
+            local.set_question(None)
+            local.round_number += 1
+
+        # последний игрок ушёл: вопрос сбрасывается, только если за это время никто не подключился
+        update = {"$set": {"question": None, "answers": {}}, "$inc": {"round_number": 1}}
+        cleared = await self.__update(session, update, apply=clear, condition={"players": [], "round_number": session.round_number})
+        return cleared if cleared is not None else await self.get_session(session.session_id)
+
+    async def add_answer(self, session: Session, username: str, answer: QuestionAnswer, round_number: int) -> Optional[Session]:
+        update = {"$set": {f"answers.{username}": answer.to_dict()}, "$push": {f"statistics.{username}": answer.to_dict()}}
+        condition = {"round_number": round_number, "question": {"$ne": None}, f"answers.{username}": {"$exists": False}}
+        return await self.__update(session, update, apply=lambda local: local.add_answer(username, answer), condition=condition)
+
+    async def advance(self, session: Session, question: Optional[Question], answered_question: Optional[Question] = None, max_count: int = 0) -> Optional[Session]:
+        update = {"$set": {"question": question.to_dict() if question else None, "answers": {}}, "$inc": {"round_number": 1}}
+        session_question = None
+
+        # полный вопрос хранится отдельно, а в сессии остаётся только то, что нужно для выбора следующего
+        if answered_question is not None:
+            session_question = SessionQuestion.from_question(question_id=ObjectId(), question=answered_question)
+            update["$push"] = {"questions": {"$each": [session_question.to_dict()], "$slice": -max_count}}
+
+        def apply(local: Session) -> None:
+            local.set_question(question)
+            local.round_number += 1
+
+            if session_question is not None:
+                local.add_question(session_question, max_count=max_count)
+
+        # переход выполнит только тот воркер, который первым обновит документ в текущем раунде
+        advanced = await self.__update(session, update, apply=apply, condition={"round_number": session.round_number})
+
+        if advanced is not None and session_question is not None:
+            await self.database.session_questions.insert_one({"_id": session_question.question_id, "session_id": session.session_id, "question": answered_question.to_dict()})
+
+        return advanced
+
+    async def update_settings(self, session: Session, question_settings: QuestionSettings) -> Optional[Session]:
+        if question_settings == session.question_settings:
+            return None
+
+        return await self.__update(session, {"$set": {"question_settings": question_settings.to_dict()}}, apply=lambda local: local.update_settings(question_settings))
+
+    async def clear_statistics(self, session: Session) -> Optional[Session]:
+        return await self.__update(session, {"$set": {"statistics": {}}}, apply=lambda local: local.clear_statistics())
+
+    async def __update(self, session: Session, update: dict, apply: Callable[[Session], None], condition: Optional[dict] = None) -> Optional[Session]:
+        # номер изменения выдаётся тем же запросом, что и само изменение, поэтому события и снимки нумеруются одинаково на всех воркерах
+        query = {"session_id": session.session_id, **(condition or {})}
+        update = {**update, "$inc": {**update.get("$inc", {}), "seq": 1}}
+        data = await self.database.sessions.find_one_and_update(query, update, projection={"_id": 0, "seq": 1}, return_document=ReturnDocument.AFTER)
+
+        # условие не выполнено или сессия удалена: локальная копия могла устареть
+        if data is None:
+            self.sessions.pop(session.session_id, None)
+            return None
+
+        # документ целиком читается, только если между локальной копией и этим изменением его менял другой воркер
+        local = self.sessions.get(session.session_id)
+        if local is None or local.seq + 1 != data["seq"]:
+            self.sessions.pop(session.session_id, None)
+            return await self.get_session(session.session_id)
+
+        apply(local)
+        local.seq = data["seq"]
+        return local
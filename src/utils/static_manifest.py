@@ -0,0 +1,102 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+
+
+class StaticManifest:
+    # без check_interval манифест строится один раз, а опрос файлов нужен только при разработке с автоперезагрузкой
+    def __init__(self, root: str, directories: List[str], check_interval: Optional[float] = None) -> None:
+        self.root = root
+        self.directories = directories
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+
+        self.path2file: Dict[str, Tuple[float, str]] = {}
+        self.version = ""
+        self.checked_at = 0
+
+    def get_version(self) -> str:
+        self.refresh()
+        return self.version
+
+    def get_url(self, url: str) -> str:
+        self.refresh()
+
+        if url not in self.path2file:
+            return f"{url}?v={self.version}"
+
+        return f"{url}?v={self.path2file[url][1]}"
+
+    def refresh(self) -> None:
+        # файлы перечитываются только при изменении mtime и не чаще раза в check_interval секунд
+        if self.__is_fresh():
+            return
+
+        with self.lock:
+            if self.__is_fresh():
+                return
+
+            path2file = {}
+            for directory in self.directories:
+                for path, _, files in os.walk(os.path.join(self.root, directory)):
+                    for name in files:
+                        filename = os.path.join(path, name)
+                        url = "/" + os.path.relpath(filename, self.root).replace(os.sep, "/")
+                        mtime = os.path.getmtime(filename)
+                        cached = self.path2file.get(url)
+                        path2file[url] = cached if cached and cached[0] == mtime else (mtime, self.__get_hash(filename))
+
+            if path2file != self.path2file or not self.version:
+                self.path2file = path2file
+                self.version = self.__get_version()
+
+            self.checked_at = time.monotonic()
+
+    def __is_fresh(self) -> bool:
+        if not self.version:
+            return False
+
+        return self.check_interval is None or time.monotonic() - self.checked_at < self.check_interval
+
+    def __get_version(self) -> str:
+        hash_md5 = hashlib.md5()
+
+        for url in sorted(self.path2file):
+            hash_md5.update(f"{url}:{self.path2file[url][1]}".encode("utf-8"))
+
+        return hash_md5.hexdigest()
+
+    def __get_hash(self, filename: str) -> str:
+        hash_md5 = hashlib.md5()
+
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(4096), b""):
+                hash_md5.update(chunk)
+
+        return hash_md5.hexdigest()
+
+
+class ImmutableStaticFiles(StaticFiles):
+    @staticmethod
+    def is_versioned(query_string: bytes) -> bool:
+        return "v" in parse_qs(query_string.decode("latin-1"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # адреса с отпечатком содержимого никогда не меняются, поэтому их можно кэшировать навсегда
+        if not self.is_versioned(scope.get("query_string", b"")):
+            await super().__call__(scope, receive, send)
+            return
+
+        async def send_with_headers(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"cache-control", b"public, max-age=31536000, immutable")]
+
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_headers)
@@ -0,0 +1,48 @@
+import threading
+import time
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    def __init__(self, ttl: float, max_size: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.key2value: Dict[Hashable, Tuple[float, T]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self.lock:
+            if key in self.key2value and self.key2value[key][0] > time.monotonic():
+                self.hits += 1
+                return self.key2value[key][1]
+
+            self.key2value.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: T) -> None:
+        with self.lock:
+            if len(self.key2value) >= self.max_size and key not in self.key2value:
+                self.__remove_expired()
+
+            # если устаревших записей нет, вытесняется самая старая
+            if len(self.key2value) >= self.max_size and key not in self.key2value:
+                self.key2value.pop(next(iter(self.key2value)))
+
+            self.key2value[key] = (time.monotonic() + self.ttl, value)
+
+    def remove(self, key: Hashable) -> None:
+        with self.lock:
+            self.key2value.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.key2value.clear()
+
+    def __remove_expired(self) -> None:
+        now = time.monotonic()
+        self.key2value = {key: value for key, value in self.key2value.items() if value[0] > now}
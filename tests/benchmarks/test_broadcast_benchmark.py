@@ -0,0 +1,141 @@
+import asyncio
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+from unittest import TestCase
+
+import numpy as np
+import uvicorn
+import websockets
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+from src import logger
+from src.utils.async_proxy import AsyncProxy
+from src.utils.connection_manager import ConnectionManager
+
+
+class SlowDatabase:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def get_user(self, username: str) -> dict:
+        time.sleep(self.delay)
+        return {"username": username}
+
+
+# вызовы выполняются прямо в цикле событий, как до переноса запросов к базе в пул потоков
+class InlineProxy:
+    def __init__(self, target: object) -> None:
+        self.target = target
+
+    def __getattr__(self, name: str) -> Callable:
+        method = getattr(self.target, name)
+
+        async def wrapper(*args: object, **kwargs: object) -> object:
+            return method(*args, **kwargs)
+
+        return wrapper
+
+
+def make_app(database: object, manager: ConnectionManager) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/user")
+    async def get_user() -> JSONResponse:
+        return JSONResponse(await database.get_user(username="user"))
+
+    @app.websocket("/ws")
+    async def websocket_endpoint(websocket: WebSocket) -> None:
+        await manager.connect(websocket, session_id="benchmark")
+
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            manager.disconnect(websocket, session_id="benchmark")
+
+    return app
+
+
+class TestBroadcastBenchmark(TestCase):
+    players = 10
+    rounds = 20
+    broadcast_interval = 0.02
+    http_clients = 8
+    http_requests = 10
+    query_time = 0.05
+
+    def test_broadcast_during_http_requests(self) -> None:
+        executor = ThreadPoolExecutor(max_workers=self.http_clients)
+        database = SlowDatabase(delay=self.query_time)
+
+        inline = asyncio.run(self.__measure(InlineProxy(target=database)))
+        offloaded = asyncio.run(self.__measure(AsyncProxy(target=database, executor=executor)))
+        executor.shutdown()
+
+        self.assertEqual(len(inline), self.players * self.rounds)
+        self.assertEqual(len(offloaded), self.players * self.rounds)
+
+        inline_p50, inline_p99 = np.percentile(inline, [50, 99]) * 1000
+        offloaded_p50, offloaded_p99 = np.percentile(offloaded, [50, 99]) * 1000
+        logger.info(f"broadcast to {self.players} players during {self.http_clients} HTTP clients: "
+                    f"queries on the event loop p50 {inline_p50:.1f} ms / p99 {inline_p99:.1f} ms, "
+                    f"queries in the thread pool p50 {offloaded_p50:.1f} ms / p99 {offloaded_p99:.1f} ms")
+
+        # пока запросы к базе ждут в пуле потоков, рассылка не ждёт их завершения
+        self.assertLess(offloaded_p99, inline_p99)
+        self.assertLess(offloaded_p99, self.query_time * 1000 * 2)
+
+    async def __measure(self, database: object) -> List[float]:
+        manager = ConnectionManager(logger=logger, queue_size=self.rounds + 1)
+        server = uvicorn.Server(uvicorn.Config(make_app(database=database, manager=manager), log_level="warning", lifespan="off"))
+
+        server_socket = socket.socket()
+        server_socket.bind(("127.0.0.1", 0))
+        port = server_socket.getsockname()[1]
+        serving = asyncio.create_task(server.serve(sockets=[server_socket]))
+
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        clients = [await websockets.connect(f"ws://127.0.0.1:{port}/ws") for _ in range(self.players)]
+        while len(manager.active_connections.get("benchmark", [])) < self.players:
+            await asyncio.sleep(0.01)
+
+        latencies = []
+
+        async def receive(client: websockets.ClientConnection) -> None:
+            for _ in range(self.rounds):
+                message = json.loads(await client.recv())
+                latencies.append(time.perf_counter() - message["sent_at"])
+
+        async def broadcast() -> None:
+            # рассылка начинается, когда запросы уже выполняются, а задержка считается от запланированного момента,
+            # чтобы учитывать и время, которое сама рассылка ждала заблокированный цикл событий
+            start = time.perf_counter() + self.query_time
+
+            for round_number in range(self.rounds):
+                sent_at = start + round_number * self.broadcast_interval
+                await asyncio.sleep(max(sent_at - time.perf_counter(), 0))
+                await manager.broadcast(session_id="benchmark", message={"round_number": round_number, "sent_at": sent_at})
+
+        async def load() -> None:
+            for _ in range(self.http_requests):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /user HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                self.assertTrue(response.startswith(b"HTTP/1.1 200"))
+
+        await asyncio.gather(broadcast(), *[receive(client) for client in clients], *[load() for _ in range(self.http_clients)])
+
+        for client in clients:
+            await client.close()
+
+        server.should_exit = True
+        await serving
+        return latencies
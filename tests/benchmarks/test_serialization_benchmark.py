@@ -0,0 +1,126 @@
+import json
+import time
+from typing import Callable, List
+from unittest import TestCase
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src import logger
+from src.api import EntityJSONResponse
+from src.entities.actor import Actor
+from src.entities.metadata import Metadata
+from src.entities.movie import Movie
+from src.entities.person import Person
+from src.entities.question import MovieByActorsQuestion, MovieByDescriptionQuestion, Question
+from src.entities.rating import Rating
+from src.entities.source import KinopoiskSource
+from src.entities.spoiler_text import SpoilerText
+from src.enums import Genre, MovieType, Production, QuestionType
+from src.utils.json_codec import to_json_bytes
+
+
+def make_movie(movie_id: int) -> dict:
+    movie = Movie(
+        movie_id=movie_id,
+        name=f"Фильм номер {movie_id}",
+        source=KinopoiskSource(kinopoisk_id=1000 + movie_id),
+        movie_type=MovieType.MOVIE,
+        year=1990 + movie_id,
+        slogan="Слоган фильма",
+        description=SpoilerText(text="Длинное описание фильма " * 20, spoilers=[(5, 9), (20, 31)]),
+        short_description=SpoilerText(text="Короткое описание", spoilers=[]),
+        production=[Production.RUSSIAN],
+        countries=["Россия", "США"],
+        genres=[Genre.BIOGRAPHY, Genre.HISTORY],
+        actors=[Actor(person_id=person_id, description=f"роль {person_id}") for person_id in range(15)],
+        directors=[Actor(person_id=100, description="")],
+        duration=128.5,
+        rating=Rating(rating_kp=7.9, rating_imdb=7.2, votes_kp=123456),
+        image_urls=[f"/images/{movie_id}/{i}.jpg" for i in range(10)],
+        poster_url=f"/posters/{movie_id}.jpg",
+        banner_url=f"/banners/{movie_id}.jpg",
+        facts=[SpoilerText(text=f"факт {i}", spoilers=[]) for i in range(10)],
+        cites=list(range(10)),
+        tracks=list(range(5)),
+        alternative_names=[f"Movie {movie_id}"],
+        metadata=Metadata.initial(username="user"),
+        sequels=[]
+    )
+
+    return movie.to_dict()
+
+
+def make_person(person_id: int) -> dict:
+    metadata = Metadata.initial(username="user")
+    person = Person(person_id=person_id, kinopoisk_id=5000 + person_id, name=f"Актёр {person_id}", photo_url=f"/photos/{person_id}.jpg", metadata=metadata)
+    return person.to_dict()
+
+
+def make_question(movie_id: int) -> dict:
+    if movie_id % 2:
+        actors = [Person.from_dict(make_person(person_id)) for person_id in range(3)]
+        question = MovieByActorsQuestion(title="Назовите фильм по актёрам", answer=f"Фильм номер {movie_id}", actors=actors, hide_actor_photos=False)
+        question.init_base(question_type=QuestionType.MOVIE_BY_ACTORS, username="user", movie_id=movie_id)
+    else:
+        description = SpoilerText(text="Описание", spoilers=[(0, 3)])
+        question = MovieByDescriptionQuestion(title="Назовите фильм по описанию", answer=f"Фильм номер {movie_id}", description=description)
+        question.init_base(question_type=QuestionType.MOVIE_BY_DESCRIPTION, username="user", movie_id=movie_id)
+
+    return question.to_dict()
+
+
+class TestSerializationBenchmark(TestCase):
+    repeats = 50
+
+    def setUp(self) -> None:
+        self.movies = [make_movie(movie_id) for movie_id in range(20)]
+        self.persons = [make_person(person_id) for person_id in range(20)]
+        self.questions = [make_question(movie_id) for movie_id in range(20)]
+
+    def test_movies(self) -> None:
+        self.__round_trip("movies", self.movies, Movie.from_dict)
+
+    def test_persons(self) -> None:
+        self.__round_trip("persons", self.persons, Person.from_dict)
+
+    def test_questions(self) -> None:
+        self.__round_trip("questions", self.questions, Question.from_dict)
+
+    def test_search_page_response(self) -> None:
+        movies = [Movie.from_dict(movie) for movie in self.movies]
+        content = {
+            "status": "success",
+            "total": 1000,
+            "movies": movies,
+            "person_id2person": {person["person_id"]: Person.from_dict(person) for person in self.persons},
+            "movie_id2scale": {movie.movie_id: {"incorrect": 1, "correct": 2, "scale": 2 / 3} for movie in movies}
+        }
+
+        baseline_response = JSONResponse({key: jsonable_encoder(value) for key, value in content.items()})
+        response = EntityJSONResponse(content)
+        self.assertEqual(json.loads(response.body), json.loads(baseline_response.body))
+        self.assertIn("Фильм номер 0".encode("utf-8"), response.body)
+
+        baseline = self.__measure(lambda: JSONResponse({key: jsonable_encoder(value) for key, value in content.items()}).body)
+        codec = self.__measure(lambda: EntityJSONResponse(content).body)
+        logger.info(f"search page response: JSONResponse + jsonable_encoder {baseline * 1000:.2f} ms, EntityJSONResponse {codec * 1000:.2f} ms ({baseline / codec:.1f}x)")
+
+    def __round_trip(self, name: str, documents: List[dict], decode: Callable[[dict], object]) -> None:
+        objects = [decode(document) for document in documents]
+        self.assertEqual(orjson.loads(to_json_bytes(objects)), jsonable_encoder(objects))
+
+        baseline = self.__measure(lambda: json.dumps(jsonable_encoder([decode(document) for document in documents]), ensure_ascii=False).encode("utf-8"))
+        codec = self.__measure(lambda: to_json_bytes([decode(document) for document in documents]))
+        logger.info(f"{name}: jsonable_encoder {len(documents) / baseline:.0f} obj/s, codec {len(documents) / codec:.0f} obj/s ({baseline / codec:.1f}x)")
+
+    def __measure(self, function: Callable[[], bytes]) -> float:
+        times: List[float] = []
+
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+        return sorted(times)[len(times) // 2]
@@ -0,0 +1,44 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from unittest import TestCase
+
+from src.utils.async_proxy import AsyncProxy
+
+
+class SlowDatabase:
+    def __init__(self) -> None:
+        self.name = "slow"
+
+    def get_session(self, session_id: str) -> str:
+        time.sleep(0.2)
+        return session_id
+
+
+class TestAsyncProxy(TestCase):
+    def setUp(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.database = AsyncProxy(target=SlowDatabase(), executor=self.executor)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+
+    def test_attributes(self) -> None:
+        self.assertEqual(self.database.name, "slow")
+        self.assertEqual(asyncio.run(self.database.get_session(session_id="session")), "session")
+
+    def test_event_loop_not_blocked(self) -> None:
+        async def measure_lags(lags: List[float]) -> None:
+            for _ in range(20):
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - start - 0.01)
+
+        async def run() -> List[float]:
+            lags = []
+            await asyncio.gather(measure_lags(lags), *[self.database.get_session(session_id=str(i)) for i in range(8)])
+            return lags
+
+        # имитация рассылки по сокетам не должна ждать завершения медленных запросов
+        self.assertLess(max(asyncio.run(run())), 0.1)
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+from multiprocessing.synchronize import Barrier
+from typing import List
+from unittest import TestCase
+
+from src import logger
+from src.utils.broadcast_bus import BusMessage, SocketBroadcastBus
+from src.utils.connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.messages: List[str] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.messages.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+async def run_worker(index: int, path: str, workers: int, messages: int, barrier: Barrier) -> List[List[str]]:
+    loop = asyncio.get_running_loop()
+    remote_changes = []
+    manager = ConnectionManager(logger=logger, bus=SocketBroadcastBus(path=path, logger=logger), on_remote_change=remote_changes.append, queue_size=workers * messages)
+    await manager.start()
+
+    websockets = [FakeWebSocket() for _ in range(2)]
+    for websocket in websockets:
+        await manager.connect(websocket, session_id="session")
+
+    # ожидание всех воркеров не блокирует цикл событий, чтобы ретранслятор продолжал принимать подключения
+    await loop.run_in_executor(None, barrier.wait)
+    await asyncio.sleep(0.2)
+
+    for i in range(messages):
+        await manager.broadcast(session_id="session", message={"worker": index, "index": i}, sequenced=True)
+
+    for _ in range(100):
+        if all(len(websocket.messages) == workers * messages for websocket in websockets):
+            break
+
+        await asyncio.sleep(0.05)
+
+    await loop.run_in_executor(None, barrier.wait)
+    await manager.stop()
+    return [websocket.messages for websocket in websockets] + [[str(len(remote_changes))]]
+
+
+def worker(index: int, path: str, workers: int, messages: int, barrier: Barrier, results: multiprocessing.Queue) -> None:
+    results.put((index, asyncio.run(run_worker(index, path, workers, messages, barrier))))
+
+
+class TestBroadcastBus(TestCase):
+    def test_encode_decode(self) -> None:
+        message = BusMessage(origin="origin", channel="session", sequenced=True, text='{"text": "привет\\tмир"}')
+        self.assertEqual(BusMessage.decode(message.encode()), message)
+
+    def test_multiple_processes(self) -> None:
+        workers, messages = 3, 20
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(workers)
+        results = context.Queue()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "broadcast.sock")
+            processes = [context.Process(target=worker, args=(index, path, workers, messages, barrier, results)) for index in range(workers)]
+
+            for process in processes:
+                process.start()
+
+            index2messages = dict(results.get(timeout=30) for _ in range(workers))
+
+            for process in processes:
+                process.join(timeout=10)
+
+        orders = []
+
+        for index in range(workers):
+            *websockets_messages, remote_changes = index2messages[index]
+            self.assertEqual(remote_changes, [str((workers - 1) * messages)])
+
+            for websocket_messages in websockets_messages:
+                events = [json.loads(message) for message in websocket_messages]
+                orders.append([(event["worker"], event["index"]) for event in events])
+
+        # все подключения во всех процессах получают события в одном и том же порядке
+        self.assertTrue(all(order == orders[0] for order in orders))
+        self.assertEqual(sorted(orders[0]), [(index, i) for index in range(workers) for i in range(messages)])
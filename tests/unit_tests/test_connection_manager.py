@@ -0,0 +1,105 @@
+import asyncio
+from typing import List
+from unittest import TestCase
+
+from src import logger
+from src.utils.connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.messages: List[str] = []
+        self.closed = False
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.messages.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+
+
+class TestConnectionManager(TestCase):
+    def test_broadcast(self) -> None:
+        async def run() -> List[FakeWebSocket]:
+            manager = ConnectionManager(logger=logger, queue_size=4, send_timeout=0.05)
+            websockets = [FakeWebSocket(delay=0.001) for _ in range(3)] + [FakeWebSocket(delay=1)]
+
+            for websocket in websockets:
+                await manager.connect(websocket, session_id="session")
+
+            await manager.broadcast(session_id="session", message={"action": "message", "text": "привет"})
+            await asyncio.sleep(0.1)
+
+            # медленный клиент не задерживает остальных и отключается по таймауту
+            self.assertEqual(len(manager.active_connections["session"]), 3)
+
+            for i in range(3):
+                await manager.broadcast(session_id="session", message={"index": i})
+
+            await asyncio.sleep(0.05)
+
+            for websocket in websockets[:3]:
+                manager.disconnect(websocket, session_id="session")
+
+            self.assertNotIn("session", manager.active_connections)
+            return websockets
+
+        websockets = asyncio.run(run())
+
+        for websocket in websockets[:3]:
+            self.assertEqual(websocket.messages, ['{"action": "message", "text": "привет"}', '{"index": 0}', '{"index": 1}', '{"index": 2}'])
+
+        self.assertEqual(websockets[3].messages, [])
+        self.assertTrue(websockets[3].closed)
+
+    def test_queue_overflow(self) -> None:
+        async def run() -> FakeWebSocket:
+            manager = ConnectionManager(logger=logger, queue_size=2, send_timeout=10)
+            websocket = FakeWebSocket(delay=1)
+            await manager.connect(websocket, session_id="session")
+
+            for i in range(4):
+                await manager.broadcast(session_id="session", message={"index": i})
+
+            self.assertNotIn("session", manager.active_connections)
+            await asyncio.sleep(0.01)
+            return websocket
+
+        self.assertTrue(asyncio.run(run()).closed)
+
+    def test_heartbeat(self) -> None:
+        async def run() -> List[FakeWebSocket]:
+            manager = ConnectionManager(logger=logger, ping_interval=0.02, pong_timeout=0.1)
+            await manager.start()
+            websockets = [FakeWebSocket(delay=0) for _ in range(3)]
+
+            for websocket in websockets:
+                await manager.connect(websocket, session_id="session")
+
+            self.assertEqual(manager.get_statistics(), {"sessions": 1, "sockets": 3, "tasks": 3, "heartbeat": True})
+
+            # первый сокет отвечает на пинги, второй молчит, третий отключается сам
+            manager.disconnect(websockets[2], session_id="session")
+
+            for _ in range(10):
+                await asyncio.sleep(0.02)
+                manager.pong(websockets[0], session_id="session")
+
+            statistics = manager.get_statistics()
+            await manager.stop()
+            await asyncio.sleep(0)
+
+            self.assertEqual(statistics, {"sessions": 1, "sockets": 1, "tasks": 1, "heartbeat": True})
+            self.assertEqual(manager.get_statistics()["heartbeat"], False)
+            return websockets
+
+        websockets = asyncio.run(run())
+        self.assertGreater(websockets[0].messages.count("ping"), 3)
+        self.assertFalse(websockets[0].closed)
+        self.assertTrue(websockets[1].closed)
+        self.assertEqual(websockets[2].messages, [])
@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+from src.utils.indexes import INDEXES, OBSOLETE_INDEXES, get_collection_scans
+
+
+class TestIndexes(TestCase):
+    def test_collection_scans(self) -> None:
+        index_scan = {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "movie_id_1"}}}}
+        self.assertEqual(get_collection_scans(index_scan), [])
+
+        or_scan = {"queryPlanner": {"winningPlan": {"stage": "SUBPLAN", "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}}}}
+        self.assertEqual(get_collection_scans(or_scan), ["COLLSCAN"])
+
+        sbe_scan = {"queryPlanner": {"winningPlan": {"queryPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}, "slotBasedPlan": {}}}}
+        self.assertEqual(get_collection_scans(sbe_scan), ["COLLSCAN"])
+
+    def test_obsolete_indexes(self) -> None:
+        for collection_name, index_names in OBSOLETE_INDEXES.items():
+            names = {index.get_name() for index in INDEXES[collection_name]}
+            self.assertFalse(names.intersection(index_names))
@@ -0,0 +1,62 @@
+import re
+from unittest import TestCase
+
+from src.query_params.movie_search import MovieSearch
+from src.utils.movie_names_index import MovieNamesIndex
+
+
+class TestMovieNamesIndex(TestCase):
+    def setUp(self) -> None:
+        self.index = MovieNamesIndex()
+        self.index.load([
+            {"movie_id": 1, "name": "Ёлки", "alternative_names": ["Yolki"], "year": 2010, "poster_url": "/1.webp", "rating": {"votes_kp": 500}},
+            {"movie_id": 2, "name": "Зелёная миля", "alternative_names": ["The Green Mile"], "year": 1999, "poster_url": "/2.webp", "rating": {"votes_kp": 1000}},
+            {"movie_id": 3, "name": "Мой сосед Тоторо", "alternative_names": ["Tonari no Totoro"], "year": 1988, "poster_url": "/3.webp", "rating": {"votes_kp": 300}},
+            {"movie_id": 4, "name": "Миля", "alternative_names": [], "year": 2005, "poster_url": "/4.webp", "rating": {"votes_kp": 10}}
+        ])
+
+    def search(self, query: str) -> list:
+        return sorted(self.index.search(MovieSearch(query=query).get_name_search()))
+
+    def test_search(self) -> None:
+        self.assertEqual(self.search("елки"), [1])
+        self.assertEqual(self.search("ЁЛК"), [1])
+        self.assertEqual(self.search("зеленая"), [2])
+        self.assertEqual(self.search("миля"), [2, 4])
+        self.assertEqual(self.search("^миля"), [4])
+        self.assertEqual(self.search("миля$"), [2, 4])
+        self.assertEqual(self.search("green"), [2])
+        self.assertEqual(self.search("тоторо$"), [3])
+        self.assertEqual(self.search("^tonari"), [3])
+        self.assertEqual(self.search("мил"), [2, 4])
+        self.assertEqual(self.search("молоко"), [])
+
+    def test_updates(self) -> None:
+        self.index.add_movie({"movie_id": 4, "name": "Милый дом", "alternative_names": ["Sweet home"], "year": 2020, "poster_url": "", "rating": {"votes_kp": 10}})
+        self.assertEqual(self.search("миля"), [2])
+        self.assertEqual(self.search("^мил"), [4])
+        self.assertEqual(self.search("home$"), [4])
+
+        self.index.remove_movie(2)
+        self.assertEqual(self.search("мил"), [4])
+        self.assertEqual(self.search("^the"), [])
+
+    def test_autocomplete(self) -> None:
+        self.assertEqual(self.index.autocomplete("Зел", count=5), [{"movie_id": 2, "name": "Зелёная миля", "year": 1999, "poster_url": "/2.webp"}])
+        self.assertEqual([movie["movie_id"] for movie in self.index.autocomplete("ми", count=5)], [4, 2])
+        self.assertEqual([movie["movie_id"] for movie in self.index.autocomplete("ми", count=1)], [4])
+        self.assertEqual([movie["movie_id"] for movie in self.index.autocomplete("мил", count=5)], [4, 2])
+        self.assertEqual([movie["movie_id"] for movie in self.index.autocomplete("тотаро", count=5)], [3])
+        self.assertEqual([movie["movie_id"] for movie in self.index.autocomplete("грин майл", count=5)], [])
+        self.assertEqual([movie["movie_id"] for movie in self.index.autocomplete("green mle", count=5)], [2])
+        self.assertEqual(self.index.autocomplete("  ", count=5), [])
+
+    def test_same_as_regex(self) -> None:
+        movies = [{"movie_id": movie_id, "name": name, "alternative_names": []} for movie_id, name in enumerate(["abcab", "bcabc", "cab", "abc", "aab", "b"])]
+        self.index.load(movies)
+
+        for query in ["a", "ab", "abc", "bca", "cab", "^ab", "^b", "ab$", "c$", "abcab", "^abcab$"]:
+            name_search = MovieSearch(query=query).get_name_search()
+            pattern = f"^{re.escape(name_search.text)}" if name_search.prefix else f"{re.escape(name_search.text)}$" if name_search.suffix else re.escape(name_search.text)
+            expected = [movie["movie_id"] for movie in movies if re.search(pattern, movie["name"])]
+            self.assertEqual(self.search(query), expected, query)
@@ -0,0 +1,71 @@
+import copy
+from typing import List, Optional
+from unittest import TestCase
+
+from src import logger
+from src.database import Database
+from src.entities.question_settings import QuestionSettings
+from src.enums import MovieType, Production
+from src.movie_database import MovieDatabase
+from tests.unit_tests.utils import make_movie
+
+
+class FakeCollection:
+    def __init__(self, documents: Optional[List[dict]] = None) -> None:
+        self.documents = documents or []
+        self.finds = 0
+
+    def find(self, query: dict, projection: Optional[dict] = None) -> List[dict]:
+        self.finds += 1
+        return copy.deepcopy(self.documents)
+
+    def find_one(self, query: dict, projection: Optional[dict] = None) -> Optional[dict]:
+        return next((copy.deepcopy(document) for document in self.documents if all(document.get(key) == value for key, value in query.items())), None)
+
+    def find_one_and_update(self, query: dict, update: dict, return_document: bool) -> dict:
+        document = next(document for document in self.documents if document["_id"] == query["_id"])
+        document["value"] += update["$inc"]["value"]
+        return copy.deepcopy(document)
+
+    def insert_one(self, document: dict) -> None:
+        self.documents.append(copy.deepcopy(document))
+
+
+class TestMoviesVersion(TestCase):
+    def setUp(self) -> None:
+        self.database = Database(mongo_url="", database_name="")
+        self.database.identifiers = FakeCollection([{"_id": "movies_version", "value": 0}])
+        self.database.movies = FakeCollection([make_movie(1, MovieType.MOVIE, Production.FOREIGN, 2001, 1000).to_dict()])
+        self.database.history = FakeCollection()
+
+        # две базы фильмов с общими коллекциями играют роль разных воркеров
+        self.movie_database = MovieDatabase(database=self.database, kinopoisk_parser=None, yandex_music_parser=None, logger=logger)
+        self.other_movie_database = MovieDatabase(database=self.database, kinopoisk_parser=None, yandex_music_parser=None, logger=logger)
+
+        for movie_database in [self.movie_database, self.other_movie_database]:
+            movie_database.movies_version_check_interval = 0
+
+    def get_question_movie_ids(self, movie_database: MovieDatabase) -> List[int]:
+        return sorted(movie["movie_id"] for movie in movie_database.get_question_movies(QuestionSettings.default()))
+
+    def test_other_process(self) -> None:
+        self.assertEqual(self.get_question_movie_ids(self.movie_database), [1])
+        self.assertEqual(self.get_question_movie_ids(self.other_movie_database), [1])
+        self.assertEqual(len(self.other_movie_database.autocomplete_movies(query="Movie", count=5)), 1)
+
+        self.movie_database.add_movie(make_movie(2, MovieType.MOVIE, Production.FOREIGN, 2002, 1000), username="user")
+        finds = self.database.movies.finds
+
+        # своё изменение применяется к индексу без перезагрузки
+        self.assertEqual(self.get_question_movie_ids(self.movie_database), [1, 2])
+        self.assertEqual(self.database.movies.finds, finds)
+
+        # другой процесс замечает новую версию и перезагружает индексы
+        self.assertEqual(self.get_question_movie_ids(self.other_movie_database), [1, 2])
+        self.assertEqual(self.other_movie_database.question_movies_index.version, 1)
+        self.assertEqual(len(self.other_movie_database.autocomplete_movies(query="Movie", count=5)), 2)
+        self.assertEqual(self.other_movie_database.movie_names_index.version, 1)
+        self.assertEqual(self.database.movies.finds, finds + 2)
+
+        self.assertEqual(self.get_question_movie_ids(self.other_movie_database), [1, 2])
+        self.assertEqual(self.database.movies.finds, finds + 2)
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from src.entities.question_settings import QuestionSettings
+from src.enums import MovieType, Production, QuestionType
+from src.utils.question_movies_index import QuestionMoviesIndex
+from tests.unit_tests.utils import make_movie
+
+
+class TestQuestionMoviesIndex(TestCase):
+    def setUp(self) -> None:
+        self.index = QuestionMoviesIndex()
+        self.index.load([
+            make_movie(1, MovieType.MOVIE, Production.FOREIGN, 2001, 1000, slogan="slogan"),
+            make_movie(2, MovieType.ANIME, Production.FOREIGN, 2010, 50000, image_urls=["url"]),
+            make_movie(3, MovieType.SERIES, Production.RUSSIAN, 1975, 20000),
+            make_movie(4, MovieType.CARTOON, Production.KOREAN, 2022, 300, image_urls=["url"])
+        ])
+
+    def get_movie_ids(self, settings: QuestionSettings) -> set:
+        return {movie["movie_id"] for movie in self.index.get_movies(self.index.search(settings))}
+
+    def test_default_settings(self) -> None:
+        self.assertEqual(self.get_movie_ids(QuestionSettings.default()), {1, 2, 3, 4})
+
+    def test_filters(self) -> None:
+        settings = QuestionSettings.default()
+        settings.movie_types = {MovieType.MOVIE: 0.5, MovieType.ANIME: 0.5}
+        self.assertEqual(self.get_movie_ids(settings), {1, 2})
+
+        settings = QuestionSettings.default()
+        settings.production = {Production.RUSSIAN: 0.5, Production.KOREAN: 0.5}
+        self.assertEqual(self.get_movie_ids(settings), {3, 4})
+
+        settings = QuestionSettings.default()
+        settings.votes = (1000, 20000)
+        self.assertEqual(self.get_movie_ids(settings), {1, 3})
+
+        settings = QuestionSettings.default()
+        settings.years = {(2000, 2009): 1, (2020, ""): 1}
+        self.assertEqual(self.get_movie_ids(settings), {1, 4})
+
+        settings = QuestionSettings.default()
+        settings.question_types = {QuestionType.MOVIE_BY_IMAGE: 0.5, QuestionType.MOVIE_BY_SLOGAN: 0.5}
+        self.assertEqual(self.get_movie_ids(settings), {1, 2, 4})
+
+        # персонажи не спрашиваются для аниме, актёры - только для фильмов и сериалов
+        settings = QuestionSettings.default()
+        settings.question_types = {QuestionType.MOVIE_BY_ACTORS: 1}
+        self.assertEqual(self.get_movie_ids(settings), {1, 3})
+
+    def test_updates(self) -> None:
+        self.index.add_movie(make_movie(5, MovieType.MOVIE, Production.TURKISH, 2015, 10))
+        self.index.add_movie(make_movie(1, MovieType.SERIES, Production.FOREIGN, 2001, 1000))
+        self.index.remove_movie(movie_id=2)
+
+        settings = QuestionSettings.default()
+        settings.movie_types = {MovieType.SERIES: 0.5, MovieType.MOVIE: 0.5, MovieType.ANIME: 0.5}
+        self.assertEqual(self.get_movie_ids(settings), {1, 3, 5})
+
+        movie = self.index.get_movies(self.index.search(settings))[0]
+        self.assertEqual(movie, {"movie_id": 1, "name": "Movie 1", "movie_type": "series", "production": ["foreign"], "year": 2001, "sequels": []})
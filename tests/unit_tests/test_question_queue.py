@@ -0,0 +1,179 @@
+import random
+from types import SimpleNamespace
+from typing import List, Optional
+from unittest import TestCase
+
+import numpy as np
+from pymongo.errors import BulkWriteError
+
+from src import logger
+from src.entities.question import MovieBySloganQuestion, Question
+from src.entities.question_settings import QuestionSettings
+from src.entities.settings import Settings
+from src.enums import MovieType, Production, QuestionType
+from src.questions_database import QuestionsDatabase
+from src.utils.question_movies_index import QuestionMoviesIndex
+from tests.unit_tests.utils import make_movie
+
+
+class FakeCursor(list):
+    def sort(self, key: str, direction: int) -> "FakeCursor":
+        return FakeCursor(sorted(self, key=lambda document: document[key], reverse=direction < 0))
+
+    def limit(self, count: int) -> "FakeCursor":
+        return FakeCursor(self[:count])
+
+
+class FakeCollection:
+    def __init__(self, unique_keys: Optional[List[str]] = None) -> None:
+        self.documents: List[dict] = []
+        self.identifier = 0
+        self.unique_keys = unique_keys
+        self.stale_reads = 0
+
+    def find(self, query: dict) -> FakeCursor:
+        # устаревшее чтение имитирует параллельный запрос, который ещё не видит чужую вставку
+        if self.stale_reads > 0:
+            self.stale_reads -= 1
+            return FakeCursor()
+
+        return FakeCursor(document for document in self.documents if self.__matches(document, query))
+
+    def find_one(self, query: dict) -> Optional[dict]:
+        return next(iter(self.find(query)), None)
+
+    def find_one_and_delete(self, query: dict, sort: list) -> Optional[dict]:
+        document = next(iter(self.find(query).sort(*sort[0])), None)
+
+        if document is not None:
+            self.documents.remove(document)
+
+        return document
+
+    def insert_one(self, document: dict) -> None:
+        self.identifier += 1
+        self.documents.append({"_id": self.identifier, **document})
+
+    def insert_many(self, documents: List[dict], ordered: bool = True) -> None:
+        for inserted, document in enumerate(documents):
+            if self.unique_keys and any(all(other.get(key) == document.get(key) for key in self.unique_keys) for other in self.documents):
+                raise BulkWriteError({"nInserted": inserted, "writeErrors": [{"index": inserted, "code": 11000}]})
+
+            self.insert_one(document)
+
+    def delete_many(self, query: dict) -> None:
+        self.documents = [document for document in self.documents if not self.__matches(document, query)]
+
+    def __matches(self, document: dict, query: dict) -> bool:
+        for key, value in query.items():
+            if isinstance(value, dict) and "$ne" in value:
+                if document.get(key) == value["$ne"]:
+                    return False
+            elif isinstance(value, dict) and "$in" in value:
+                if document.get(key) not in value["$in"]:
+                    return False
+            elif document.get(key) != value:
+                return False
+
+        return True
+
+
+class FakeMovieDatabase:
+    def __init__(self, movies: List[dict]) -> None:
+        self.movies = movies
+        self.catalog_queries = 0
+        self.question_movies_index = QuestionMoviesIndex()
+        self.question_movies_index.load(make_movie(movie["movie_id"], MovieType.MOVIE, Production.FOREIGN, movie["year"], votes=1000) for movie in movies)
+
+    def get_question_movies(self, settings: QuestionSettings) -> List[dict]:
+        self.catalog_queries += 1
+        return self.movies
+
+    def get_movies(self, movie_ids: List[int]) -> List[SimpleNamespace]:
+        return [SimpleNamespace(movie_id=movie_id) for movie_id in movie_ids]
+
+
+def generate_question(movie: SimpleNamespace, username: str, settings: QuestionSettings) -> Question:
+    question = MovieBySloganQuestion(title="", answer="", slogan="")
+    question.init_base(question_type=QuestionType.MOVIE_BY_SLOGAN, username=username, movie_id=movie.movie_id)
+    return question
+
+
+class TestQuestionQueue(TestCase):
+    def setUp(self) -> None:
+        random.seed(42)
+        np.random.seed(42)
+
+        movies = [{"movie_id": movie_id, "movie_type": MovieType.MOVIE.value, "production": [Production.FOREIGN.value], "year": 2000} for movie_id in range(10)]
+        self.database = SimpleNamespace(questions=FakeCollection(), queued_questions=FakeCollection(unique_keys=["username", "settings_key", "slot"]))
+        self.movie_database = FakeMovieDatabase(movies=movies)
+        self.questions_database = QuestionsDatabase(database=self.database, movie_database=self.movie_database, logger=logger)
+        self.questions_database.generate_question = generate_question
+        self.updated_movie_ids = []
+        self.questions_database.update_question = self.update_question
+        self.settings = Settings.default("user")
+
+    def test_pop_queued_questions(self) -> None:
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 3)
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 0)
+
+        queued_movie_ids = [queued["movie_id"] for queued in self.database.queued_questions.documents]
+        self.assertEqual(len(set(queued_movie_ids)), 3)
+
+        catalog_queries = self.movie_database.catalog_queries
+        question = self.questions_database.get_question(self.settings)
+        self.assertEqual(question.movie_id, queued_movie_ids[0])
+        self.assertIsNone(question.correct)
+        self.assertEqual(self.updated_movie_ids, [question.movie_id])
+        self.assertEqual(self.movie_database.catalog_queries, catalog_queries)
+
+        self.assertTrue(self.questions_database.have_question(username="user"))
+        self.assertEqual(len(self.database.queued_questions.documents), 2)
+
+        # текущий вопрос учитывается при дозаполнении, поэтому фильмы в очереди не повторяются
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 1)
+        queued_movie_ids = [queued["movie_id"] for queued in self.database.queued_questions.documents]
+        self.assertEqual(len(set(queued_movie_ids + [question.movie_id])), 4)
+
+    def test_invalidation(self) -> None:
+        self.questions_database.fill_question_queue(self.settings)
+
+        self.settings.question_settings.hide_actor_photos = not self.settings.question_settings.hide_actor_photos
+        catalog_queries = self.movie_database.catalog_queries
+        self.assertIsNotNone(self.questions_database.get_question(self.settings))
+        self.assertEqual(self.movie_database.catalog_queries, catalog_queries + 1)
+        self.assertEqual(len(self.database.queued_questions.documents), 3)
+
+        self.database.questions.delete_many({})
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 3)
+        self.assertEqual(len(self.database.queued_questions.documents), 3)
+
+        self.questions_database.clear_question_queue(username="user")
+        self.assertEqual(self.database.queued_questions.documents, [])
+
+    def test_concurrent_fill(self) -> None:
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 3)
+
+        # второе заполнение не видит уже вставленные вопросы, но занятые ячейки не дают переполнить очередь
+        self.database.queued_questions.stale_reads = 1
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 0)
+        self.assertEqual(sorted(queued["slot"] for queued in self.database.queued_questions.documents), [0, 1, 2])
+
+        self.questions_database.get_question(self.settings)
+        self.database.questions.delete_many({})
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 1)
+        self.assertEqual(sorted(queued["slot"] for queued in self.database.queued_questions.documents), [0, 1, 2])
+
+    def test_removed_movies(self) -> None:
+        # фильмы удалены из индекса после того, как каталог вернул их кандидатами
+        for movie in self.movie_database.movies:
+            self.movie_database.question_movies_index.remove_movie(movie["movie_id"])
+
+        self.assertEqual(self.questions_database.fill_question_queue(self.settings), 0)
+        self.assertEqual(self.database.queued_questions.documents, [])
+        self.assertIsNone(self.questions_database.get_question(self.settings))
+        self.assertFalse(self.questions_database.have_question(username="user"))
+
+    def update_question(self, question: Question, settings: QuestionSettings) -> Question:
+        self.updated_movie_ids.append(question.movie_id)
+        return question
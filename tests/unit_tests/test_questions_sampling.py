@@ -0,0 +1,156 @@
+import random
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, List
+from unittest import TestCase
+
+import numpy as np
+
+from src import logger
+from src.entities.question import MovieBySloganQuestion, Question
+from src.entities.question_settings import QuestionSettings
+from src.enums import MovieType, Production, QuestionType
+from src.questions_database import QuestionsDatabase
+from src.utils.question_movies_index import QuestionMoviesIndex
+from tests.unit_tests.utils import make_movie
+
+
+def get_reference_weights(movies: List[dict], last_questions: List[Question], settings: QuestionSettings, alpha: float) -> Dict[int, float]:
+    movie_id2weight = dict()
+
+    for i, question in enumerate(last_questions):
+        if question.movie_id not in movie_id2weight:
+            movie_id2weight[question.movie_id] = 1 - alpha ** (i + 1)
+
+    feature2balance = {
+        "movie_type": {movie_type.value: value for movie_type, value in settings.movie_types.items()},
+        "production_key": {production.value: value for production, value in settings.production.items()},
+        "year_key": {years: value for years, value in settings.years.items()}
+    }
+
+    year2key = settings.get_possible_years()
+    features2count = defaultdict(int)
+    movies = [{**movie, "year_key": year2key[movie["year"]], "production_key": movie["production"][0]} for movie in movies]
+
+    for movie in movies:
+        features2count[tuple(movie[feature] for feature in feature2balance)] += 1
+
+    movie_id2movie_weight = {}
+    for movie in movies:
+        weight = 1 / features2count[tuple(movie[feature] for feature in feature2balance)]
+
+        for feature, feature2value in feature2balance.items():
+            weight *= feature2value[movie[feature]]
+
+        movie_id2movie_weight[movie["movie_id"]] = weight * movie_id2weight.get(movie["movie_id"], 1)
+
+    total_weight = sum(movie_id2movie_weight.values())
+    return {movie_id: weight / total_weight for movie_id, weight in movie_id2movie_weight.items()}
+
+
+class TestQuestionsSampling(TestCase):
+    def setUp(self) -> None:
+        random.seed(42)
+        np.random.seed(42)
+
+        self.index = QuestionMoviesIndex()
+        self.questions_database = QuestionsDatabase(database=None, movie_database=SimpleNamespace(question_movies_index=self.index), logger=logger)
+        self.settings = QuestionSettings.default()
+        self.settings.movie_types = {MovieType.MOVIE: 3, MovieType.SERIES: 1, MovieType.CARTOON: 1}
+        self.settings.production = {Production.FOREIGN: 2, Production.RUSSIAN: 1}
+        self.settings.years = {(1990, 1999): 1, (2000, 2009): 2, (2020, ""): 3}
+
+        years = [*range(1990, 2000), *range(2000, 2010), *range(2020, 2024)]
+        self.movies = [
+            {
+                "movie_id": movie_id,
+                "name": f"Movie {movie_id}",
+                "movie_type": random.choice(list(self.settings.movie_types)).value,
+                "production": [random.choice(list(self.settings.production)).value],
+                "year": random.choice(years),
+                "sequels": []
+            } for movie_id in range(1, 61)
+        ]
+        self.index.load(make_movie(movie["movie_id"], MovieType(movie["movie_type"]), Production(movie["production"][0]), movie["year"], votes=1000) for movie in self.movies)
+
+        self.last_questions = []
+        for movie_id in [random.randint(1, 60) for _ in range(30)]:
+            question = MovieBySloganQuestion(title="", answer="", slogan="")
+            question.init_base(question_type=QuestionType.MOVIE_BY_SLOGAN, username="user", movie_id=movie_id)
+            self.last_questions.append(question)
+
+        self.questions_database.alpha = 0.99
+
+    def test_weights(self) -> None:
+        reference = get_reference_weights(self.movies, self.last_questions, self.settings, self.questions_database.alpha)
+        movie_ids, weights = self.questions_database.get_movie_weights(movies=self.movies, last_questions=self.last_questions, settings=self.settings)
+        weights /= weights.sum()
+
+        for movie_id, weight in zip(movie_ids, weights):
+            self.assertAlmostEqual(reference[movie_id], weight)
+
+    def test_sampling_distribution(self) -> None:
+        reference = get_reference_weights(self.movies, self.last_questions, self.settings, self.questions_database.alpha)
+        samples = 12000
+        movie_id2count = defaultdict(int)
+
+        for _ in range(samples):
+            movie_id = self.questions_database.sample_question_movie_ids(movies=self.movies, last_questions=self.last_questions, settings=self.settings, count=1)[0]
+            movie_id2count[movie_id] += 1
+
+        expected = np.array([reference[movie["movie_id"]] * samples for movie in self.movies])
+        observed = np.array([movie_id2count[movie["movie_id"]] for movie in self.movies])
+        chi2 = ((observed - expected) ** 2 / expected).sum()
+
+        # 59 степеней свободы, критическое значение для p = 0.001 около 98.3
+        self.assertLess(chi2, 98.3)
+
+    def test_sampling_without_replacement(self) -> None:
+        movie_ids = self.questions_database.sample_question_movie_ids(movies=self.movies[:10], last_questions=[], settings=self.settings, count=10)
+        self.assertEqual(sorted(movie_ids), list(range(1, 11)))
+
+    def test_removed_movies(self) -> None:
+        # фильм мог быть удалён из индекса после выборки кандидатов, такие фильмы не выбираются
+        self.index.remove_movie(1)
+        movie_ids = self.questions_database.sample_question_movie_ids(movies=self.movies[:10], last_questions=[], settings=self.settings, count=10)
+        self.assertEqual(sorted(movie_ids), list(range(2, 11)))
+
+    def test_sampler_distribution(self) -> None:
+        reference = get_reference_weights(self.movies, self.last_questions, self.settings, self.questions_database.alpha)
+        sampler = self.questions_database.get_movies_sampler(movies=self.movies, last_questions=self.last_questions, settings=self.settings)
+        samples = 12000
+        movie_id2count = defaultdict(int)
+
+        for _ in range(samples):
+            movie_id2count[sampler.sample()] += 1
+
+        expected = np.array([reference[movie["movie_id"]] * samples for movie in self.movies])
+        observed = np.array([movie_id2count[movie["movie_id"]] for movie in self.movies])
+        chi2 = ((observed - expected) ** 2 / expected).sum()
+        self.assertLess(chi2, 98.3)
+
+    def test_sampler_remove(self) -> None:
+        sampler = self.questions_database.get_movies_sampler(movies=self.movies, last_questions=self.last_questions, settings=self.settings)
+        sampler.remove(range(1, 51))
+        sampler.remove([1, 2, 1000])
+        self.assertEqual(len(sampler), 10)
+
+        # после удаления веса оставшихся фильмов должны совпадать с пересчитанными с нуля
+        reference = get_reference_weights(self.movies[50:], self.last_questions, self.settings, self.questions_database.alpha)
+        samples = 6000
+        movie_id2count = defaultdict(int)
+
+        for _ in range(samples):
+            movie_id2count[sampler.sample()] += 1
+
+        self.assertEqual(set(movie_id2count), set(reference))
+
+        expected = np.array([reference[movie_id] * samples for movie_id in reference])
+        observed = np.array([movie_id2count[movie_id] for movie_id in reference])
+        chi2 = ((observed - expected) ** 2 / expected).sum()
+
+        # 9 степеней свободы, критическое значение для p = 0.001 около 27.9
+        self.assertLess(chi2, 27.9)
+
+        sampler.remove(range(51, 61))
+        self.assertRaises(ValueError, sampler.sample)
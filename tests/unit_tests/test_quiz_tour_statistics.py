@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import List, Optional
+from unittest import TestCase
+
+from src import logger
+from src.database import Database
+from src.enums import QuizTourType
+from src.quiz_tours_database import QuizToursDatabase
+
+
+class FakeCollection:
+    def __init__(self, documents: Optional[List[dict]] = None) -> None:
+        self.documents = documents or []
+
+    def find(self, query: dict) -> List[dict]:
+        return [document for document in self.documents if self.__matches(document, query)]
+
+    def replace_one(self, query: dict, document: dict, upsert: bool) -> None:
+        self.documents = [stored for stored in self.documents if not self.__matches(stored, query)] + [document]
+
+    def delete_many(self, query: dict) -> None:
+        self.documents = [document for document in self.documents if not self.__matches(document, query)]
+
+    def __matches(self, document: dict, query: dict) -> bool:
+        return all(document[key] in value["$in"] if isinstance(value, dict) else document[key] == value for key, value in query.items())
+
+
+class TestQuizTourStatistics(TestCase):
+    def setUp(self) -> None:
+        self.database = Database(mongo_url="", database_name="")
+        quiz_tour = {
+            "quiz_tour_id": 1,
+            "quiz_tour_type": QuizTourType.REGULAR.value,
+            "name": "tour",
+            "description": "",
+            "question_ids": [1, 2],
+            "image_url": "",
+            "created_at": datetime(2024, 1, 1),
+            "created_by": "alice",
+            "tags": []
+        }
+        self.database.quiz_tours = FakeCollection([quiz_tour])
+        self.database.quiz_tour_answers = FakeCollection([
+            {"username": "alice", "question_id": 1, "correct": True},
+            {"username": "alice", "question_id": 2, "correct": False},
+            {"username": "bob", "question_id": 1, "correct": True}
+        ])
+        questions = {"1": {"correct": 2, "incorrect": 0}, "2": {"correct": 0, "incorrect": 1}}
+        self.database.quiz_tour_statistics = FakeCollection([{"quiz_tour_id": 1, "finished_count": 1, "score_sum": 50, "questions": questions}])
+        self.quiz_tours_database = QuizToursDatabase(database=self.database, questions_database=None, logger=logger)
+
+    def test_consistent(self) -> None:
+        with self.assertNoLogs(logger, level="WARNING"):
+            self.assertEqual(self.quiz_tours_database.rebuild_statistics(), 0)
+
+    def test_inconsistent(self) -> None:
+        self.database.quiz_tour_statistics.documents[0]["finished_count"] = 2
+
+        with self.assertLogs(logger, level="WARNING"):
+            self.assertEqual(self.quiz_tours_database.rebuild_statistics(), 1)
+
+        self.assertEqual(self.database.quiz_tour_statistics.documents[0]["finished_count"], 1)
+
+    def test_removed_questions(self) -> None:
+        # вопрос удалён вместе с ответами: счётчики расходятся ожидаемо и только пересчитываются
+        self.database.quiz_tours.documents[0]["question_ids"] = [1]
+        self.database.quiz_tour_answers.documents = [answer for answer in self.database.quiz_tour_answers.documents if answer["question_id"] == 1]
+
+        with self.assertNoLogs(logger, level="WARNING"):
+            self.assertEqual(self.quiz_tours_database.rebuild_statistics(quiz_tour_ids=[1], check_consistency=False), 0)
+
+        statistics = self.database.quiz_tour_statistics.documents[0]
+        self.assertEqual((statistics["finished_count"], statistics["score_sum"]), (2, 200))
+        self.assertEqual(statistics["questions"], {"1": {"correct": 2, "incorrect": 0}})
@@ -11,8 +11,10 @@ from src.entities.lyrics import Lyrics
 from src.entities.lyrics_line import LyricsLine
 from src.entities.metadata import Metadata
 from src.entities.movie import Movie
+from src.entities.movie_card import MovieCard
 from src.entities.person import Person
 from src.entities.rating import Rating
+from src.entities.short_movie import ShortMovie
 from src.entities.source import HandSource, KinopoiskSource, Source, YandexSource
 from src.entities.spoiler_text import SpoilerText
 from src.entities.track import Track
@@ -152,6 +154,17 @@ class TestSerialization(TestCase):
         movie_from_dict = Movie.from_dict(movie_dict)
         self.assertEqual(movie, movie_from_dict)
 
+        for view in [MovieCard, ShortMovie]:
+            view_dict = {key: value for key, value in movie_dict.items() if view.get_projection().get(key)}
+            view_from_dict = view.from_dict(view_dict)
+            self.assertEqual(set(view_dict), set(view.__dataclass_fields__))
+
+            for key in view_dict:
+                self.assertEqual(getattr(view_from_dict, key), getattr(movie, key))
+
+        with self.assertRaisesRegex(ValueError, "is not a valid Genre"):
+            Movie.from_dict({**movie_dict, "genres": ["unknown genre"]})
+
     def test_history_action_serialization(self) -> None:
         history_actions = [
             AddMovieAction(username="user", timestamp=datetime(2024, 1, 1, 20, 23, 51), movie_id=1),
@@ -0,0 +1,269 @@
+import asyncio
+import copy
+from typing import List, Optional
+from unittest import TestCase
+
+from src.entities.question import MovieBySloganQuestion, Question
+from src.entities.question_answer import QuestionAnswer
+from src.entities.question_settings import QuestionSettings
+from src.entities.session import Session
+from src.enums import QuestionType
+from src.utils.sessions_manager import SessionsManager
+
+
+def get_field(document: dict, key: str) -> tuple:
+    *path, last = key.split(".")
+    for name in path:
+        document = document.setdefault(name, {})
+
+    return document, last
+
+
+class FakeSessions:
+    def __init__(self) -> None:
+        self.documents: List[dict] = []
+        self.updates: List[dict] = []
+
+    async def insert_one(self, document: dict) -> None:
+        self.documents.append(copy.deepcopy(document))
+
+    async def find_one_and_update(self, query: dict, update: dict, projection: dict, return_document: bool) -> Optional[dict]:
+        # ожидание имитирует сетевой запрос, чтобы обработчики разных воркеров чередовались
+        await asyncio.sleep(0)
+        document = next((document for document in self.documents if self.__matches(document, query)), None)
+
+        if document is None:
+            return None
+
+        self.updates.append(update)
+
+        for key, value in update.get("$set", {}).items():
+            parent, name = get_field(document, key)
+            parent[name] = copy.deepcopy(value)
+
+        for key, value in update.get("$inc", {}).items():
+            parent, name = get_field(document, key)
+            parent[name] = parent.get(name, 0) + value
+
+        for key, value in update.get("$addToSet", {}).items():
+            if value not in document[key]:
+                document[key].append(value)
+
+        for key, value in update.get("$pull", {}).items():
+            document[key] = [item for item in document[key] if item != value]
+
+        for key, value in update.get("$push", {}).items():
+            parent, name = get_field(document, key)
+            items = parent.setdefault(name, [])
+
+            if isinstance(value, dict) and "$each" in value:
+                items.extend(copy.deepcopy(value["$each"]))
+                parent[name] = items[value["$slice"]:]
+            else:
+                items.append(copy.deepcopy(value))
+
+        fields = [key for key, value in projection.items() if value]
+        return {key: document[key] for key in fields} if fields else copy.deepcopy(document)
+
+    def __matches(self, document: dict, query: dict) -> bool:
+        for key, value in query.items():
+            parent, name = get_field(copy.deepcopy(document), key)
+
+            if isinstance(value, dict) and "$exists" in value:
+                if (name in parent) != value["$exists"]:
+                    return False
+            elif isinstance(value, dict) and "$ne" in value:
+                if parent.get(name) == value["$ne"]:
+                    return False
+            elif parent.get(name) != value:
+                return False
+
+        return True
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.sessions = FakeSessions()
+        self.session_questions = FakeSessions()
+        self.reads = 0
+
+    async def get_session(self, session_id: str) -> Optional[Session]:
+        await asyncio.sleep(0)
+        self.reads += 1
+        document = next((document for document in self.sessions.documents if document["session_id"] == session_id), None)
+        return Session.from_dict(copy.deepcopy(document)) if document else None
+
+
+def make_question(movie_id: int) -> Question:
+    question = MovieBySloganQuestion(title="", answer="", slogan="slogan")
+    question.init_base(question_type=QuestionType.MOVIE_BY_SLOGAN, username="", movie_id=movie_id)
+    return question
+
+
+class TestSessionsManager(TestCase):
+    def setUp(self) -> None:
+        self.database = FakeDatabase()
+        self.manager = SessionsManager(database=self.database)
+        # второй менеджер с той же базой играет роль другого воркера
+        self.other_manager = SessionsManager(database=self.database)
+
+        session = Session.create(session_id="session", username="alice", question_settings=QuestionSettings.default())
+        session.players.append("bob")
+        asyncio.run(self.manager.create_session(session))
+
+    def assert_synced(self, session: Session) -> None:
+        # доли в настройках нормализуются при каждом чтении, поэтому настройки сравниваются отдельно от остального состояния
+        local, stored = session.to_dict(), Session.from_dict(copy.deepcopy(self.database.sessions.documents[0])).to_dict()
+        self.assertEqual(local.pop("question_settings")["answer_time"], stored.pop("question_settings")["answer_time"])
+        self.assertEqual(local, stored)
+
+    def test_rehydrate(self) -> None:
+        async def run() -> None:
+            self.manager.release_session("session")
+            sessions = await asyncio.gather(*[self.manager.get_session("session") for _ in range(5)])
+            self.assertTrue(all(session is sessions[0] for session in sessions))
+            self.assertIsNone(await self.manager.get_session("unknown"))
+
+            self.manager.release_session("session")
+            self.assertIsNot(await self.manager.get_session("session"), sessions[0])
+
+        asyncio.run(run())
+
+    def test_answers(self) -> None:
+        seqs = []
+
+        async def answer(manager: SessionsManager, username: str, correct: bool) -> Optional[Session]:
+            session = await manager.get_session("session")
+            session = await manager.add_answer(session, username=username, answer=QuestionAnswer(correct=correct, answer_time=1), round_number=1)
+
+            if session is not None:
+                seqs.append(session.seq)
+
+            return session
+
+        async def run() -> None:
+            session = await self.manager.advance(await self.manager.get_session("session"), make_question(1))
+            self.assertEqual(session.round_number, 1)
+            seq = session.seq
+
+            results = await asyncio.gather(answer(self.manager, "alice", True), answer(self.other_manager, "bob", False), answer(self.other_manager, "alice", False))
+            self.assertEqual([result is not None for result in results], [True, True, False])
+            # каждое применённое изменение получает свой номер, по которому клиенты упорядочивают события
+            self.assertEqual(sorted(seqs), [seq + 1, seq + 2])
+
+            # решение о завершении вопроса принимается по свежему состоянию, даже если ответы пришли на разные воркеры
+            self.assertTrue(any(result.all_answered() for result in results if result is not None))
+            statistics = self.database.sessions.documents[0]["statistics"]
+            self.assertEqual(statistics, {"alice": [{"correct": True, "answer_time": 1}], "bob": [{"correct": False, "answer_time": 1}]})
+
+            # ответ на прошлый раунд не засчитывается в текущий
+            await self.manager.advance(await self.manager.get_session("session"), make_question(2))
+            self.assertIsNone(await answer(self.manager, "bob", True))
+
+        asyncio.run(run())
+
+    def test_single_advance(self) -> None:
+        async def run() -> List[Optional[Session]]:
+            session = await self.manager.advance(await self.manager.get_session("session"), make_question(1))
+            other_session = await self.other_manager.get_session("session")
+            self.assertEqual(other_session.round_number, session.round_number)
+
+            answered = make_question(1)
+            answered.set_answer(QuestionAnswer(correct=True, answer_time=None))
+            return await asyncio.gather(
+                self.manager.advance(session, make_question(2), answered_question=answered, max_count=3),
+                self.other_manager.advance(other_session, make_question(3), answered_question=answered, max_count=3)
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(sum(result is not None for result in results), 1)
+
+        document = self.database.sessions.documents[0]
+        self.assertEqual(document["round_number"], 2)
+        self.assertEqual(len(document["questions"]), 1)
+        self.assertEqual(len(self.database.session_questions.documents), 1)
+        self.assertEqual(document["questions"][0]["question_id"], self.database.session_questions.documents[0]["_id"])
+
+    def test_questions_ring(self) -> None:
+        async def run() -> Session:
+            session = await self.manager.get_session("session")
+
+            for movie_id in range(10):
+                question = make_question(movie_id)
+                question.set_answer(QuestionAnswer(correct=movie_id % 2 == 0, answer_time=None))
+                session = await self.manager.advance(session, make_question(movie_id + 1), answered_question=question, max_count=3)
+
+            return session
+
+        session = asyncio.run(run())
+        self.assertEqual([question.movie_id for question in session.get_questions()], [9, 8, 7])
+        self.assertEqual(len(self.database.session_questions.documents), 10)
+        self.assertEqual(self.database.session_questions.documents[-1]["question"]["slogan"], "slogan")
+        self.assertEqual(self.database.sessions.updates[-1]["$push"]["questions"]["$slice"], -3)
+        self.assertEqual(Session.from_dict(session.to_dict()).questions, session.questions)
+
+    def test_last_player_leaves(self) -> None:
+        async def run() -> Session:
+            session = await self.manager.advance(await self.manager.get_session("session"), make_question(1))
+            session = await self.manager.remove_player(session, "alice")
+            self.assertIsNotNone(session.question)
+            return await self.other_manager.remove_player(session, "bob")
+
+        session = asyncio.run(run())
+        self.assertEqual(session.players, [])
+        self.assertIsNone(session.question)
+        self.assertEqual(session.round_number, 2)
+
+    def test_local_deltas(self) -> None:
+        async def run() -> Session:
+            session = await self.manager.get_session("session")
+            reads = self.database.reads
+
+            session = await self.manager.advance(session, make_question(1))
+            session = await self.manager.add_answer(session, username="alice", answer=QuestionAnswer(correct=True, answer_time=2), round_number=1)
+            session = await self.manager.update_settings(session, question_settings=QuestionSettings.from_dict({**QuestionSettings.default().to_dict(), "answer_time": 10}))
+            session = await self.manager.add_player(session, "carol")
+            session = await self.manager.remove_player(session, "bob")
+
+            # изменения своего воркера применяются к локальной копии без чтения документа
+            self.assertEqual(self.database.reads, reads)
+            return session
+
+        session = asyncio.run(run())
+        self.assert_synced(session)
+
+    def test_remote_change(self) -> None:
+        async def run() -> Session:
+            session = await self.manager.get_session("session")
+            other_session = await self.other_manager.get_session("session")
+            await self.other_manager.add_player(other_session, "carol")
+
+            # локальная копия пропустила изменение другого воркера, поэтому документ перечитывается
+            return await self.manager.advance(session, make_question(1))
+
+        session = asyncio.run(run())
+        self.assertEqual(session.players, ["alice", "bob", "carol"])
+        self.assert_synced(session)
+
+    def test_lock_with_waiters(self) -> None:
+        async def handle(active: List[int], overlaps: List[int], follow_up: bool) -> None:
+            async with self.manager.lock("session"):
+                active.append(1)
+                overlaps.append(len(active))
+                await asyncio.sleep(0)
+                active.pop()
+
+            # после освобождения блокировка ещё ждётся другими обработчиками, поэтому сброс сессии и новый обработчик не создают вторую
+            self.manager.release_session("session")
+
+            if follow_up:
+                await handle(active, overlaps, follow_up=False)
+
+        async def run() -> List[int]:
+            active, overlaps = [], []
+            await asyncio.gather(*[handle(active, overlaps, follow_up=True) for _ in range(3)])
+            return overlaps
+
+        self.assertEqual(asyncio.run(run()), [1] * 6)
+        self.assertEqual(self.manager.locks, {})
+        self.assertEqual(self.manager.lock_users, {})
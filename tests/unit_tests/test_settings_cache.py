@@ -0,0 +1,62 @@
+from typing import Optional
+from unittest import TestCase
+
+from src.database import Database
+from src.entities.main_settings import MainSettings
+
+
+class FakeSettingsCollection:
+    def __init__(self) -> None:
+        self.username2settings = {}
+        self.reads = 0
+        self.writes = 0
+
+    def find_one(self, query: dict) -> Optional[dict]:
+        self.reads += 1
+        return self.username2settings.get(query["username"])
+
+    def update_one(self, query: dict, update: dict, upsert: bool = False) -> None:
+        self.writes += 1
+        settings = self.username2settings.get(query["username"])
+
+        if settings is None:
+            self.username2settings[query["username"]] = update.get("$setOnInsert", update.get("$set"))
+        elif "$set" in update:
+            settings.update(update["$set"])
+
+
+class TestSettingsCache(TestCase):
+    def setUp(self) -> None:
+        self.database = Database(mongo_url="", database_name="")
+        self.database.settings = FakeSettingsCollection()
+
+    def test_read_through(self) -> None:
+        for _ in range(5):
+            self.assertTrue(self.database.get_settings(username="user").show_progress)
+
+        self.assertEqual((self.database.settings.reads, self.database.settings.writes), (1, 1))
+        self.assertEqual(self.database.get_cache_statistics()["settings"], {"hits": 4, "misses": 1})
+
+        self.database.get_settings(username="user").show_progress = False
+        self.assertTrue(self.database.get_settings(username="user").show_progress)
+
+    def test_update(self) -> None:
+        settings = self.database.get_settings(username="user")
+        self.database.update_settings(settings.update_main(MainSettings(show_progress=False, show_knowledge_status=False)))
+
+        self.assertFalse(self.database.get_settings(username="user").show_progress)
+        self.assertFalse(self.database.settings.username2settings["user"]["show_progress"])
+        self.assertEqual(self.database.settings.reads, 1)
+
+    def test_other_process(self) -> None:
+        # у другого воркера свой кеш, поэтому запись видна ему только при чтении без кеша
+        other_database = Database(mongo_url="", database_name="")
+        other_database.settings = self.database.settings
+        self.assertTrue(other_database.get_settings(username="user").show_progress)
+
+        settings = self.database.get_settings(username="user")
+        self.database.update_settings(settings.update_main(MainSettings(show_progress=False, show_knowledge_status=False)))
+
+        self.assertTrue(other_database.get_settings(username="user").show_progress)
+        self.assertFalse(other_database.get_settings(username="user", cached=False).show_progress)
+        self.assertFalse(other_database.get_settings(username="user").show_progress)
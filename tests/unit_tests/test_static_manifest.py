@@ -0,0 +1,58 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from src.utils.static_manifest import ImmutableStaticFiles, StaticManifest
+
+
+class TestStaticManifest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, "js"))
+
+        for name in ["a.js", "b.js"]:
+            self.write(name, f"console.log('{name}')")
+
+        self.manifest = StaticManifest(root=self.directory.name, directories=["js"], check_interval=0)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str, mtime: float = 1000) -> None:
+        path = os.path.join(self.directory.name, "js", name)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+        os.utime(path, (mtime, mtime))
+
+    def test_refresh(self) -> None:
+        version = self.manifest.get_version()
+        url_a = self.manifest.get_url("/js/a.js")
+        url_b = self.manifest.get_url("/js/b.js")
+        self.assertNotEqual(url_a, url_b)
+        self.assertEqual(self.manifest.get_url("/js/unknown.js"), f"/js/unknown.js?v={version}")
+
+        # без изменения mtime файл не перечитывается
+        self.write("a.js", "changed", mtime=1000)
+        self.assertEqual(self.manifest.get_url("/js/a.js"), url_a)
+
+        self.write("a.js", "changed", mtime=2000)
+        self.assertNotEqual(self.manifest.get_url("/js/a.js"), url_a)
+        self.assertEqual(self.manifest.get_url("/js/b.js"), url_b)
+        self.assertNotEqual(self.manifest.get_version(), version)
+
+    def test_without_reload(self) -> None:
+        manifest = StaticManifest(root=self.directory.name, directories=["js"])
+        url_a = manifest.get_url("/js/a.js")
+
+        # без автоперезагрузки манифест строится один раз
+        self.write("a.js", "changed", mtime=2000)
+        self.assertEqual(manifest.get_url("/js/a.js"), url_a)
+
+    def test_versioned_query(self) -> None:
+        self.assertTrue(ImmutableStaticFiles.is_versioned(b"v=123"))
+        self.assertTrue(ImmutableStaticFiles.is_versioned(b"a=1&v=123"))
+        self.assertFalse(ImmutableStaticFiles.is_versioned(b"nov=1"))
+        self.assertFalse(ImmutableStaticFiles.is_versioned(b"v="))
+        self.assertFalse(ImmutableStaticFiles.is_versioned(b""))
@@ -0,0 +1,91 @@
+import time
+from typing import List, Optional
+from unittest import TestCase
+
+from src.database import Database
+from src.enums import UserRole
+from src.utils.ttl_cache import TTLCache
+
+
+class FakeCollection:
+    def __init__(self, documents: List[dict]) -> None:
+        self.documents = documents
+        self.queries = 0
+
+    def find_one(self, query: dict, collation: Optional[dict] = None) -> Optional[dict]:
+        self.queries += 1
+        username = query["username"].lower() if collation else query["username"]
+        return next((document for document in self.documents if (document["username"].lower() if collation else document["username"]) == username), None)
+
+    def find(self, query: dict) -> List[dict]:
+        self.queries += 1
+        return [document for document in self.documents if document["username"] in query["username"]["$in"]]
+
+    def update_one(self, query: dict, update: dict, upsert: bool) -> None:
+        self.documents = [document for document in self.documents if document["username"] != query["username"]]
+        self.documents.append({**query, **update["$set"]})
+
+
+class TestUsersCache(TestCase):
+    def setUp(self) -> None:
+        self.database = Database(mongo_url="", database_name="")
+        self.database.users = FakeCollection([
+            {"username": "Alice", "password_hash": "", "fullname": "Alice", "image_src": ""},
+            {"username": "bob", "password_hash": "", "fullname": "Bob", "image_src": ""}
+        ])
+        self.database.roles = FakeCollection([{"username": "Alice", "role": UserRole.ADMIN.value}])
+
+    def test_get_user(self) -> None:
+        self.assertEqual(self.database.get_user(username="alice").username, "Alice")
+        self.assertEqual(self.database.get_user(username="ALICE").role, UserRole.ADMIN)
+        self.assertEqual(self.database.get_users(usernames=["Alice"])[0].username, "Alice")
+        self.assertEqual(self.database.users.queries, 1)
+        self.assertEqual(self.database.roles.queries, 1)
+
+        self.assertEqual([user.username for user in self.database.get_users(usernames=["bob", "Alice", "unknown"])], ["bob", "Alice"])
+        self.database.get_user(username="Bob")
+        self.assertEqual(self.database.users.queries, 2)
+
+        self.assertIsNone(self.database.get_user(username="unknown"))
+        self.assertEqual(self.database.get_user(username="alice", cached=False).username, "Alice")
+        self.assertEqual(self.database.users.queries, 4)
+
+    def test_update_role(self) -> None:
+        self.assertEqual(self.database.get_user(username="bob").role, UserRole.USER)
+        self.database.update_role(username="bob", role=UserRole.ADMIN)
+        self.assertEqual(self.database.get_user(username="bob").role, UserRole.ADMIN)
+
+    def test_copies(self) -> None:
+        user = self.database.get_user(username="alice")
+        user.full_name = "Changed"
+        self.database.get_users(usernames=["Alice"])[0].role = UserRole.USER
+
+        self.assertEqual(self.database.get_user(username="alice").full_name, "Alice")
+        self.assertEqual(self.database.get_users(usernames=["Alice"])[0].role, UserRole.ADMIN)
+
+    def test_role_in_other_process(self) -> None:
+        # у другого воркера свой кеш, который update_role не сбрасывает
+        other_database = Database(mongo_url="", database_name="", roles_cache_ttl=0.05)
+        other_database.users = self.database.users
+        other_database.roles = self.database.roles
+        self.assertEqual(other_database.get_user(username="bob").role, UserRole.USER)
+
+        self.database.update_role(username="bob", role=UserRole.ADMIN)
+        self.assertEqual(other_database.get_user(username="bob").role, UserRole.USER)
+
+        time.sleep(0.06)
+        self.assertEqual(other_database.get_user(username="bob").role, UserRole.ADMIN)
+        self.assertEqual(other_database.get_users(usernames=["bob"])[0].role, UserRole.ADMIN)
+        self.assertEqual(self.database.users.queries, 1)
+
+    def test_ttl(self) -> None:
+        cache = TTLCache(ttl=0.05, max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), 3)
+
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
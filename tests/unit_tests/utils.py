@@ -0,0 +1,36 @@
+from src.entities.actor import Actor
+from src.entities.metadata import Metadata
+from src.entities.movie import Movie
+from src.entities.rating import Rating
+from src.entities.source import HandSource
+from src.entities.spoiler_text import SpoilerText
+from src.enums import MovieType, Production
+
+
+def make_movie(movie_id: int, movie_type: MovieType, production: Production, year: int, votes: int, slogan: str = "", image_urls: list = None) -> Movie:
+    return Movie(
+        movie_id=movie_id,
+        name=f"Movie {movie_id}",
+        source=HandSource(),
+        movie_type=movie_type,
+        year=year,
+        slogan=slogan,
+        description=SpoilerText(text="", spoilers=[]),
+        short_description=SpoilerText(text="", spoilers=[]),
+        production=[production],
+        countries=[],
+        genres=[],
+        actors=[Actor(person_id=1, description="character")],
+        directors=[],
+        duration=100,
+        rating=Rating(rating_kp=7, rating_imdb=7, votes_kp=votes),
+        image_urls=image_urls or [],
+        poster_url="",
+        banner_url="",
+        facts=[],
+        cites=[],
+        tracks=[],
+        alternative_names=[],
+        sequels=[],
+        metadata=Metadata.initial(username="user")
+    )
@@ -334,10 +334,11 @@ Movie.prototype.BuildQuestionStatus = function(parent) {
         return
 
     let status = this.params.movieId2status[this.movieId]
-    let correct = status.reduce((sum, value) => sum + value, 0)
-    let scale = correct * 100 / status.length
+    let correct = status.correct
+    let total = status.correct + status.incorrect
+    let scale = correct * 100 / total
     let color = `hsl(${scale * 1.2}, 70%, 50%)`
-    let text = `${GetWordForm(correct, ['игрок', 'игрока', 'игроков'])} из ${status.length}`
+    let text = `${GetWordForm(correct, ['игрок', 'игрока', 'игроков'])} из ${total}`
     let html = `<b>средний балл</b>: <div class="circle" style="background-color: ${color};"></div>${Round(scale, 10)}% (${text})`
 
     MakeElement("question-status", parent, {innerHTML: html})
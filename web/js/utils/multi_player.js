@@ -4,6 +4,9 @@ function MultiPlayer() {
     this.username = null
 
     this.question = null
+    this.session = null
+    this.seq = 0
+    this.resyncing = false
     this.pageHeaderBlock = document.getElementById("page-header")
     this.questionBlock = document.getElementById("question")
     this.managerBlock = document.getElementById("multi-player-manager")
@@ -36,6 +39,8 @@ function MultiPlayer() {
 MultiPlayer.prototype.Connect = function(sessionId, username) {
     this.sessionId = sessionId
     this.username = username
+    this.session = null
+    this.resyncing = true
 
     this.ws = new WebSocket(this.GetWebsockerUrl(sessionId))
     this.ws.onopen = () => this.Open()
@@ -117,19 +122,86 @@ MultiPlayer.prototype.HandleMessage = function(message) {
         return
     }
 
-    let session = JSON.parse(message)
+    let event = JSON.parse(message)
 
-    if (session.action == "remove") {
-        this.AppendHistory(session)
+    if (event.action == "remove") {
+        this.AppendHistory(event)
         this.Disconnect()
         return
     }
 
-    if (session.action == "message" || session.action == "reaction") {
-        this.AppendHistory(session)
+    if (event.action == "message" || event.action == "reaction") {
+        this.AppendHistory(event)
         return
     }
 
+    if (event.action == "snapshot") {
+        this.session = event.session
+        this.seq = event.seq
+        this.resyncing = false
+    }
+    else if (this.resyncing || event.seq <= this.seq) {
+        return
+    }
+    else if (event.seq != this.seq + 1) {
+        this.Resync()
+        return
+    }
+    else {
+        this.seq = event.seq
+        this.ApplyEvent(event)
+    }
+
+    this.ShowSession(event)
+}
+
+MultiPlayer.prototype.Resync = function() {
+    this.resyncing = true
+    this.ws.send(JSON.stringify({action: "resync"}))
+}
+
+MultiPlayer.prototype.ApplyEvent = function(event) {
+    let session = this.session
+
+    if (event.action == "connect") {
+        if (session.players.every(player => player.username != event.player.username))
+            session.players.push(event.player)
+    }
+    else if (event.action == "disconnect") {
+        session.players = session.players.filter(player => player.username != event.username)
+
+        if (session.players.length == 0) {
+            session.question = null
+            session.answers = {}
+        }
+    }
+    else if (event.action == "answer") {
+        if (event.round_number != session.round_number || event.username in session.answers)
+            return
+
+        session.answers[event.username] = event.answer
+
+        if (!(event.username in session.statistics))
+            session.statistics[event.username] = []
+
+        session.statistics[event.username].push(event.answer)
+    }
+    else if (event.action == "settings") {
+        session.question_settings = event.question_settings
+    }
+    else if (event.action == "question") {
+        session.question = event.question
+        session.movie = event.movie
+        session.person_id2person = event.person_id2person
+        session.movie_id2scale = event.movie_id2scale
+        session.round_number = event.round_number
+        session.answers = {}
+    }
+}
+
+MultiPlayer.prototype.ShowSession = function(event) {
+    let session = {...this.session, action: event.action, username: event.username}
+
     this.UpdateSessionInfo(session)
 
     if (!this.showedSettings || session.action == "settings") {
@@ -234,7 +306,7 @@ MultiPlayer.prototype.BuildUserStatistics = function(username, answers) {
 MultiPlayer.prototype.InitQuestion = function(session) {
     let params = {
         personId2person: session.person_id2person,
-        movieId2scale: session.movie_id2scale[this.username]
+        movieId2scale: session.movie_id2scale[this.username] || {}
     }
 
     this.ClearQuestion()
@@ -261,7 +333,7 @@ MultiPlayer.prototype.ClearQuestion = function() {
 }
 
 MultiPlayer.prototype.AnswerQuestion = function(correct, answerTime) {
-    this.ws.send(JSON.stringify({action: "answer", correct: correct, answer_time: answerTime}))
+    this.ws.send(JSON.stringify({action: "answer", correct: correct, answer_time: answerTime, round_number: this.session.round_number}))
 }
 
 MultiPlayer.prototype.AppendHistory = function(session) {